@@ -0,0 +1,268 @@
+"""
+Scoring throughput / latency / memory benchmarks.
+
+Each (path, size) case runs in a fresh spawned process so peak RSS is
+per case. Results go to a JSON file; with --baseline the run fails
+(exit 1) when rows/sec drops or peak RSS grows by more than --tolerance.
+
+python benchmarks/run_benchmarks.py --sizes 1k,100k --out bench_output.json
+python benchmarks/run_benchmarks.py --sizes 1k,100k --baseline benchmarks/baseline.json --write-baseline
+python benchmarks/run_benchmarks.py --sizes 1k,100k --baseline benchmarks/baseline.json
+python benchmarks/run_benchmarks.py --sizes 1m,10m --paths vectorized,stream
+python benchmarks/run_benchmarks.py --paths startup
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+PATHS = ["scalar", "rowwise", "vectorized", "stream", "parallel", "map_pd_to_rating", "rating_scale", "load_priors",
+         "startup"]
+# per-row Python paths get slow quickly; larger sizes are skipped for them
+MAX_ROWS = {"scalar": 100_000, "rowwise": 100_000, "load_priors": 10_000}
+CHUNK = 10_000
+# cold-start cases: import time of each module in a fresh interpreter (size-independent)
+STARTUP_MODULES = ["sme_credit.core", "sme_credit.helpers.service_helper", "sme_credit.helpers.batch_helper"]
+HEAVY_MODULES = ("pandas", "yaml", "openpyxl")
+STARTUP_REPEATS = 5
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _quantiles(seconds, unit: str, scale: float) -> dict:
+    import numpy as np
+
+    if not len(seconds):
+        return {}
+    vals = np.asarray(seconds, dtype="float64") * scale
+    return {f"p50_{unit}": float(np.percentile(vals, 50)), f"p99_{unit}": float(np.percentile(vals, 99))}
+
+
+class _Untimed:
+    """Wraps a chunk generator and records the time spent producing each chunk."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.spent = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        s = time.perf_counter()
+        try:
+            return next(self.chunks)
+        finally:
+            self.spent.append(time.perf_counter() - s)
+
+
+def _run_case(path: str, n: int, workers: int) -> dict:
+    """
+    Time one (path, size) case. Per-item paths (scalar, the rating lookups)
+    time every call and report per-row p50/p99 (`p50_us`); chunked paths
+    (rowwise, vectorized, stream) report per-chunk p50/p99 (`p50_chunk_ms`)
+    over CHUNK-row chunks; parallel and load_priors are one call each and
+    report throughput only. Input generation is kept out of the timings.
+    """
+    import numpy as np
+    import pandas as pd
+    from sme_credit.core import small_firm_score
+    from sme_credit.helpers.batch_helper import score_many, score_stream, iter_frame_chunks
+    from sme_credit.helpers.config_helper import load_yaml
+    from sme_credit.helpers.context_helper import load_context
+    from sme_credit.helpers.parallel_helper import score_parallel
+    from sme_credit.helpers.quant_helper import RatingScale, load_priors, map_pd_to_rating
+    from sme_credit.helpers.synth_helper import iter_synthetic_chunks, synthetic_portfolio
+
+    ctx = load_context(ROOT)
+    sectors = list(ctx.sector_curves)
+    per_row, per_chunk = [], []
+    excluded = 0.0
+    t0 = time.perf_counter()
+
+    if path == "scalar":
+        df = synthetic_portfolio(n, sectors=sectors)
+        rows = df.to_dict("records")
+        t0 = time.perf_counter()
+        for row in rows:
+            data = {**row, "sector_prior_pd": 0.03}
+            s = time.perf_counter()
+            small_firm_score(data, row["sector"], ctx)
+            per_row.append(time.perf_counter() - s)
+    elif path in ("rowwise", "vectorized"):
+        df = synthetic_portfolio(n, sectors=sectors)
+        engine = path
+        t0 = time.perf_counter()
+        for chunk in iter_frame_chunks(df, CHUNK):
+            s = time.perf_counter()
+            score_many(chunk, "sector", ctx, engine=engine)
+            per_chunk.append(time.perf_counter() - s)
+    elif path == "stream":
+        # chunks are still generated lazily (bounded memory), but their generation time is subtracted
+        chunks = _Untimed(iter_synthetic_chunks(n, CHUNK, sectors=sectors))
+        t0 = time.perf_counter()
+        last = time.perf_counter()
+        for scored in score_stream(chunks, "sector", ctx):
+            now = time.perf_counter()
+            per_chunk.append(now - last - chunks.spent[-1])
+            last = now
+        excluded = sum(chunks.spent)
+    elif path == "parallel":
+        df = synthetic_portfolio(n, sectors=sectors)
+        t0 = time.perf_counter()
+        score_parallel(df, "sector", ctx, workers=workers)
+    elif path in ("map_pd_to_rating", "rating_scale"):
+        bands = load_yaml(ROOT / "config" / "rating_scale.yaml")["ratings"]
+        target = bands if path == "map_pd_to_rating" else RatingScale(bands)
+        pds = np.random.default_rng(0).uniform(0, 0.3, size=n).tolist()
+        t0 = time.perf_counter()
+        for p in pds:
+            s = time.perf_counter()
+            map_pd_to_rating(p, target)
+            per_row.append(time.perf_counter() - s)
+    elif path == "load_priors":
+        rng = np.random.default_rng(0)
+        priors = pd.DataFrame({
+            "Country": [f"C{i // len(sectors)}" for i in range(n)],
+            "Sector": [sectors[i % len(sectors)] for i in range(n)],
+            "Prior_PD": rng.uniform(0.005, 0.08, size=n),
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            xlsx = Path(tmp) / "priors.xlsx"
+            priors.to_excel(xlsx, index=False, sheet_name="Priors")
+            t0 = time.perf_counter()
+            load_priors(str(xlsx), "Priors")
+    else:
+        raise ValueError(f"Unknown benchmark path: {path}")
+
+    seconds = time.perf_counter() - t0 - excluded
+    return {"path": path, "rows": n, "seconds": seconds, "rows_per_sec": n / seconds if seconds else None,
+            **_quantiles(per_row, "us", 1e6), **_quantiles(per_chunk, "chunk_ms", 1e3),
+            **({"chunk_rows": CHUNK} if per_chunk else {}), "peak_rss_mb": _peak_rss_mb()}
+
+
+def _latency(r: dict) -> str:
+    if "p50_us" in r:
+        return f"row p50 {r['p50_us']:>9.2f}us  p99 {r['p99_us']:>9.2f}us"
+    if "p50_chunk_ms" in r:
+        return f"chunk p50 {r['p50_chunk_ms']:>7.2f}ms  p99 {r['p99_chunk_ms']:>7.2f}ms"
+    return f"{'':>34}"
+
+
+def _startup_case(module: str) -> dict:
+    """Best-of-N import time of `module` in a fresh interpreter, plus which heavy deps it loaded."""
+    probe = (f"import sys, time; t = time.perf_counter(); import {module}; "
+             f"print(time.perf_counter() - t); print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    times, heavy = [], ""
+    for _ in range(STARTUP_REPEATS):
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=ROOT)
+        seconds, heavy = out.stdout.splitlines()
+        times.append(float(seconds))
+    return {"path": f"startup:{module}", "rows": 0, "seconds": min(times), "rows_per_sec": None,
+            "import_ms": min(times) * 1e3, "heavy_modules": [m for m in heavy.split(",") if m]}
+
+
+def _spawned(path: str, n: int, workers: int) -> dict:
+    # executor workers are not daemonic, so the parallel path can start its own pool
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+        return pool.submit(_run_case, path, n, workers).result()
+
+
+def _key(r: dict) -> str:
+    return f"{r['path']}@{r['rows']}"
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Regression messages for results that fall outside tolerance of the baseline."""
+    base = {_key(r): r for r in baseline.get("results", [])}
+    problems = []
+    for r in results:
+        b = base.get(_key(r))
+        if not b:
+            continue
+        if b.get("rows_per_sec") and r["rows_per_sec"] < b["rows_per_sec"] * (1 - tolerance):
+            problems.append(f"{_key(r)}: rows/sec {r['rows_per_sec']:.0f} < baseline {b['rows_per_sec']:.0f}")
+        if b.get("peak_rss_mb") and r.get("peak_rss_mb") and r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{_key(r)}: peak RSS {r['peak_rss_mb']:.0f}MB > baseline {b['peak_rss_mb']:.0f}MB")
+        if b.get("import_ms") and r["import_ms"] > b["import_ms"] * (1 + tolerance):
+            problems.append(f"{_key(r)}: import {r['import_ms']:.0f}ms > baseline {b['import_ms']:.0f}ms")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SME credit scoring benchmarks.")
+    parser.add_argument("--sizes", default="1k,100k", help=f"Comma-separated sizes from {list(SIZES)}")
+    parser.add_argument("--paths", default=",".join(PATHS), help="Comma-separated scoring paths to run")
+    parser.add_argument("--workers", type=int, default=4, help="Workers for the parallel path")
+    parser.add_argument("--out", default="bench_output.json", help="Where to write this run's JSON results")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--write-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.30,
+                        help="Allowed fractional regression vs baseline (default 0.30)")
+    args = parser.parse_args()
+
+    sizes = [SIZES[s.strip().lower()] for s in args.sizes.split(",") if s.strip()]
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    results = []
+    if "startup" in paths:
+        paths.remove("startup")
+        for module in STARTUP_MODULES:
+            r = _startup_case(module)
+            results.append(r)
+            heavy = ",".join(r["heavy_modules"]) or "-"
+            print(f"{r['path']:>44}  {r['import_ms']:>8.1f}ms  loads {heavy}")
+    for path in paths:
+        for n in sizes:
+            if n > MAX_ROWS.get(path, n):
+                continue
+            r = _spawned(path, n, args.workers)
+            results.append(r)
+            rss = f"{r['peak_rss_mb']:.0f}MB" if r["peak_rss_mb"] is not None else "n/a"
+            print(f"{path:>17} {n:>10,d} rows  {r['rows_per_sec']:>12,.0f} rows/s  {_latency(r)}  peak RSS {rss}")
+
+    import numpy, pandas
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "numpy": numpy.__version__, "pandas": pandas.__version__,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.write_baseline or not baseline_path.exists():
+            baseline_path.write_text(json.dumps(report, indent=2))
+            print(f"Baseline written  {baseline_path}")
+            return 0
+        problems = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+        for msg in problems:
+            print(f"REGRESSION  {msg}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# python run_calibration.py --panel input_data/default_panel.parquet --default-col default_flag --form logistic
+
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+
+from sme_credit.helpers.batch_helper import scoring_input_columns
+from sme_credit.helpers.cache_helper import load_context_cached
+from sme_credit.helpers.calibration_helper import (
+    CURVE_FORMS, DEFAULT_FLAG_COL, MIN_DEFAULTS, MIN_OBS, build_panel, calibrate, candidate_curves,
+    candidate_model_config, write_sector_config
+)
+from sme_credit.helpers.config_helper import write_yaml
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import ensure_dir, iter_input_chunks, make_output_path, write_table
+from sme_credit.helpers.store_helper import is_store, iter_store_chunks
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fit sector Z->PD curves and country Bayes alphas on a historical default panel "
+                    "and write candidate sector_config.yaml / model_config.yaml files.")
+    parser.add_argument("--panel", required=True,
+                        help="Panel CSV/Parquet/Excel file or run_store.py store: one row per firm-period "
+                             "with the scoring inputs (or a Z_adj column) and a 0/1 default flag")
+    parser.add_argument("--sheet", default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--sector-col", default="sector", help="Column name for sector")
+    parser.add_argument("--default-col", default=DEFAULT_FLAG_COL, help="Observed default flag column (0/1)")
+    parser.add_argument("--z-col", default="Z_adj",
+                        help="Precomputed Z_adj column; when absent Z_adj is recomputed from the inputs")
+    parser.add_argument("--form", choices=CURVE_FORMS, default="linear",
+                        help="linear: least squares on the flags; logistic: Newton fit, written as its best line")
+    parser.add_argument("--min-obs", type=int, default=MIN_OBS,
+                        help="Sectors/countries with fewer observations keep their current values")
+    parser.add_argument("--min-defaults", type=int, default=MIN_DEFAULTS,
+                        help="Sectors/countries with fewer defaults keep their current values")
+    parser.add_argument("--chunk-size", type=int, default=500_000, help="Rows read per chunk")
+    parser.add_argument("--use-utc", action="store_true", help="Use UTC time for output timestamp")
+    parser.add_argument("--output-prefix", default="calibration", help="Prefix for output file names")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild configs/priors from source instead of the .cache/ compiled bundle")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    output_dir = project_root / "output_data"
+    ctx = load_context(project_root) if args.no_cache else load_context_cached(project_root)
+
+    panel_path = Path(args.panel)
+    if not panel_path.is_absolute():
+        panel_path = project_root / panel_path
+    columns = scoring_input_columns(args.sector_col, keep=[args.default_col, args.z_col])
+    if is_store(panel_path):
+        chunks = iter_store_chunks(panel_path, args.chunk_size, columns=columns)
+    else:
+        chunks = iter_input_chunks(panel_path, args.chunk_size, sheet=args.sheet, columns=columns)
+
+    t0 = time.perf_counter()
+    panel = build_panel(chunks, args.sector_col, ctx, default_col=args.default_col, z_col=args.z_col)
+    t1 = time.perf_counter()
+    curves, alphas = calibrate(panel, ctx, form=args.form, min_obs=args.min_obs, min_defaults=args.min_defaults)
+    t2 = time.perf_counter()
+
+    ensure_dir(output_dir)
+    paths = {
+        "curves": make_output_path(output_dir, f"{args.output_prefix}_curves", use_utc=args.use_utc),
+        "alphas": make_output_path(output_dir, f"{args.output_prefix}_alphas", use_utc=args.use_utc),
+        "sector_config": make_output_path(output_dir, f"{args.output_prefix}_sector_config", ext=".yaml",
+                                          use_utc=args.use_utc),
+        "model_config": make_output_path(output_dir, f"{args.output_prefix}_model_config", ext=".yaml",
+                                         use_utc=args.use_utc),
+    }
+    write_table(curves, paths["curves"])
+    write_table(alphas, paths["alphas"])
+    write_sector_config(candidate_curves(curves, ctx), paths["sector_config"])
+    write_yaml(candidate_model_config(alphas, ctx), paths["model_config"])
+
+    print(f"Panel             {len(panel.z):,} observations, {int(panel.y.sum()):,} defaults "
+          f"({panel.dropped:,} rows dropped)  read {t1 - t0:.1f}s  fit ({args.form}) {t2 - t1:.1f}s")
+    print(curves.to_string(index=False))
+    print(alphas.to_string(index=False))
+    for kind, path in paths.items():
+        print(f"Calibration {kind:<14} {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# python run_scenarios.py --input input_data/sample_input.xlsx --scenarios config/scenarios.yaml
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+from sme_credit.helpers.cache_helper import load_context_cached
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import ensure_dir, make_output_path, write_table
+from sme_credit.helpers.store_helper import read_input
+from sme_credit.helpers.scenario_helper import ScenarioEngine, migrations_long, scenario_grid, scenario_summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the portfolio under a grid of config overrides.")
+    parser.add_argument("--input", default="input_data/sample_input.xlsx", help="Path to input Excel/CSV/Parquet file or run_store.py store")
+    parser.add_argument("--sheet", default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--sector-col", default="sector", help="Column name for sector")
+    parser.add_argument("--scenarios", default="config/scenarios.yaml",
+                        help="YAML with a `grid:` of override values and/or named `scenarios:`")
+    parser.add_argument("--use-utc", action="store_true", help="Use UTC time for output timestamp")
+    parser.add_argument("--output-prefix", default="scenarios", help="Prefix for output file names")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild configs/priors from source instead of the .cache/ compiled bundle")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    output_dir = project_root / "output_data"
+    ctx = load_context(project_root) if args.no_cache else load_context_cached(project_root)
+
+    spec_path = Path(args.scenarios)
+    spec = load_yaml(spec_path if spec_path.is_absolute() else project_root / spec_path) or {}
+    scenarios = {**scenario_grid(spec.get("grid") or {}), **(spec.get("scenarios") or {})}
+    if not scenarios:
+        parser.error(f"No scenarios defined in {args.scenarios}")
+
+    input_path = Path(args.input)
+    if not input_path.is_absolute():
+        input_path = project_root / input_path
+    df = read_input(input_path, sheet=args.sheet)
+
+    results = ScenarioEngine(df, args.sector_col, ctx).run(scenarios)
+
+    ensure_dir(output_dir)
+    summary_path = make_output_path(output_dir, f"{args.output_prefix}_summary", use_utc=args.use_utc)
+    migrations_path = make_output_path(output_dir, f"{args.output_prefix}_migrations", use_utc=args.use_utc)
+    summary = scenario_summary(results)
+    write_table(summary, summary_path)
+    write_table(migrations_long(results), migrations_path)
+    print(summary.to_string(index=False))
+    print(f"Scenario summary  {summary_path}  (scenarios: {len(summary)})")
+    print(f"Migrations        {migrations_path}")
+
+if __name__ == "__main__":
+    main()
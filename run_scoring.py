@@ -17,53 +17,253 @@ python .\run_scoring.py `
 from __future__ import annotations
 import argparse
 from pathlib import Path
-import pandas as pd
 
-from sme_credit.helpers import load_yaml
-from sme_credit.helpers.quant_helper import load_priors
-from sme_credit.helpers.io_helper import ensure_dir, make_output_path
-from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.cache_helper import load_context_cached
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import (
+    OUTPUT_FORMATS, ChunkWriter, ensure_dir, make_output_path, iter_input_chunks, read_table, write_table
+)
+from sme_credit.helpers.batch_helper import prior_coverage, score_many, scoring_input_columns, scoring_input_dtypes
+from sme_credit.helpers.explain_helper import EXPLAIN_COLUMNS
+from sme_credit.helpers.incremental_helper import FINGERPRINT_COL, IncrementalScorer
+from sme_credit.helpers.ingest_helper import (
+    count_by_source, is_multi_input, iter_source_chunks, read_sources, resolve_sources, source_report
+)
+from sme_credit.helpers.portfolio_helper import DEFAULT_TOP_N, PortfolioAccumulator
+from sme_credit.helpers.profile_helper import RunProfiler, format_report
+from sme_credit.helpers.results_helper import summary_path
+from sme_credit.helpers.store_helper import is_store, iter_store_chunks, open_store
+from sme_credit.helpers.validation_helper import validate_frame
+from sme_credit.helpers.vector_helper import OUTPUT_COLUMNS
+from sme_credit.helpers.parallel_helper import ParallelScorer
+
+def _print_coverage(coverage: dict) -> None:
+    print("Prior coverage    " + "  ".join(f"{k}={v}" for k, v in coverage.items()))
+
+def _print_incremental(counts: dict) -> None:
+    print("Incremental       " + "  ".join(f"{k}={v}" for k, v in counts.items()))
+
+def _print_portfolio(info: dict) -> None:
+    ew_pd = "n/a" if info["ew_pd"] is None else f"{info['ew_pd']:.4%}"
+    conc = "  ".join(f"{k}={v:.4f}" for k, v in info["concentration"].items() if v is not None)
+    print(f"Portfolio         rows={info['rows']}  exposure={info['exposure']:,.0f}  ew_pd={ew_pd}  {conc}")
 
 def main():
     parser = argparse.ArgumentParser(description="SME Credit PD batch scoring (production-ready).")
-    parser.add_argument("--input", default="input_data/sample_input.xlsx", help="Path to input Excel file")
-    parser.add_argument("--sheet", default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--input", default="input_data/sample_input.xlsx",
+                        help="Input Excel/CSV/Parquet file, a store built by run_store.py, "
+                             "or a directory, glob or manifest (.yaml/.lst) of files")
+    parser.add_argument("--sheet", default=None,
+                        help="Excel sheet name (default: first sheet; every sheet for directory/glob/manifest input)")
+    parser.add_argument("--reader-workers", type=int, default=4,
+                        help="Parse up to N input files/sheets concurrently for directory/glob/manifest input")
+    parser.add_argument("--reader-pool", choices=["auto", "thread", "process"], default="auto",
+                        help="Pool for --reader-workers (auto: processes for workbooks, threads otherwise)")
     parser.add_argument("--sector-col", default="sector", help="Column name for sector")
     parser.add_argument("--use-utc", action="store_true", help="Use UTC time for output timestamp")
-    parser.add_argument("--output-prefix", default="scored_output", help="Prefix for output CSV name")
+    parser.add_argument("--output-prefix", default="scored_output", help="Prefix for output file name")
+    parser.add_argument("--output-format", choices=sorted(OUTPUT_FORMATS), default="csv",
+                        help="Output file format (default: csv)")
+    parser.add_argument("--float-dtype", choices=["float64", "float32"], default=None,
+                        help="Store the score columns as float32/float64 (default: as computed)")
+    parser.add_argument("--categorical-rating", action="store_true",
+                        help="Store Rating as an ordered categorical over the scale labels (+NR)")
+    parser.add_argument("--outputs-only", action="store_true",
+                        help="Write only the score columns (plus --key-col, if given) instead of all inputs")
+    parser.add_argument("--project-columns", action="store_true",
+                        help="Read only the columns the scorer needs (plus --keep-cols)")
+    parser.add_argument("--keep-cols", default="",
+                        help="Comma-separated extra columns to carry through with --project-columns")
+    parser.add_argument("--chunk-size", type=int, default=0,
+                        help="Stream the input in chunks of N rows (bounded memory); 0 = load whole file")
+    parser.add_argument("--validate", action="store_true",
+                        help="Drop rows failing validation and write them to <output>_rejects.<ext>")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild configs/priors from source instead of the .cache/ compiled bundle")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Score partitions in N worker processes (default: 1, in-process)")
+    parser.add_argument("--key-col", default=None,
+                        help="Firm key column; adds a _fingerprint column so a later run can use --previous")
+    parser.add_argument("--previous", default=None,
+                        help="Earlier scored output (with --key-col and _fingerprint); only changed rows are re-scored")
+    parser.add_argument("--exposure-col", default=None,
+                        help="Exposure column for the portfolio summary (default: every firm counts 1)")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N,
+                        help="Riskiest (and, with --exposure-col, largest) firms listed in the portfolio summary")
+    parser.add_argument("--explain", action="store_true",
+                        help="Add per-term Z_adj contributions and distances to the next rating notch up/down")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time each stage (load/validate/score/write) and write <output>_report.json")
+    parser.add_argument("--profile-cprofile", action="store_true",
+                        help="With the report, dump a cProfile of the whole run to <output>_report.prof")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With the report, trace allocations (tracemalloc; slower) and list the top sites")
     args = parser.parse_args()
+    if args.previous and not args.key_col:
+        parser.error("--previous requires --key-col")
 
     project_root = Path(__file__).resolve().parent
-    config_dir   = project_root / "config"
-    input_dir    = project_root / "input_data"
     output_dir   = project_root / "output_data"
+    prof = RunProfiler(enabled=args.profile or args.profile_cprofile or args.profile_memory,
+                       cprofile=args.profile_cprofile, trace_memory=args.profile_memory)
 
-    model_cfg     = load_yaml(config_dir / "model_config.yaml")
-    rating_bands  = load_yaml(config_dir / "rating_scale.yaml")["ratings"]
-    sector_curves = load_yaml(config_dir / "sector_config.yaml")["sectors"]
+    # configs, sector curves, rating scale and priors resolved once per run
+    with prof.stage("context"):
+        ctx = load_context(project_root) if args.no_cache else load_context_cached(project_root)
 
-    bayes_file = model_cfg["bayes"]["BAYES_XLSX"]
-    bayes_sheet = model_cfg["bayes"]["BAYES_SHEET"]
-    bayes_path = Path(bayes_file)
-    if not bayes_path.is_absolute():
-        bayes_path = project_root / bayes_path
+    def _resolve(path: str) -> Path:
+        # relative paths are taken from the project root, so the script runs from anywhere
+        path = Path(path)
+        return path if path.is_absolute() else project_root / path
 
-    prior_lookup = load_priors(str(bayes_path), sheet=bayes_sheet)
+    input_path = _resolve(args.input)
 
-    input_path = Path(args.input)
-    if not input_path.is_absolute():
-        input_path = project_root / input_path
-    if args.sheet:
-        df = pd.read_excel(input_path, sheet_name=args.sheet)
-    else:
-        df = pd.read_excel(input_path)
+    store, sources = is_store(input_path), None
+    if not store and is_multi_input(input_path):
+        sources = resolve_sources(input_path, sheets=[args.sheet] if args.sheet else None)
+        print(f"Input sources     {len(sources)} file/sheet(s)")
 
-    scored_df = score_many(df, args.sector_col, model_cfg, sector_curves, rating_bands, prior_lookup)
+    columns = None
+    if args.project_columns:
+        keep = [c.strip() for c in args.keep_cols.split(",") if c.strip()]
+        keep += [c for c in (args.key_col, args.exposure_col) if c]
+        columns = scoring_input_columns(args.sector_col, keep=keep)
 
     ensure_dir(output_dir)
-    out_path = make_output_path(output_dir, args.output_prefix, ext=".csv", use_utc=args.use_utc)
-    scored_df.to_csv(out_path, index=False)
-    print(f"Scoring complete  {out_path}  (rows: {len(scored_df)})")
+    ext = OUTPUT_FORMATS[args.output_format]
+    out_path = make_output_path(output_dir, args.output_prefix, ext=ext, use_utc=args.use_utc)
+    rejects_path = out_path.with_name(f"{out_path.stem}_rejects{ext}")
+
+    scorer = ParallelScorer(ctx, args.workers) if args.workers > 1 else None
+    if args.key_col:
+        previous = None
+        if args.previous:
+            with prof.stage("previous"):
+                # attribution columns too when present, so --explain only explains rescored rows
+                previous = read_table(_resolve(args.previous),
+                                      columns=[args.key_col, FINGERPRINT_COL, *OUTPUT_COLUMNS,
+                                               *(EXPLAIN_COLUMNS if args.explain else [])])
+        scorer = IncrementalScorer(ctx, args.key_col, previous, scorer=scorer)
+
+    schema = {"float_dtype": args.float_dtype, "categorical_rating": args.categorical_rating,
+              "outputs_only": args.outputs_only, "key_col": args.key_col, "explain": args.explain}
+    float_columns = [*OUTPUT_COLUMNS, *(EXPLAIN_COLUMNS if args.explain else [])]
+
+    coverage, source_rows, source_rejects = {}, {}, {}
+    portfolio = PortfolioAccumulator(ctx.rating_scale, args.sector_col, exposure_col=args.exposure_col,
+                                     key_col=args.key_col, top_n=args.top_n)
+
+    def _add(total: dict, counts: dict) -> None:
+        for k, v in counts.items():
+            total[k] = total.get(k, 0) + v
+
+    def score(frame):
+        """Validate (optional) and score one frame; returns (scored, rejects or None)."""
+        rejects, positions, n_input = None, None, len(frame)
+        if sources is not None:
+            _add(source_rows, count_by_source(frame))
+        if args.validate:
+            with prof.stage("validate", rows=len(frame)):
+                valid, rejects = validate_frame(frame)
+                frame = frame[valid]
+                positions = valid.nonzero()[0]
+            if sources is not None:
+                _add(source_rejects, count_by_source(rejects))
+        # from the inputs, since --outputs-only drops Country/sector from the result
+        _add(coverage, prior_coverage(frame, args.sector_col, ctx))
+        with prof.stage("score", rows=len(frame)):
+            if scorer is not None:
+                scored = scorer.score(frame, args.sector_col, **schema)
+            else:
+                scored = score_many(frame, args.sector_col, ctx, **schema)
+        # sector/Country from the inputs (scored rows keep input order), as for coverage
+        portfolio.update(frame, scored["PD_final"], positions=positions, n_input=n_input)
+        return scored, rejects
+
+    def score_store():
+        """--workers over a store: each worker maps its own row range, nothing is pickled out."""
+        with prof.stage("score") as rec:
+            result = scorer.score_store(input_path, args.sector_col, validate=args.validate,
+                                        columns=columns, accumulator=portfolio, **schema)
+            scored, rejects = result if args.validate else (result, None)
+            rec["rows"] += len(scored)
+        _add(coverage, prior_coverage(open_store(input_path, ["Country", args.sector_col]), args.sector_col, ctx))
+        if rejects is not None:
+            for k, v in prior_coverage(rejects, args.sector_col, ctx).items():
+                coverage[k] -= v
+        return scored, rejects
+
+    try:
+        if args.chunk_size > 0:
+            if store:
+                chunks = iter_store_chunks(input_path, args.chunk_size, columns=columns)
+            elif sources is not None:
+                chunks = iter_source_chunks(sources, args.chunk_size, columns=columns)
+            else:
+                chunks = iter_input_chunks(input_path, args.chunk_size, sheet=args.sheet, columns=columns)
+            blank_dtypes = scoring_input_dtypes(args.sector_col)
+            with ChunkWriter(out_path, float_dtype=args.float_dtype, float_columns=float_columns,
+                             blank_dtypes=blank_dtypes) as writer, \
+                    ChunkWriter(rejects_path, blank_dtypes=blank_dtypes) as rejects_writer:
+                for chunk in prof.iter("load", chunks):
+                    scored, rejects = score(chunk)
+                    with prof.stage("write", rows=len(scored)):
+                        writer.write(scored)
+                        if rejects is not None and len(rejects):
+                            rejects_writer.write(rejects)
+            n_rows, n_rejects = writer.rows, rejects_writer.rows
+        else:
+            if store and isinstance(scorer, ParallelScorer):
+                scored_df, rejects_df = score_store()
+            else:
+                with prof.stage("load") as rec:
+                    if store:
+                        df = open_store(input_path, columns=columns)
+                    elif sources is not None:
+                        df = read_sources(sources, columns=columns, workers=args.reader_workers,
+                                          pool=args.reader_pool)
+                    else:
+                        df = read_table(input_path, sheet=args.sheet, columns=columns)
+                    rec["rows"] += len(df)
+                scored_df, rejects_df = score(df)
+            with prof.stage("write", rows=len(scored_df)):
+                write_table(scored_df, out_path, float_dtype=args.float_dtype, float_columns=float_columns)
+                if rejects_df is not None and len(rejects_df):
+                    write_table(rejects_df, rejects_path)
+            n_rows, n_rejects = len(scored_df), 0 if rejects_df is None else len(rejects_df)
+    finally:
+        if scorer is not None:
+            scorer.close()
+
+    portfolio_path = portfolio.write_json(summary_path(out_path))
+    if args.output_format == "parquet":
+        portfolio.write_parquet(portfolio_path.with_suffix(".parquet"))
+    print(f"Scoring complete  {out_path}  (rows: {n_rows})")
+    _print_coverage(coverage)
+    _print_portfolio(portfolio.to_dict())
+    print(f"Portfolio summary {portfolio_path}")
+    if isinstance(scorer, IncrementalScorer):
+        _print_incremental(scorer.counts)
+    if n_rejects:
+        print(f"Rejected rows     {rejects_path}  (rows: {n_rejects})")
+    if sources is not None:
+        per_source = source_report(sources, source_rows, source_rejects)
+        sources_path = out_path.with_name(f"{out_path.stem}_sources.csv")
+        write_table(per_source, sources_path)
+        print(per_source.to_string(index=False))
+        print(f"Per-source counts {sources_path}")
+
+    if prof.enabled:
+        prof.meta.update({
+            "input": str(input_path), "output": str(out_path),
+            "rows_out": n_rows, "rejects": n_rejects, "workers": args.workers,
+            "chunk_size": args.chunk_size, "output_format": args.output_format,
+            "prior_coverage": coverage,
+            **({"incremental": scorer.counts} if isinstance(scorer, IncrementalScorer) else {}),
+        })
+        report_path = out_path.with_name(f"{out_path.stem}_report.json")
+        print(format_report(prof.write_report(report_path)))
+        print(f"Run report        {report_path}")
 
 if __name__ == "__main__":
     main()
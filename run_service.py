@@ -0,0 +1,40 @@
+# python run_service.py                       # JSON-lines on stdin/stdout
+# python run_service.py --tcp 127.0.0.1:8765  # JSON-lines over TCP
+#
+# request:  {"id": 1, "record": {"revenue": ..., "total_assets": ..., "Country": "UAE", "sector": "Banks"}}
+# reply:    {"id": 1, "result": {"PD_final": ..., "Rating": "BB", ...}}
+# batch:    {"id": 2, "records": [{...}, {...}]}
+# stats:    {"id": 3, "op": "stats"}
+
+from __future__ import annotations
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from sme_credit.helpers.cache_helper import load_context_cached
+from sme_credit.helpers.service_helper import ScoringService, serve_stdio, serve_tcp
+
+def main():
+    parser = argparse.ArgumentParser(description="SME Credit PD scoring service (warm configs, micro-batching).")
+    parser.add_argument("--tcp", default=None, help="Listen on HOST:PORT instead of stdin/stdout")
+    parser.add_argument("--sector-col", default="sector", help="Record key holding the sector")
+    parser.add_argument("--max-batch", type=int, default=256, help="Largest coalesced batch")
+    parser.add_argument("--max-wait-ms", type=float, default=1.0,
+                        help="How long a request may wait for others to batch with")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    ctx = load_context_cached(project_root)
+    service = ScoringService(ctx, sector_col=args.sector_col,
+                             max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(":")
+        print(f"Scoring service listening on {host or '127.0.0.1'}:{port}", file=sys.stderr)
+        asyncio.run(serve_tcp(service, host or "127.0.0.1", int(port)))
+    else:
+        asyncio.run(serve_stdio(service))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# python run_store.py --input input_data/sample_input.xlsx --store input_data/sample_input.store
+
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+
+from sme_credit.helpers.batch_helper import scoring_input_columns
+from sme_credit.helpers.ingest_helper import is_multi_input, read_sources, resolve_sources
+from sme_credit.helpers.io_helper import read_table
+from sme_credit.helpers.store_helper import store_manifest, write_store
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert an input book once into a memory-mapped columnar store for run_scoring.py "
+                    "/ run_scenarios.py / run_stress.py --input <store>.")
+    parser.add_argument("--input", default="input_data/sample_input.xlsx",
+                        help="Input Excel/CSV/Parquet file, or a directory, glob or manifest (.yaml/.lst) of them")
+    parser.add_argument("--sheet", default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--store", default=None, help="Store directory (default: <input stem>.store next to the input)")
+    parser.add_argument("--sector-col", default="sector", help="Column name for sector")
+    parser.add_argument("--project-columns", action="store_true",
+                        help="Store only the columns the scorer needs (plus --keep-cols)")
+    parser.add_argument("--keep-cols", default="",
+                        help="Comma-separated extra columns to keep with --project-columns")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    input_path = Path(args.input)
+    if not input_path.is_absolute():
+        input_path = project_root / input_path
+    store_path = Path(args.store) if args.store else input_path.with_name(f"{input_path.stem}.store")
+    if not store_path.is_absolute():
+        store_path = project_root / store_path
+
+    columns = None
+    if args.project_columns:
+        keep = [c.strip() for c in args.keep_cols.split(",") if c.strip()]
+        columns = scoring_input_columns(args.sector_col, keep=keep)
+
+    t0 = time.perf_counter()
+    if is_multi_input(input_path):
+        sheets = [args.sheet] if args.sheet else None
+        df = read_sources(resolve_sources(input_path, sheets=sheets), columns=columns)
+    else:
+        df = read_table(input_path, sheet=args.sheet, columns=columns)
+    t1 = time.perf_counter()
+    write_store(df, store_path)
+    t2 = time.perf_counter()
+
+    manifest = store_manifest(store_path)
+    size_mb = sum(f.stat().st_size for f in store_path.iterdir()) / 2**20
+    encoded = [c["name"] for c in manifest["columns"] if c["kind"] == "dict"]
+    print(f"Store written     {store_path}  (rows: {manifest['rows']}, columns: {len(manifest['columns'])}, "
+          f"{size_mb:.1f} MB)")
+    print(f"Dictionary-coded  {', '.join(encoded) or '-'}")
+    print(f"Parse {t1 - t0:.2f}s  write {t2 - t1:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# python run_stress.py --input input_data/sample_input.xlsx --scenarios config/stress_scenarios.yaml
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from sme_credit.helpers.cache_helper import load_context_cached
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import ensure_dir, make_output_path, write_table
+from sme_credit.helpers.scenario_helper import migrations_long
+from sme_credit.helpers.store_helper import read_input
+from sme_credit.helpers.stress_helper import StressEngine, load_stress_spec, rating_distribution, stress_summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Run YAML-declared stress scenarios over the portfolio.")
+    parser.add_argument("--input", default="input_data/sample_input.xlsx", help="Path to input Excel/CSV/Parquet file or run_store.py store")
+    parser.add_argument("--sheet", default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--sector-col", default="sector", help="Column name for sector")
+    parser.add_argument("--scenarios", default="config/stress_scenarios.yaml", help="Stress scenario YAML")
+    parser.add_argument("--exposure-col", default=None,
+                        help="Exposure (EAD) column for expected loss (default: 1 per firm)")
+    parser.add_argument("--lgd-col", default=None, help="Per-firm LGD column (default: `lgd` from the YAML)")
+    parser.add_argument("--use-utc", action="store_true", help="Use UTC time for output timestamp")
+    parser.add_argument("--output-prefix", default="stress", help="Prefix for output file names")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild configs/priors from source instead of the .cache/ compiled bundle")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    output_dir = project_root / "output_data"
+    ctx = load_context(project_root) if args.no_cache else load_context_cached(project_root)
+
+    spec_path = Path(args.scenarios)
+    scenarios, lgd = load_stress_spec(load_yaml(spec_path if spec_path.is_absolute() else project_root / spec_path) or {})
+
+    input_path = Path(args.input)
+    if not input_path.is_absolute():
+        input_path = project_root / input_path
+    df = read_input(input_path, sheet=args.sheet)
+
+    exposure = pd.to_numeric(df[args.exposure_col]).to_numpy() if args.exposure_col else None
+    if args.lgd_col:
+        lgd = pd.to_numeric(df[args.lgd_col]).to_numpy()
+    results = StressEngine(df, args.sector_col, ctx, exposure=exposure, lgd=lgd).run(scenarios)
+
+    ensure_dir(output_dir)
+    paths = {kind: make_output_path(output_dir, f"{args.output_prefix}_{kind}", use_utc=args.use_utc)
+             for kind in ("summary", "ratings", "migrations")}
+    summary = stress_summary(results)
+    write_table(summary, paths["summary"])
+    write_table(rating_distribution(results).reset_index(), paths["ratings"])
+    write_table(migrations_long({k: v for k, v in results.items() if k != "base"}), paths["migrations"])
+    print(summary.to_string(index=False))
+    for kind, path in paths.items():
+        print(f"Stress {kind:<10} {path}")
+
+if __name__ == "__main__":
+    main()
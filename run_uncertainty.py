@@ -0,0 +1,57 @@
+# python run_uncertainty.py --input input_data/sample_input.xlsx --spec config/uncertainty.yaml
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+from sme_credit.helpers.cache_helper import load_context_cached
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import ensure_dir, make_output_path, write_table
+from sme_credit.helpers.store_helper import read_input
+from sme_credit.helpers.uncertainty_helper import UncertaintyEngine, uncertainty_summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo PD and rating intervals for uncertain or defaulted inputs.")
+    parser.add_argument("--input", default="input_data/sample_input.xlsx", help="Path to input Excel/CSV/Parquet file or run_store.py store")
+    parser.add_argument("--sheet", default=None, help="Excel sheet name (default: first sheet)")
+    parser.add_argument("--sector-col", default="sector", help="Column name for sector")
+    parser.add_argument("--spec", default="config/uncertainty.yaml", help="Uncertainty spec YAML")
+    parser.add_argument("--draws", type=int, default=None, help="Draws per firm (default: from the spec)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (default: from the spec)")
+    parser.add_argument("--memory-mb", type=float, default=None,
+                        help="Memory budget per process for the (firms x draws) block (default: from the spec)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the simulation blocks")
+    parser.add_argument("--key-col", default="company", help="Firm identifier column copied to the output")
+    parser.add_argument("--use-utc", action="store_true", help="Use UTC time for output timestamp")
+    parser.add_argument("--output-prefix", default="uncertainty", help="Prefix for output file names")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rebuild configs/priors from source instead of the .cache/ compiled bundle")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).resolve().parent
+    output_dir = project_root / "output_data"
+    ctx = load_context(project_root) if args.no_cache else load_context_cached(project_root)
+
+    spec_path = Path(args.spec)
+    spec = load_yaml(spec_path if spec_path.is_absolute() else project_root / spec_path) or {}
+
+    input_path = Path(args.input)
+    if not input_path.is_absolute():
+        input_path = project_root / input_path
+    df = read_input(input_path, sheet=args.sheet)
+
+    engine = UncertaintyEngine(df, args.sector_col, ctx, spec)
+    result = engine.run(draws=args.draws, seed=args.seed, memory_mb=args.memory_mb, workers=args.workers)
+    keys = [c for c in (args.key_col, args.sector_col, "Country") if c in df.columns]
+    result = df[keys].reset_index(drop=True).join(result)
+
+    ensure_dir(output_dir)
+    out_path = make_output_path(output_dir, args.output_prefix, use_utc=args.use_utc)
+    write_table(result, out_path)
+    for name, value in uncertainty_summary(result).items():
+        print(f"{name:<22} {value:.6g}" if isinstance(value, float) else f"{name:<22} {value}")
+    print(f"Uncertainty written to {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,36 @@
-from .config_helper import load_yaml
-from .quant_helper import (
-    map_pd_to_rating, rating_to_pd, load_priors, get_prior_pd, get_bayes_alpha
-)
-from .io_helper import ensure_dir, timestamp_tag, make_output_path
+from __future__ import annotations
+from importlib import import_module
+
+# Public helpers resolve on first attribute access (PEP 562), so importing the
+# package (e.g. via sme_credit.core) does not load pandas, yaml or openpyxl.
+_EXPORTS = {
+    "load_yaml": "config_helper",
+    "RatingScale": "quant_helper",
+    "PriorTable": "quant_helper",
+    "map_pd_to_rating": "quant_helper",
+    "rating_to_pd": "quant_helper",
+    "load_priors": "quant_helper",
+    "get_prior_pd": "quant_helper",
+    "get_bayes_alpha": "quant_helper",
+    "ensure_dir": "io_helper",
+    "timestamp_tag": "io_helper",
+    "make_output_path": "io_helper",
+    "ScoringContext": "context_helper",
+    "load_context": "context_helper",
+    "load_context_cached": "cache_helper",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *__all__])
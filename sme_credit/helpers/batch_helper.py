@@ -1,94 +1,160 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
-from typing import Union, Tuple
+from typing import Callable, Iterable, Iterator, Optional, Union, Tuple
 
 # keep relative imports (works when package is run with -m or installed in editable mode)
-from ..core import small_firm_score
-from .quant_helper import get_prior_pd
+from .context_helper import ScoringContext, as_context
+from .explain_helper import explain_frame
+from .quant_helper import RatingScale, get_prior_pd
+from .validation_helper import REQUIRED_NUMERIC, validate_frame
+from .vector_helper import INPUT_DEFAULTS, OUTPUT_COLUMNS, apply_output_schema, attach_outputs, score_frame
+
+
+def scoring_input_columns(sector_col: str, keep: Iterable[str] = ()) -> list:
+    """Every input field small_firm_score reads, plus any `keep` pass-through columns."""
+    cols = [*REQUIRED_NUMERIC, *INPUT_DEFAULTS, "Country", "Country Rating", "country_rating", sector_col]
+    return list(dict.fromkeys([*keep, *cols]))
+
+
+def scoring_input_dtypes(sector_col: str) -> dict:
+    """Arrow type per scoring input, for ChunkWriter(blank_dtypes=...) when a chunk leaves one blank."""
+    numeric = {c: "float64" for c in [*REQUIRED_NUMERIC, *INPUT_DEFAULTS]}
+    return {**numeric, **{c: "string" for c in ("Country", "Country Rating", "country_rating", sector_col)}}
+
+
+def prior_coverage(df: pd.DataFrame, sector_col: str, ctx: ScoringContext) -> dict:
+    """Rows per prior fallback level (exact / sector_wildcard / global_wildcard / default)."""
+    countries = df["Country"] if "Country" in df.columns else [""] * len(df)
+    sectors = df[sector_col] if sector_col in df.columns else ["Industrials"] * len(df)
+    return ctx.prior_table.coverage(countries, sectors)
+
+
+def _score_rowwise(df: pd.DataFrame, sector_col: str, ctx: ScoringContext) -> pd.DataFrame:
+    """Reference path: one small_firm_score call per row."""
+    from ..core import small_firm_score
+
+    records = []
+    for _, row in df.iterrows():
+        sector = row.get(sector_col, "Industrials")
+        country = (row.get("Country", "") or "").upper().strip()
+        prior = get_prior_pd(country, sector, ctx.prior_lookup)
+        data = {**INPUT_DEFAULTS, **row.to_dict(), "sector_prior_pd": prior}
+        rec = {
+            **row,
+            **small_firm_score(data, sector, ctx),
+        }
+        records.append(rec)
+    return pd.DataFrame(records)
 
 
 def score_many(
     df_or_list: Union[pd.DataFrame, list],
     sector_col: str,
-    cfg: dict,
-    sector_curves: dict,
-    rating_bands: list,
-    prior_lookup: dict,
+    cfg: Union[dict, ScoringContext],
+    sector_curves: Optional[dict] = None,
+    rating_bands: Union[list, RatingScale, None] = None,
+    prior_lookup: Optional[dict] = None,
     validate: bool = False,
+    engine: str = "vectorized",
+    float_dtype: Optional[str] = None,
+    categorical_rating: bool = False,
+    outputs_only: bool = False,
+    key_col: Optional[str] = None,
+    accumulator=None,
+    explain: bool = False,
 ) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
     """
     Batch-score rows. If validate=True, returns (scored_df, rejects_df),
-    otherwise returns scored_df only.
+    otherwise returns scored_df only. Rejects carry `_error` and per-rule
+    `_reason_codes` (see validation_helper.REASON_CODES).
+
+    cfg may be a prebuilt ScoringContext, in which case the remaining
+    config arguments are not needed.
+
+    engine="vectorized" (default) scores whole columns at once;
+    engine="rowwise" calls small_firm_score per row (reference implementation).
+
+    Output schema: float_dtype ("float32"/"float64") for the numeric outputs,
+    categorical_rating for an ordered Rating categorical over the scale labels
+    plus NR. Input columns are shared copy-on-write (see attach_outputs);
+    outputs_only=True keeps just `key_col` (if given) and the outputs.
+
+    accumulator: optional portfolio_helper.PortfolioAccumulator updated with
+    the scored rows (rejects only advance its row positions).
+
+    explain=True appends explain_helper.EXPLAIN_COLUMNS (per-term Z_adj
+    contributions and distances to the neighbouring rating bands).
     """
-    df = pd.DataFrame(df_or_list) if isinstance(df_or_list, list) else df_or_list.copy()
-
-    # lightweight schema for validation (no extra deps)
-    required_numeric = [
-        "revenue",
-        "total_assets",
-        "total_liabilities",
-        "ebit",
-        "retained_earnings",
-        "working_capital",
-        "market_value_equity",
-    ]
-
-    def _is_number(x) -> bool:
-        try:
-            return pd.notna(x) and float(x) == float(x)
-        except Exception:
-            return False
-
-    defaults = {
-        "trade_credit": 0.5,
-        "utility_pay": 0.5,
-        "bank_tx": 0.5,
-        "tax_compliance": 0.5,
-        "digital_footprint": 0.5,
-        "fcf_vol_ratio": 0.2,
-        "cf_int_cov": 2.0,
-        "revenue_quality": 0.5,
-        "business_age_years": 6,
-        "mgmt_track_record": 0.5,
-        "industry_survival_rate": 0.5,
-        "geo_risk": 0.5,
-    }
+    if engine not in ("vectorized", "rowwise"):
+        raise ValueError(f"Unknown scoring engine: {engine!r}")
+    df = pd.DataFrame(df_or_list) if isinstance(df_or_list, list) else df_or_list
+    ctx = as_context(cfg, sector_curves, rating_bands, prior_lookup)
 
-    records = []
-    rejects = []
+    n_input = len(df)
+    if validate:
+        valid, rejects_df = validate_frame(df)
+        df = df[valid]
 
-    for _, row in df.iterrows():
-        # --- optional validation ---
-        if validate:
-            missing_or_bad = [c for c in required_numeric if not _is_number(row.get(c))]
-            errs = []
-            if missing_or_bad:
-                errs.append(f"non-numeric/NaN: {missing_or_bad}")
-            ta = row.get("total_assets", 0)
-            try:
-                if float(ta) == 0:
-                    errs.append("total_assets==0")
-            except Exception:
-                errs.append("total_assets not numeric")
-            if errs:
-                reject = row.to_dict()
-                reject["_error"] = "; ".join(errs)
-                rejects.append(reject)
-                continue
-
-        # --- scoring path ---
-        sector = row.get(sector_col, "Industrials")
-        country = (row.get("Country", "") or "").upper().strip()
-        prior = get_prior_pd(country, sector, prior_lookup)
-        data = {**defaults, **row.to_dict(), "sector_prior_pd": prior}
-        rec = {
-            **row,
-            **small_firm_score(data, sector, cfg, sector_curves, rating_bands, prior_lookup),
-        }
-        records.append(rec)
+    keep = ([key_col] if key_col else []) if outputs_only else None
+    if engine == "rowwise":
+        scored_df = _score_rowwise(df, sector_col, ctx)
+        scored_df = apply_output_schema(scored_df, ctx.rating_scale, float_dtype, categorical_rating)
+        if keep is not None:
+            scored_df = scored_df[[c for c in keep if c in df.columns] + OUTPUT_COLUMNS]
+        if explain:
+            scored_df = attach_outputs(scored_df, explain_frame(df, sector_col, ctx).reset_index(drop=True))
+    else:
+        outputs = score_frame(df, sector_col, ctx, float_dtype=float_dtype, categorical_rating=categorical_rating,
+                              explain=explain)
+        scored_df = attach_outputs(df, outputs, keep=keep)
+
+    if accumulator is not None:
+        positions = np.flatnonzero(valid) if validate else None
+        accumulator.update(df, scored_df["PD_final"], positions=positions, n_input=n_input)
 
-    scored_df = pd.DataFrame(records)
     if validate:
-        rejects_df = pd.DataFrame(rejects)
         return scored_df, rejects_df
     return scored_df
+
+
+def score_stream(
+    reader: Iterable[pd.DataFrame],
+    sector_col: str,
+    ctx: ScoringContext,
+    validate: bool = False,
+    scorer=None,
+    progress: Optional[Callable[[int], None]] = None,
+    accumulator=None,
+) -> Iterator[Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]]:
+    """
+    Score an iterable of DataFrame chunks lazily, one chunk at a time.
+    Yields what score_many returns for each chunk, so only a single chunk
+    (plus its scores) is held in memory while the caller writes it out.
+
+    scorer: optional parallel_helper.ParallelScorer used instead of
+    in-process score_many.
+    progress: optional callback, called after each chunk with the number
+    of input rows processed so far.
+    accumulator: optional PortfolioAccumulator fed every chunk, so the
+    portfolio aggregates are complete once the stream is exhausted.
+    """
+    done = 0
+    extra = {} if accumulator is None else {"accumulator": accumulator}
+    for chunk in reader:
+        if scorer is not None:
+            result = scorer.score(chunk, sector_col, validate=validate, **extra)
+        else:
+            result = score_many(chunk, sector_col, ctx, validate=validate, **extra)
+        done += len(chunk)
+        if progress is not None:
+            progress(done)
+        yield result
+
+
+def iter_frame_chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Slice an in-memory frame into chunks of at most chunk_size rows (views, no copies)."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
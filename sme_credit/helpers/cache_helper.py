@@ -0,0 +1,100 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import List, Optional
+
+from .config_helper import load_yaml
+from .context_helper import ScoringContext, load_context
+
+# bump when ScoringContext/RatingScale/PriorTable change shape
+CACHE_VERSION = 2
+CACHE_DIRNAME = ".cache"
+# model_config.yaml content hash -> priors workbook it names, so a warm load never parses YAML
+PRIORS_INDEX = "priors_index.json"
+
+
+def _priors_path(model_path: Path, root: Path, cache: Optional[Path]) -> Path:
+    index = None if cache is None else cache / PRIORS_INDEX
+    digest = hashlib.sha256(model_path.read_bytes()).hexdigest()
+    if index is not None:
+        try:
+            known = json.loads(index.read_text(encoding="utf-8"))
+            if known.get("model_config") == digest:
+                return Path(known["priors"])
+        except (OSError, ValueError, KeyError):
+            pass  # missing or unreadable index: read the YAML below
+    bayes_path = Path(load_yaml(model_path)["bayes"]["BAYES_XLSX"])
+    if not bayes_path.is_absolute():
+        bayes_path = root / bayes_path
+    if index is not None:
+        try:
+            cache.mkdir(parents=True, exist_ok=True)
+            index.write_text(json.dumps({"model_config": digest, "priors": str(bayes_path)}), encoding="utf-8")
+        except OSError:
+            pass
+    return bayes_path
+
+
+def source_files(project_root: str | Path, cache_dir: Optional[str | Path] = None) -> List[Path]:
+    """
+    The config YAMLs and the priors workbook a ScoringContext is built from.
+    With a `cache_dir`, the priors path is remembered there per
+    model_config.yaml content, so only the first call imports yaml.
+    """
+    root = Path(project_root)
+    config_dir = root / "config"
+    bayes_path = _priors_path(config_dir / "model_config.yaml", root,
+                              None if cache_dir is None else Path(cache_dir))
+    return [config_dir / "model_config.yaml",
+            config_dir / "rating_scale.yaml",
+            config_dir / "sector_config.yaml",
+            bayes_path]
+
+
+def fingerprint(paths: List[Path]) -> str:
+    """Cache key over each source file's path, mtime, size and content hash."""
+    h = hashlib.sha256(f"sme-credit-context-v{CACHE_VERSION}".encode())
+    for p in paths:
+        st = p.stat()
+        h.update(str(p.resolve()).encode())
+        h.update(f"{st.st_mtime_ns}:{st.st_size}".encode())
+        h.update(hashlib.sha256(p.read_bytes()).digest())
+    return h.hexdigest()
+
+
+def load_context_cached(project_root: str | Path,
+                        cache_dir: Optional[str | Path] = None) -> ScoringContext:
+    """
+    load_context() backed by an on-disk pickle of the compiled context.
+
+    The entry is keyed by fingerprint() of the sources, so editing any YAML
+    or replacing the priors workbook builds (and stores) a fresh context;
+    stale entries are removed when a new one is written.
+    """
+    root = Path(project_root)
+    cache = Path(cache_dir) if cache_dir is not None else root / CACHE_DIRNAME
+    key = fingerprint(source_files(root, cache))
+    entry = cache / f"context_{key[:32]}.pkl"
+
+    if entry.exists():
+        try:
+            with open(entry, "rb") as f:
+                ctx = pickle.load(f)
+            if isinstance(ctx, ScoringContext):
+                return ctx
+        except Exception:
+            pass  # unreadable entry: rebuild below
+
+    ctx = load_context(root)
+    cache.mkdir(parents=True, exist_ok=True)
+    tmp = entry.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        pickle.dump(ctx, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, entry)
+    for old in cache.glob("context_*.pkl"):
+        if old != entry:
+            old.unlink(missing_ok=True)
+    return ctx
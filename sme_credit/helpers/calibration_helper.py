@@ -0,0 +1,308 @@
+from __future__ import annotations
+import copy
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .context_helper import ScoringContext
+from .quant_helper import GCC_COUNTRIES
+from .vector_helper import _num, _text, score_components
+
+CURVE_FORMS = ("linear", "logistic")
+DEFAULT_FLAG_COL = "default_flag"
+# rows per pass; bounds the temporaries of each pass (and Newton iteration) whatever the panel size
+BLOCK_ROWS = 1_000_000
+MIN_OBS = 1000
+MIN_DEFAULTS = 20
+MAX_ROUNDS = 1000  # curve/alpha alternations for the linear form (on cell moments, no data passes)
+# per sector x alpha-key cell sums behind every linear fit (z = Z_adj, p = prior, y = default flag)
+MOMENTS = ("n", "z", "zz", "p", "pz", "pp", "y", "yz", "yp")
+
+
+class Panel(NamedTuple):
+    """A default panel as flat per-observation arrays; sector/country are codes into the label lists."""
+    z: np.ndarray
+    y: np.ndarray
+    prior: np.ndarray
+    sector: np.ndarray
+    sectors: List[str]
+    country: np.ndarray
+    countries: List[str]
+    dropped: int
+
+
+def _encode(values: pd.Series, labels: Dict[str, int]) -> np.ndarray:
+    """Codes into a label dict shared across chunks (new labels are appended)."""
+    codes, uniques = pd.factorize(values)
+    lookup = np.array([labels.setdefault(u, len(labels)) for u in uniques], dtype="int32")
+    return lookup[codes] if len(uniques) else np.empty(0, dtype="int32")
+
+
+def build_panel(chunks: Iterable[pd.DataFrame], sector_col: str, ctx: ScoringContext,
+                default_col: str = DEFAULT_FLAG_COL, z_col: str = "Z_adj") -> Panel:
+    """
+    Read a historical panel chunk by chunk into compact arrays (about 25
+    bytes per observation). Z_adj comes from `z_col` when present, otherwise
+    from score_components on the raw inputs; the prior is the row's priors
+    cell. Rows without a finite Z_adj or a 0/1 default flag are dropped.
+    """
+    sectors: Dict[str, int] = {}
+    countries: Dict[str, int] = {}
+    parts, dropped = [], 0
+    for chunk in chunks:
+        if default_col not in chunk.columns:
+            raise ValueError(f"Panel has no default flag column {default_col!r}")
+        sector = _text(chunk, sector_col, "Industrials").astype(str)
+        country = _text(chunk, "Country").astype(str).str.upper().str.strip()
+        if z_col in chunk.columns:
+            z, prior = _num(chunk, z_col), ctx.prior_table.resolve(country, sector)
+        else:
+            comps = score_components(chunk, sector_col, ctx)
+            z, prior = comps["Z_adj"], comps["prior_pd"]
+        y = _num(chunk, default_col)
+        ok = np.isfinite(z) & ((y == 0) | (y == 1))
+        dropped += int(len(ok) - ok.sum())
+        parts.append((z[ok], y[ok].astype("int8"), prior[ok],
+                      _encode(sector[ok], sectors), _encode(country[ok], countries)))
+    if not parts or not sum(len(p[0]) for p in parts):
+        raise ValueError("Panel has no usable observations")
+    z, y, prior, s, c = (np.concatenate(cols) for cols in zip(*parts))
+    return Panel(z, y, prior, s, list(sectors), c, list(countries), dropped)
+
+
+def _group_sums(codes: np.ndarray, n_groups: int,
+                columns: Callable[[slice], Tuple[np.ndarray, ...]]) -> np.ndarray:
+    """(n_groups, k) per-group sums of the k arrays `columns(block)` returns, block by block."""
+    total = None
+    for lo in range(0, len(codes), BLOCK_ROWS):
+        block = slice(lo, lo + BLOCK_ROWS)
+        c = codes[block]
+        sums = np.column_stack([np.bincount(c, weights=col, minlength=n_groups) for col in columns(block)])
+        total = sums if total is None else total + sums
+    return total
+
+
+def _ols(sums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-group (slope, intercept) of t on z from (weighted) columns (n, Σz, Σz², Σt, Σzt)."""
+    n, sz, szz, st, szt = sums.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = n*szz - sz*sz
+        slope = np.where(var > 1e-12 * np.maximum(n*szz, 1.0), (n*szt - sz*st) / var, 0.0)
+        intercept = np.where(n > 0, (st - slope*sz) / n, np.nan)
+    return slope, intercept
+
+
+def alpha_key(country: str, alpha_by_country: dict) -> str:
+    """BAYES_ALPHA_BY_COUNTRY key that scoring uses for `country` (GCC members share "GCC")."""
+    return "GCC" if country in GCC_COUNTRIES and "GCC" in alpha_by_country else country
+
+
+def cell_moments(panel: Panel, key_codes: np.ndarray, n_keys: int) -> np.ndarray:
+    """
+    (sectors, alpha keys, 9) array of the per-cell sums MOMENTS, in one
+    pass over the panel. Every linear least-squares fit below (curves,
+    alphas and their joint fit) needs only these, never the rows again.
+    """
+    k = len(panel.sectors)
+    z, y, prior = panel.z, panel.y, panel.prior
+    cells = panel.sector * np.int32(n_keys) + key_codes[panel.country]
+
+    def terms(b):
+        zb, yb, pb = z[b], y[b], prior[b]
+        return np.ones(len(zb)), zb, zb*zb, pb, pb*zb, pb*pb, yb, yb*zb, yb*pb
+    return _group_sums(cells, k * n_keys, terms).reshape(k, n_keys, len(MOMENTS))
+
+
+def fit_lines(moments: np.ndarray, alpha: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-sector least-squares line inside the Bayes blend for the given
+    per-key alphas: (1-alpha)*(slope*z + int) + alpha*prior against the
+    flags, i.e. least squares on (y - alpha*prior)/(1-alpha) with weights
+    (1-alpha)^2. alpha = 0 gives the plain line through the flags.
+    """
+    n, sz, szz, sp, spz, _, sy, syz, _ = np.moveaxis(moments, -1, 0)
+    q = 1.0 - alpha
+    q2 = q*q
+    return _ols(np.stack([(q2*n).sum(1), (q2*sz).sum(1), (q2*szz).sum(1),
+                          (q*(sy - alpha*sp)).sum(1), (q*(syz - alpha*spz)).sum(1)], axis=1))
+
+
+def fit_alphas(moments: np.ndarray, slope: np.ndarray, intercept: np.ndarray) -> np.ndarray:
+    """Per-key alpha minimising the blend's squared error given the lines (NaN without prior spread)."""
+    n, sz, szz, sp, spz, spp, sy, syz, syp = np.moveaxis(moments, -1, 0)
+    s, i = slope[:, None], intercept[:, None]
+    yl, pl, ll = s*syz + i*sy, s*spz + i*sp, s*s*szz + 2*s*i*sz + i*i*n
+    rd, dd = (syp - yl - pl + ll).sum(0), (spp - 2*pl + ll).sum(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dd > 0, np.clip(rd / dd, 0.0, 1.0), np.nan)
+
+
+def _expit(eta: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(eta, -40.0, 40.0)))
+
+
+def fit_logistic(panel: Panel, max_iter: int = 50, tol: float = 1e-8,
+                 ridge: float = 1e-6) -> Dict[str, np.ndarray]:
+    """
+    Logistic PD = 1/(1+exp(-(a + b*Z_adj))) per sector by Newton's method,
+    all sectors in each pass: per-sector gradients and 2x2 Hessians come
+    from bincounts over the panel, so an iteration costs one pass however
+    many sectors there are. Z is centred per sector for conditioning and a
+    tiny ridge keeps sectors without defaults finite. The linear
+    slope/int reported is the least-squares line through the fitted
+    probabilities over the sector's observed Z (the form scoring uses).
+    """
+    z, y, codes, k = panel.z, panel.y, panel.sector, len(panel.sectors)
+    n = np.bincount(codes, minlength=k).astype("float64")
+    defaults = np.bincount(codes, weights=y, minlength=k)
+    mean_z = np.bincount(codes, weights=z, minlength=k) / n
+    rate = np.clip(defaults / n, 1e-6, 1 - 1e-6)
+    a, b = np.log(rate / (1 - rate)), np.zeros(k)
+    converged = np.zeros(k, dtype=bool)
+    for _ in range(max_iter):
+        def newton_terms(blk):
+            c, zc = codes[blk], z[blk] - mean_z[codes[blk]]
+            p = _expit(a[c] + b[c]*zc)
+            r, w = y[blk] - p, p*(1 - p)
+            return r, r*zc, w, w*zc, w*zc*zc
+        g0, g1, h00, h01, h11 = _group_sums(codes, k, newton_terms).T
+        g0, g1 = g0 - ridge*a, g1 - ridge*b
+        h00, h11 = h00 + ridge, h11 + ridge
+        det = h00*h11 - h01*h01
+        da, db = (h11*g0 - h01*g1) / det, (h00*g1 - h01*g0) / det
+        a, b = a + da, b + db
+        converged = np.maximum(np.abs(da), np.abs(db)) < tol
+        if converged.all():
+            break
+
+    def line_terms(blk):
+        c, zb = codes[blk], z[blk]
+        p = _expit(a[c] + b[c]*(zb - mean_z[c]))
+        return np.ones(len(zb)), zb, zb*zb, p, zb*p
+    slope, intercept = _ols(_group_sums(codes, k, line_terms))
+    return {"slope": slope, "int": intercept, "logit_a": a - b*mean_z, "logit_b": b, "converged": converged}
+
+
+def _pd_model(panel: Panel, slope: np.ndarray, intercept: np.ndarray, blk: slice) -> np.ndarray:
+    c = panel.sector[blk]
+    pd_lin = slope[c]*panel.z[blk] + intercept[c]
+    return np.where(pd_lin > 0.0, pd_lin, 0.0)
+
+
+def calibrate(panel: Panel, ctx: ScoringContext, form: str = "linear",
+              min_obs: int = MIN_OBS, min_defaults: int = MIN_DEFAULTS,
+              max_rounds: int = MAX_ROUNDS, tol: float = 1e-9) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Fit sector curves (`form` linear or logistic) and country Bayes alphas
+    on the panel; returns (curves, alphas) reports.
+
+    Alphas minimise the squared error of (1-alpha)*line + alpha*prior
+    against the default flags (closed form, clipped to [0, 1]); countries
+    share their scoring key, so GCC members fit one alpha. The linear form
+    alternates fit_lines and fit_alphas on the cell moments until the
+    alphas move less than `tol` (joint least squares; with
+    USE_BAYES_PRIOR off the lines are fitted alone). The logistic form
+    fits the curves on the flags, then the alphas. Sectors and alpha keys
+    with fewer than min_obs observations or min_defaults defaults keep
+    their current values (status "kept"). Lines are fitted unclipped and
+    the sovereign floor is not part of the fit.
+    """
+    if form not in CURVE_FORMS:
+        raise ValueError(f"Unknown curve form {form!r}; expected one of {CURVE_FORMS}")
+    keys = [alpha_key(c, ctx.alpha_by_country) for c in panel.countries]
+    key_codes, key_names = pd.factorize(pd.Series(keys, dtype=object))
+    key_codes = key_codes.astype("int32")
+    old_alpha = np.array([ctx.alpha_for(key) for key in key_names], dtype="float64")
+    old = np.array([ctx.curve_for(s) for s in panel.sectors], dtype="float64").reshape(-1, 2)
+
+    moments = cell_moments(panel, key_codes, len(key_names))
+    n, defaults = moments[..., 0], moments[..., 6]
+    curve_use = (n.sum(1) >= min_obs) & (defaults.sum(1) >= min_defaults)
+    key_use = (n.sum(0) >= min_obs) & (defaults.sum(0) >= min_defaults)
+
+    logistic = fit_logistic(panel) if form == "logistic" else None
+    alpha, rounds = old_alpha.copy(), 0
+    for rounds in range(1, max_rounds + 1):
+        if logistic is not None:
+            fitted_slope, fitted_int = logistic["slope"], logistic["int"]
+        else:
+            fitted_slope, fitted_int = fit_lines(moments, alpha if ctx.USE_BAYES_PRIOR else 0.0 * alpha)
+        use = curve_use & np.isfinite(fitted_slope) & np.isfinite(fitted_int)
+        slope = np.where(use, fitted_slope, old[:, 0])
+        intercept = np.where(use, fitted_int, old[:, 1])
+
+        fitted_alpha = fit_alphas(moments, slope, intercept)
+        alpha_use = key_use & np.isfinite(fitted_alpha)
+        new_alpha = np.where(alpha_use, fitted_alpha, old_alpha)
+        moved = np.max(np.abs(new_alpha - alpha), initial=0.0)
+        alpha = new_alpha
+        if logistic is not None or not ctx.USE_BAYES_PRIOR or moved < tol:
+            break
+
+    check = _group_sums(panel.sector, len(panel.sectors), lambda blk: (
+        _pd_model(panel, old[:, 0], old[:, 1], blk), _pd_model(panel, slope, intercept, blk)))
+    n_sector, defaults_sector = n.sum(1), defaults.sum(1)
+    curves = pd.DataFrame({
+        "sector": panel.sectors,
+        "n": n_sector.astype("int64"),
+        "defaults": defaults_sector.astype("int64"),
+        "default_rate": defaults_sector / n_sector,
+        "old_slope": old[:, 0], "old_int": old[:, 1],
+        "slope": slope, "int": intercept,
+        "mean_pd_old": check[:, 0] / n_sector,
+        "mean_pd_new": check[:, 1] / n_sector,
+        "status": np.where(use, "fitted", "kept"),
+    })
+    if logistic is not None:
+        curves = curves.assign(logit_a=logistic["logit_a"], logit_b=logistic["logit_b"],
+                               converged=logistic["converged"])
+    n_key, defaults_key = n.sum(0), defaults.sum(0)
+    alphas = pd.DataFrame({
+        "country": list(key_names),
+        "n": n_key.astype("int64"),
+        "defaults": defaults_key.astype("int64"),
+        "default_rate": defaults_key / n_key,
+        "old_alpha": old_alpha,
+        "alpha": alpha,
+        "status": np.where(alpha_use, "fitted", "kept"),
+        "rounds": rounds,
+    })
+    return (curves.sort_values("n", ascending=False, ignore_index=True),
+            alphas.sort_values("n", ascending=False, ignore_index=True))
+
+
+def candidate_curves(curves: pd.DataFrame, ctx: ScoringContext) -> Dict[str, Dict[str, float]]:
+    """Current sector_config curves with the fitted sectors replaced (new sectors appended)."""
+    out = {s: {"slope": float(c["slope"]), "int": float(c["int"])} for s, c in ctx.sector_curves.items()}
+    for row in curves[curves["status"] == "fitted"].itertuples(index=False):
+        out[row.sector] = {"slope": float(row.slope), "int": float(getattr(row, "int"))}
+    return out
+
+
+def candidate_model_config(alphas: pd.DataFrame, ctx: ScoringContext) -> dict:
+    """
+    model_config with BAYES_ALPHA_BY_COUNTRY updated for the fitted keys;
+    a fitted GCC alpha is copied to GCC members listed on their own, which
+    scoring would otherwise shadow with it anyway.
+    """
+    cfg = copy.deepcopy(ctx.cfg)
+    table = cfg["bayes"]["BAYES_ALPHA_BY_COUNTRY"]
+    for row in alphas[alphas["status"] == "fitted"].itertuples(index=False):
+        value = round(float(row.alpha), 4)
+        table[row.country] = value
+        if row.country == "GCC":
+            table.update({k: value for k in table if k in GCC_COUNTRIES})
+    return cfg
+
+
+def write_sector_config(curves: Dict[str, Dict[str, float]], path: str | Path) -> Path:
+    """sector_config.yaml in the hand-written layout (one aligned flow mapping per sector)."""
+    path = Path(path)
+    width = max((len(s) for s in curves), default=0) + 2
+    lines = ["sectors:"]
+    for sector, c in curves.items():
+        lines.append(f"  {f'{sector}:':<{width}} {{slope: {c['slope']:.9g}, int: {c['int']:.9g}}}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
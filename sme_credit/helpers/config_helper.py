@@ -1,7 +1,6 @@
 
 from __future__ import annotations
 from pathlib import Path
-import yaml
 
 def load_yaml(path: str | Path) -> dict:
     p = Path(path)
@@ -9,6 +8,17 @@ def load_yaml(path: str | Path) -> dict:
         p = (Path(__file__).resolve().parents[2] / p).resolve()
     if not p.exists():
         raise FileNotFoundError(f"YAML not found: {p}")
+    import yaml  # deferred: only config loading needs it
+
     with open(p, "r", encoding="utf-8") as f:
         data = yaml.safe_load(f) or {}
     return data
+
+def write_yaml(data: dict, path: str | Path) -> Path:
+    """Block-style YAML, keys kept in insertion order."""
+    import yaml
+
+    p = Path(path)
+    with open(p, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False, default_flow_style=False, allow_unicode=True)
+    return p
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .quant_helper import RatingScale, PriorTable, GCC_COUNTRIES
+
+DEFAULT_CURVE = {"slope": 0.0000223, "int": 0.001}
+
+
+class ScoringContext:
+    """
+    Everything small_firm_score needs from the configs, resolved once per run.
+
+    Weights/overlays/penalties are plain attributes, sector curves are
+    (slope, int) tuples, the country -> Bayes alpha map has GCC members
+    expanded, priors are a dense PriorTable and rating bands are a compiled
+    RatingScale. Instances are read-only so one context can be shared across
+    batches and workers.
+    """
+    __slots__ = (
+        "cfg", "sector_curves", "prior_lookup", "prior_table", "rating_scale",
+        "W_X1", "W_X2", "W_X3", "W_X4", "W_X5",
+        "ALT_WT", "CF_FCF", "CF_IC", "CF_RQ", "AGE_PEN_LT3", "AGE_PEN_3_5", "QUAL_WT",
+        "SCALE_PEN", "LOW_LEV_PEN", "MV_CAP", "CAP_COUNTRY_RATING", "USE_BAYES_PRIOR",
+        "curves", "default_curve", "alpha_by_country", "default_alpha",
+    )
+
+    def __init__(self,
+                 cfg: dict,
+                 sector_curves: dict,
+                 rating_bands: Union[List[dict], RatingScale],
+                 prior_lookup: Optional[Dict[Tuple[str, str], float]] = None):
+        weights, overlays = cfg["weights"], cfg["overlays"]
+        penalties, toggles, bayes = cfg["penalties"], cfg["toggles"], cfg["bayes"]
+        scale = rating_bands if isinstance(rating_bands, RatingScale) else RatingScale(rating_bands)
+
+        alpha = {k: float(v) for k, v in bayes["BAYES_ALPHA_BY_COUNTRY"].items()}
+        if "GCC" in alpha:
+            alpha.update({c: alpha["GCC"] for c in GCC_COUNTRIES})
+
+        values = {
+            "cfg": cfg,
+            "sector_curves": sector_curves,
+            "prior_lookup": prior_lookup or {},
+            "prior_table": PriorTable(prior_lookup or {}),
+            "rating_scale": scale,
+            **{k: weights[k] for k in ("W_X1", "W_X2", "W_X3", "W_X4", "W_X5")},
+            **{k: overlays[k] for k in ("ALT_WT", "CF_FCF", "CF_IC", "CF_RQ",
+                                        "AGE_PEN_LT3", "AGE_PEN_3_5", "QUAL_WT")},
+            "SCALE_PEN": penalties["SCALE_PEN"],
+            "LOW_LEV_PEN": penalties["LOW_LEV_PEN"],
+            "MV_CAP": cfg["limits"]["MV_CAP"],
+            "CAP_COUNTRY_RATING": bool(toggles["CAP_COUNTRY_RATING"]),
+            "USE_BAYES_PRIOR": bool(toggles["USE_BAYES_PRIOR"]),
+            "curves": {s: (c["slope"], c["int"]) for s, c in sector_curves.items()},
+            "default_curve": (DEFAULT_CURVE["slope"], DEFAULT_CURVE["int"]),
+            "alpha_by_country": alpha,
+            "default_alpha": float(bayes["DEFAULT_BAYES_ALPHA"]),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getstate__(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def curve_for(self, sector: str) -> Tuple[float, float]:
+        return self.curves.get(sector, self.default_curve)
+
+    def alpha_for(self, country: str) -> float:
+        """Bayes alpha for an already-normalised (upper/stripped) country."""
+        return self.alpha_by_country.get(country, self.default_alpha)
+
+
+def as_context(cfg: Union[dict, ScoringContext],
+               sector_curves: Optional[dict] = None,
+               rating_bands: Union[List[dict], RatingScale, None] = None,
+               prior_lookup: Optional[dict] = None) -> ScoringContext:
+    """Pass a ScoringContext through, or build one from the raw configs."""
+    if isinstance(cfg, ScoringContext):
+        return cfg
+    if sector_curves is None or rating_bands is None:
+        raise ValueError("sector_curves and rating_bands are required when cfg is a dict")
+    return ScoringContext(cfg, sector_curves, rating_bands, prior_lookup)
+
+
+def load_context(project_root: str | Path) -> ScoringContext:
+    """Read config/*.yaml and the priors workbook under project_root."""
+    from .config_helper import load_yaml
+    from .quant_helper import load_priors
+
+    root = Path(project_root)
+    config_dir = root / "config"
+    model_cfg = load_yaml(config_dir / "model_config.yaml")
+    rating_bands = load_yaml(config_dir / "rating_scale.yaml")["ratings"]
+    sector_curves = load_yaml(config_dir / "sector_config.yaml")["sectors"]
+
+    bayes_path = Path(model_cfg["bayes"]["BAYES_XLSX"])
+    if not bayes_path.is_absolute():
+        bayes_path = root / bayes_path
+    prior_lookup = load_priors(str(bayes_path), sheet=model_cfg["bayes"]["BAYES_SHEET"])
+    return ScoringContext(model_cfg, sector_curves, rating_bands, prior_lookup)
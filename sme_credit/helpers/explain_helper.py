@@ -0,0 +1,88 @@
+from __future__ import annotations
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from ..core import ALT_KEYS, INPUT_DEFAULTS
+from .context_helper import ScoringContext
+from .vector_helper import _num, score_components
+
+
+def _age_pen(ctx: ScoringContext, age):
+    return np.where(age < 3, ctx.AGE_PEN_LT3, np.where(age < 5, ctx.AGE_PEN_3_5, 0.0))
+
+
+# Z_adj contribution of each overlay input; per overlay they add up to alt_adj, cf_adj and qual_adj
+OVERLAY_TERMS = {
+    **{k: (lambda ctx, x: ctx.ALT_WT * (x - 0.5) / len(ALT_KEYS)) for k in ALT_KEYS},
+    "fcf_vol_ratio": lambda ctx, x: ctx.CF_FCF * x,
+    "cf_int_cov": lambda ctx, x: ctx.CF_IC * np.log1p(x),
+    "revenue_quality": lambda ctx, x: ctx.CF_RQ * (x - 0.5),
+    "business_age_years": _age_pen,
+    "mgmt_track_record": lambda ctx, x: ctx.QUAL_WT * (x - 0.5),
+    "industry_survival_rate": lambda ctx, x: ctx.QUAL_WT * (x - 0.5),
+    "geo_risk": lambda ctx, x: -ctx.QUAL_WT * x,
+}
+
+EXPLAIN_COLUMNS = [
+    *(f"contrib_X{i}" for i in range(1, 6)),
+    *(f"contrib_{k}" for k in OVERLAY_TERMS),
+    "pd_per_z", "pd_to_upgrade", "pd_to_downgrade", "z_to_upgrade", "z_to_downgrade",
+]
+
+
+def attribution(df: pd.DataFrame, comps: Dict[str, np.ndarray], ctx: ScoringContext) -> Dict[str, np.ndarray]:
+    """
+    EXPLAIN_COLUMNS for rows already run through score_components (`comps`).
+
+    contrib_X1..X5 are W_Xi*Xi (summing to Z_raw) and contrib_<input> the
+    Z_adj term of each overlay input; with scale_pen and lev_pen they add up
+    to Z_adj. pd_per_z is the PD_final change per unit of Z_adj at the
+    firm's point (0 where PD_model is clipped at 0 or the sovereign floor
+    binds). pd_to_upgrade / pd_to_downgrade are how far PD_final must fall /
+    rise to leave the firm's band, and z_to_upgrade / z_to_downgrade the
+    change in Z_adj that does it through the sector curve, Bayes blend and
+    floor (positive / negative on the usual falling curves). NaN where there
+    is no better / worse band or no Z_adj reaches it (e.g. the prior or the
+    floor alone keeps the PD in its band).
+    """
+    out = {f"contrib_X{i}": getattr(ctx, f"W_X{i}") * comps[f"X{i}"] for i in range(1, 6)}
+    for field, term in OVERLAY_TERMS.items():
+        out[f"contrib_{field}"] = term(ctx, _num(df, field, INPUT_DEFAULTS[field]))
+
+    scale = ctx.rating_scale
+    pd_final, pd_model = comps["PD_final"], comps["PD_model"]
+    slope, intercept, z = comps["sector_slope"], comps["sector_int"], comps["Z_adj"]
+    alpha = comps["bayes_alpha"] if ctx.USE_BAYES_PRIOR else np.zeros(len(z))
+    base = alpha * comps["prior_pd"]
+    floor = comps["floor_pd"] if ctx.CAP_COUNTRY_RATING else np.full(len(z), np.nan)
+
+    n_bands = len(scale)
+    band = scale.band_index(pd_final)
+    rated = band < n_bands
+    safe = np.minimum(band, n_bands - 1)
+    lows, highs = np.asarray(scale.lows), np.asarray(scale.highs)
+    up_edge = np.where(rated & (band > 0), lows[safe], np.nan)
+    down_edge = np.where(rated & (band < n_bands - 1), highs[safe], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        floored = floor >= pd_final  # NaN floor compares False
+        out["pd_per_z"] = np.where((pd_model > 0) & ~floored, (1 - alpha) * slope, 0.0)
+        out["pd_to_upgrade"] = pd_final - up_edge
+        out["pd_to_downgrade"] = down_edge - pd_final
+
+        # PD_model at which the blend reaches each edge, then the Z_adj on the sector line that gives it
+        m_up = (up_edge - base) / (1 - alpha)
+        m_down = (down_edge - base) / (1 - alpha)
+        movable = (alpha < 1) & (slope != 0)
+        up_ok = movable & (m_up > 0) & ~(floor >= up_edge)
+        down_ok = movable & (m_down > 0)
+        out["z_to_upgrade"] = np.where(up_ok, (m_up - intercept) / slope - z, np.nan)
+        out["z_to_downgrade"] = np.where(down_ok, (m_down - intercept) / slope - z, np.nan)
+    return out
+
+
+def explain_frame(df: pd.DataFrame, sector_col: str, ctx: ScoringContext) -> pd.DataFrame:
+    """EXPLAIN_COLUMNS for df on its own (one more scoring pass); score_frame(explain=True) reuses its own."""
+    out = attribution(df, score_components(df, sector_col, ctx), ctx)
+    return pd.DataFrame({k: out[k] for k in EXPLAIN_COLUMNS}, index=df.index, copy=False)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import hashlib
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .context_helper import ScoringContext
+from .explain_helper import EXPLAIN_COLUMNS, explain_frame
+from .validation_helper import REQUIRED_NUMERIC, validate_frame
+from .vector_helper import (
+    INPUT_DEFAULTS, OUTPUT_COLUMNS, _num, _per_unique, _text, apply_output_schema, attach_outputs, score_frame
+)
+
+# Bump when the scoring maths changes so old fingerprints stop matching.
+FINGERPRINT_VERSION = 1
+FINGERPRINT_COL = "_fingerprint"
+
+# Context attributes that apply to every row alike
+_GLOBAL_PARAMS = (
+    "W_X1", "W_X2", "W_X3", "W_X4", "W_X5",
+    "ALT_WT", "CF_FCF", "CF_IC", "CF_RQ", "AGE_PEN_LT3", "AGE_PEN_3_5", "QUAL_WT",
+    "SCALE_PEN", "LOW_LEV_PEN", "MV_CAP", "CAP_COUNTRY_RATING", "USE_BAYES_PRIOR",
+)
+
+
+def config_digest(ctx: ScoringContext) -> int:
+    """64-bit digest of the row-independent config: weights, overlays, toggles, rating bands."""
+    scale = ctx.rating_scale
+    parts = (FINGERPRINT_VERSION,
+             tuple(float(getattr(ctx, k)) for k in _GLOBAL_PARAMS),
+             scale.labels, scale.lows, scale.highs)
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little")
+
+
+def row_fingerprints(df: pd.DataFrame, sector_col: str, ctx: ScoringContext) -> np.ndarray:
+    """
+    One int64 per row over everything its score depends on: the scoring
+    inputs (normalised the way score_components reads them), the row's
+    sector curve, country alpha and prior cell, and config_digest().
+    """
+    sectors = _text(df, sector_col, "Industrials")
+    country = _text(df, "Country").astype(str).str.upper().str.strip()
+    primary = _text(df, "Country Rating")
+    ctry_rating = primary.where(primary.astype(bool), _text(df, "country_rating"))
+
+    cols = {c: _num(df, c) for c in REQUIRED_NUMERIC}
+    cols.update({c: _num(df, c, INPUT_DEFAULTS[c]) for c in INPUT_DEFAULTS})
+    cols.update({
+        "sector": sectors.astype(str).to_numpy(),
+        "country": country.to_numpy(),
+        "country_rating": ctry_rating.astype(str).to_numpy(),
+        "slope": _per_unique(sectors, lambda s: ctx.curve_for(s)[0]),
+        "intercept": _per_unique(sectors, lambda s: ctx.curve_for(s)[1]),
+        "alpha": _per_unique(country, ctx.alpha_for),
+        "prior": ctx.prior_table.resolve(country, sectors),
+    })
+    hashed = pd.util.hash_pandas_object(pd.DataFrame(cols), index=False).to_numpy()
+    return (hashed ^ np.uint64(config_digest(ctx))).view("int64")
+
+
+class IncrementalScorer:
+    """
+    Re-scores only rows whose fingerprint differs from the previous run.
+
+    `previous` is an earlier scored output with `key_col`, FINGERPRINT_COL and
+    the OUTPUT_COLUMNS; rows whose key is found there with an unchanged
+    fingerprint keep their previous scores, everything else is scored again.
+    When `previous` also has the EXPLAIN_COLUMNS, score(explain=True) reuses
+    those too and only explains the rows it scores.
+    Without `previous` every row is new, which seeds the fingerprints for the
+    next run. Counts of reused / rescored / new rows accumulate in `counts`
+    across calls, so one instance can serve a whole chunked run.
+
+    scorer: optional parallel_helper.ParallelScorer for the rows that do
+    need scoring. score()/close() mirror ParallelScorer, so an instance can
+    be passed as batch_helper.score_stream's `scorer`.
+    """
+
+    def __init__(self, ctx: ScoringContext, key_col: str,
+                 previous: Optional[pd.DataFrame] = None, scorer=None):
+        self.ctx = ctx
+        self.key_col = key_col
+        self.scorer = scorer
+        self.counts: Dict[str, int] = {"reused": 0, "rescored": 0, "new": 0}
+
+        need = [key_col, FINGERPRINT_COL, *OUTPUT_COLUMNS]
+        self._prev_explains = previous is not None and set(EXPLAIN_COLUMNS).issubset(previous.columns)
+        if self._prev_explains:
+            need += EXPLAIN_COLUMNS
+        if previous is not None and set(need).issubset(previous.columns):
+            prev = previous[need].drop_duplicates(key_col, keep="last").set_index(key_col)
+        else:
+            # no usable previous output: nothing can be reused
+            prev = pd.DataFrame(columns=need).set_index(key_col)
+        self._prev = prev
+        self._prev_fp = pd.to_numeric(prev[FINGERPRINT_COL]).to_numpy(dtype="int64")
+
+    def close(self) -> None:
+        if self.scorer is not None:
+            self.scorer.close()
+
+    def _score(self, df: pd.DataFrame, sector_col: str, explain: bool = False) -> pd.DataFrame:
+        if self.scorer is not None:
+            cols = [*OUTPUT_COLUMNS, *(EXPLAIN_COLUMNS if explain else [])]
+            return self.scorer.score(df, sector_col, explain=explain)[cols].set_axis(df.index)
+        return score_frame(df, sector_col, self.ctx, explain=explain)
+
+    def score(self, df: pd.DataFrame, sector_col: str, validate: bool = False,
+              float_dtype: Optional[str] = None, categorical_rating: bool = False,
+              outputs_only: bool = False, key_col: Optional[str] = None, explain: bool = False,
+              ) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Same return shape and output-schema options as batch_helper.score_many,
+        plus a FINGERPRINT_COL column. outputs_only keeps self.key_col; the
+        `key_col` keyword is accepted only so score_many options pass through.
+        With explain, rows that are scored get their attribution from the same
+        pass and reused rows take theirs from `previous`; if `previous` has no
+        EXPLAIN_COLUMNS, the reused rows alone are explained afresh.
+        """
+        if self.key_col not in df.columns:
+            raise ValueError(f"Key column {self.key_col!r} not found in input")
+        if validate:
+            valid, rejects_df = validate_frame(df)
+            df = df[valid]
+        df = df.reset_index(drop=True)
+
+        fp = row_fingerprints(df, sector_col, self.ctx)
+        pos = self._prev.index.get_indexer(df[self.key_col])
+        known = pos >= 0
+        same = np.zeros(len(df), dtype=bool)
+        same[known] = self._prev_fp[pos[known]] == fp[known]
+
+        cols = [*OUTPUT_COLUMNS, *(EXPLAIN_COLUMNS if explain else [])]
+        parts = []
+        if same.any():
+            reused = self._prev.iloc[pos[same]].set_axis(df.index[same])
+            if explain and not self._prev_explains:
+                reused = pd.concat([reused[OUTPUT_COLUMNS], explain_frame(df[same], sector_col, self.ctx)], axis=1)
+            parts.append(reused[cols])
+        if not same.all():
+            parts.append(self._score(df[~same], sector_col, explain))
+        outputs = pd.concat(parts).reindex(df.index) if parts \
+            else score_frame(df, sector_col, self.ctx, explain=explain)
+
+        self.counts["reused"] += int(same.sum())
+        self.counts["rescored"] += int((known & ~same).sum())
+        self.counts["new"] += int((~known).sum())
+
+        outputs = apply_output_schema(outputs, self.ctx.rating_scale, float_dtype, categorical_rating)
+        keep = [self.key_col] if outputs_only else None
+        columns = {**{c: outputs[c] for c in OUTPUT_COLUMNS}, FINGERPRINT_COL: fp,
+                   **{c: outputs[c] for c in EXPLAIN_COLUMNS if explain}}
+        scored_df = attach_outputs(df, columns, keep=keep)
+        if validate:
+            return scored_df, rejects_df
+        return scored_df
+
+
+def score_incremental(df: pd.DataFrame,
+                      sector_col: str,
+                      ctx: ScoringContext,
+                      key_col: str,
+                      previous: Optional[pd.DataFrame] = None,
+                      validate: bool = False):
+    """score_many counterpart that reuses unchanged rows from `previous` (see IncrementalScorer)."""
+    return IncrementalScorer(ctx, key_col, previous).score(df, sector_col, validate=validate)
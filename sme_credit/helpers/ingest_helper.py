@@ -0,0 +1,189 @@
+from __future__ import annotations
+import glob as _glob
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .io_helper import (
+    ARROW_EXTS, CSV_EXTS, EXCEL_EXTS, PARQUET_EXTS, _present, iter_input_chunks, read_table, table_columns
+)
+
+SOURCE_FILE_COL = "_source_file"
+SOURCE_SHEET_COL = "_source_sheet"
+MANIFEST_EXTS = (".yaml", ".yml", ".lst")
+INPUT_EXTS = EXCEL_EXTS + CSV_EXTS + PARQUET_EXTS + ARROW_EXTS
+
+
+class Source(NamedTuple):
+    """One input table: a file, plus the sheet for workbooks ("" otherwise)."""
+    path: str
+    sheet: str = ""
+
+
+def is_multi_input(spec: str | Path) -> bool:
+    """True for a directory, a glob pattern or a manifest (vs. a single input file)."""
+    s = str(spec)
+    return Path(s).is_dir() or any(ch in s for ch in "*?[") or Path(s).suffix.lower() in MANIFEST_EXTS
+
+
+def _expand(pattern: str, base: Path) -> List[Path]:
+    p = Path(pattern)
+    if not p.is_absolute():
+        p = base / p
+    if p.is_dir():
+        return sorted(f for f in p.iterdir() if f.suffix.lower() in INPUT_EXTS and not f.name.startswith("~$"))
+    if any(ch in str(p) for ch in "*?["):
+        return sorted(Path(f) for f in _glob.glob(str(p), recursive=True)
+                      if Path(f).suffix.lower() in INPUT_EXTS and not Path(f).name.startswith("~$"))
+    return [p]
+
+
+def _manifest_entries(path: Path) -> List[Tuple[str, Optional[List[str]]]]:
+    """(path or glob, sheets or None) per manifest entry."""
+    if path.suffix.lower() == ".lst":
+        lines = (ln.split("#", 1)[0].strip() for ln in path.read_text(encoding="utf-8").splitlines())
+        return [(ln, None) for ln in lines if ln]
+    from .config_helper import load_yaml
+
+    entries = []
+    for item in (load_yaml(path) or {}).get("sources", []):
+        if isinstance(item, str):
+            entries.append((item, None))
+        else:
+            sheets = item.get("sheets")
+            entries.append((item["path"], [str(s) for s in sheets] if sheets else None))
+    return entries
+
+
+def excel_sheets(path: str | Path) -> List[str]:
+    if Path(path).suffix.lower() == ".xls":
+        return [str(s) for s in pd.ExcelFile(path).sheet_names]
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def resolve_sources(spec: str | Path, sheets: Optional[Iterable[str]] = None) -> List[Source]:
+    """
+    Expand a directory, glob, manifest or single file into Sources, one per
+    (file, sheet). Workbooks contribute every sheet unless `sheets` (or the
+    manifest entry's `sheets:`) names them. Manifests are YAML
+    (`sources: [{path: ..., sheets: [...]}, ...]`) or `.lst` (one path or
+    glob per line); their relative paths are taken from the manifest's folder.
+    """
+    spec_path = Path(spec)
+    if spec_path.suffix.lower() in MANIFEST_EXTS and spec_path.is_file():
+        entries = _manifest_entries(spec_path)
+        base = spec_path.parent
+    else:
+        entries = [(str(spec), None)]
+        base = Path(".")
+    wanted = list(sheets) if sheets else None
+
+    sources: List[Source] = []
+    for pattern, entry_sheets in entries:
+        files = _expand(pattern, base)
+        if not files:
+            raise FileNotFoundError(f"No input files match {pattern!r}")
+        for f in files:
+            if f.suffix.lower() not in INPUT_EXTS:
+                raise ValueError(f"Unsupported input format: {f}")
+            if f.suffix.lower() in EXCEL_EXTS:
+                names = entry_sheets or wanted or excel_sheets(f)
+                sources.extend(Source(str(f), s) for s in names)
+            else:
+                sources.append(Source(str(f)))
+    return list(dict.fromkeys(sources))
+
+
+def _read_source(source: Source, columns: Optional[List[str]]) -> pd.DataFrame:
+    return read_table(source.path, sheet=source.sheet or None, columns=columns)
+
+
+def _tag(frames: List[pd.DataFrame], sources: List[Source]) -> pd.DataFrame:
+    """Concatenate per-source frames and add categorical source columns."""
+    lengths = [len(f) for f in frames]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    codes = np.repeat(np.arange(len(sources)), lengths)
+    for name, col in source_columns(sources, codes).items():
+        df[name] = col
+    return df
+
+
+def source_columns(sources: List[Source], codes: np.ndarray) -> Dict[str, pd.Categorical]:
+    """_source_file / _source_sheet as categoricals over all sources (stable dtype across chunks)."""
+    files = list(dict.fromkeys(s.path for s in sources))
+    sheets = list(dict.fromkeys(s.sheet for s in sources))
+    file_codes = np.array([files.index(s.path) for s in sources], dtype="int64")
+    sheet_codes = np.array([sheets.index(s.sheet) for s in sources], dtype="int64")
+    return {
+        SOURCE_FILE_COL: pd.Categorical.from_codes(file_codes[codes], categories=files),
+        SOURCE_SHEET_COL: pd.Categorical.from_codes(sheet_codes[codes], categories=sheets),
+    }
+
+
+def read_sources(sources: List[Source], columns: Optional[Iterable[str]] = None,
+                 workers: int = 4, pool: str = "auto") -> pd.DataFrame:
+    """
+    Read every source concurrently and return one frame in source order,
+    tagged with SOURCE_FILE_COL / SOURCE_SHEET_COL.
+
+    pool="thread" suits CSV/Parquet/Arrow (their parsers release the GIL);
+    "process" suits Excel, whose openpyxl parsing is pure Python. "auto"
+    picks processes when any source is a workbook.
+    """
+    if pool == "auto":
+        pool = "process" if any(Path(s.path).suffix.lower() in EXCEL_EXTS for s in sources) else "thread"
+    if pool not in ("thread", "process"):
+        raise ValueError(f"Unknown reader pool: {pool!r}")
+    cols = None if columns is None else list(columns)
+    n = max(1, min(workers, len(sources)))
+    if n == 1:
+        frames = [_read_source(s, cols) for s in sources]
+    else:
+        Executor = ThreadPoolExecutor if pool == "thread" else ProcessPoolExecutor
+        with Executor(max_workers=n) as ex:
+            frames = list(ex.map(_read_source, sources, [cols] * len(sources)))
+    return _tag(frames, sources)
+
+
+def iter_source_chunks(sources: List[Source], chunk_size: int,
+                       columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the sources one after another in chunks, tagged like read_sources.
+    Every chunk has the same columns, in read_sources' order (the union of
+    the sources' headers); a column a source lacks is blank in its chunks.
+    """
+    cols = None if columns is None else list(columns)
+    headers = [table_columns(s.path, s.sheet or None) for s in sources]
+    union = list(dict.fromkeys(c for h in headers for c in (h if cols is None else _present(cols, h))))
+    for i, source in enumerate(sources):
+        for chunk in iter_input_chunks(source.path, chunk_size, sheet=source.sheet or None, columns=cols):
+            codes = np.full(len(chunk), i, dtype="int64")
+            yield chunk.reindex(columns=union).reset_index(drop=True).assign(**source_columns(sources, codes))
+
+
+def count_by_source(df: pd.DataFrame) -> Dict[Tuple[str, str], int]:
+    """Rows per (source file, sheet); empty when the frame carries no source tags."""
+    if SOURCE_FILE_COL not in df.columns or not len(df):
+        return {}
+    counts = df.groupby([SOURCE_FILE_COL, SOURCE_SHEET_COL], observed=True, sort=False).size()
+    return {(str(f), str(s)): int(n) for (f, s), n in counts.items()}
+
+
+def source_report(sources: List[Source], rows: Dict[Tuple[str, str], int],
+                  rejects: Dict[Tuple[str, str], int]) -> pd.DataFrame:
+    """Per-source rows read, rows rejected and rows scored, in source order."""
+    out = []
+    for s in sources:
+        key = (s.path, s.sheet)
+        n, r = rows.get(key, 0), rejects.get(key, 0)
+        out.append({"source_file": s.path, "source_sheet": s.sheet, "rows": n, "rejects": r, "scored": n - r})
+    return pd.DataFrame(out, columns=["source_file", "source_sheet", "rows", "rejects", "scored"])
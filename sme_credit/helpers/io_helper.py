@@ -1,7 +1,18 @@
-
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Mapping, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+EXCEL_EXTS = (".xlsx", ".xlsm", ".xls")
+CSV_EXTS = (".csv", ".txt")
+PARQUET_EXTS = (".parquet", ".pq")
+ARROW_EXTS = (".feather", ".arrow", ".ipc")
+
+# --output-format -> file extension
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
 
 def ensure_dir(path: str | Path) -> Path:
     p = Path(path)
@@ -17,3 +28,251 @@ def make_output_path(base_dir: str | Path, prefix: str, ext: str = ".csv", use_u
     ensure_dir(base)
     ts = timestamp_tag(use_utc=use_utc)
     return base / f"{prefix}_{ts}{ext}"
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+        import pyarrow.ipc
+    except ImportError as e:  # pragma: no cover - depends on environment
+        raise ImportError("Parquet/Arrow I/O requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+def _present(columns: Optional[Iterable[str]], available: Iterable[str]) -> Optional[list]:
+    """Requested columns that exist in the file, in file order (None = all)."""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [c for c in available if c in wanted]
+
+def read_table(path: str | Path,
+               sheet: str | None = None,
+               columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Read an input/output table, picking the reader from the file extension.
+    `columns` projects the read onto those fields; names missing from the
+    file are ignored, so a superset (e.g. every scoring input) is fine.
+    """
+    import pandas as pd
+
+    p = Path(path)
+    ext = p.suffix.lower()
+    wanted = None if columns is None else set(columns)
+    if ext in EXCEL_EXTS:
+        usecols = None if wanted is None else (lambda c: c in wanted)
+        return pd.read_excel(p, sheet_name=(sheet or 0), usecols=usecols)
+    if ext in CSV_EXTS:
+        usecols = None if wanted is None else (lambda c: c in wanted)
+        return pd.read_csv(p, usecols=usecols)
+    if ext in PARQUET_EXTS:
+        pa = _pyarrow()
+        names = pa.parquet.read_schema(p).names
+        return pa.parquet.read_table(p, columns=_present(columns, names)).to_pandas()
+    if ext in ARROW_EXTS:
+        pa = _pyarrow()
+        with pa.memory_map(str(p), "r") as source:
+            names = pa.ipc.open_file(source).schema.names
+        return pa.feather.read_table(p, columns=_present(columns, names), memory_map=True).to_pandas()
+    raise ValueError(f"Unsupported table format: {ext}")
+
+def table_columns(path: str | Path, sheet: str | None = None) -> List[str]:
+    """Column names of an input table, read from its header or schema only."""
+    import pandas as pd
+
+    p = Path(path)
+    ext = p.suffix.lower()
+    if ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(p, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.worksheets[0]
+            header = next(ws.iter_rows(values_only=True, max_row=1), None) or ()
+        finally:
+            wb.close()
+        # named as iter_input_chunks names them
+        return [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+    if ext in EXCEL_EXTS:
+        return [str(c) for c in pd.read_excel(p, sheet_name=(sheet or 0), nrows=0).columns]
+    if ext in CSV_EXTS:
+        return list(pd.read_csv(p, nrows=0).columns)
+    if ext in PARQUET_EXTS:
+        return list(_pyarrow().parquet.read_schema(p).names)
+    if ext in ARROW_EXTS:
+        pa = _pyarrow()
+        with pa.memory_map(str(p), "r") as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    raise ValueError(f"Unsupported table format: {ext}")
+
+def cast_floats(df: pd.DataFrame, float_dtype: str | None, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Cast float columns (optionally only `columns`) to float32/float64."""
+    if float_dtype is None:
+        return df
+    cols = df.columns if columns is None else [c for c in columns if c in df.columns]
+    cast = {c: float_dtype for c in cols if df[c].dtype.kind == "f" and df[c].dtype != float_dtype}
+    return df.astype(cast) if cast else df
+
+def write_table(df: pd.DataFrame, path: str | Path, float_dtype: str | None = None,
+                float_columns: Optional[Iterable[str]] = None) -> Path:
+    """Write df as CSV, Parquet or Feather/Arrow IPC depending on the extension."""
+    p = Path(path)
+    ext = p.suffix.lower()
+    df = cast_floats(df, float_dtype, float_columns)
+    if ext in CSV_EXTS:
+        df.to_csv(p, index=False)
+    elif ext in PARQUET_EXTS:
+        _pyarrow()
+        df.to_parquet(p, index=False)
+    elif ext in ARROW_EXTS:
+        _pyarrow()
+        df.reset_index(drop=True).to_feather(p)
+    else:
+        raise ValueError(f"Unsupported output format: {ext}")
+    return p
+
+def iter_input_chunks(path: str | Path, chunk_size: int, sheet: str | None = None,
+                      columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the input file as DataFrames of at most `chunk_size` rows.
+    CSV uses pandas' chunked reader, Parquet/Arrow read record batches
+    (pyarrow), Excel streams rows through openpyxl's read-only mode.
+    """
+    import pandas as pd
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    p = Path(path)
+    ext = p.suffix.lower()
+    wanted = None if columns is None else set(columns)
+    if ext in CSV_EXTS:
+        usecols = None if wanted is None else (lambda c: c in wanted)
+        with pd.read_csv(p, chunksize=chunk_size, usecols=usecols) as reader:
+            yield from reader
+    elif ext in PARQUET_EXTS:
+        pa = _pyarrow()
+        pf = pa.parquet.ParquetFile(p)
+        for batch in pf.iter_batches(batch_size=chunk_size, columns=_present(columns, pf.schema_arrow.names)):
+            yield batch.to_pandas()
+    elif ext in ARROW_EXTS:
+        pa = _pyarrow()
+        with pa.memory_map(str(p), "r") as source:
+            reader = pa.ipc.open_file(source)
+            keep = _present(columns, reader.schema.names)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if keep is not None:
+                    batch = batch.select(keep)
+                for start in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(start, chunk_size).to_pandas()
+    elif ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(p, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns_all = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+            buf = []
+            for values in rows:
+                if all(v is None for v in values):
+                    continue
+                buf.append(values)
+                if len(buf) == chunk_size:
+                    yield _excel_chunk(buf, columns_all, wanted)
+                    buf = []
+            if buf:
+                yield _excel_chunk(buf, columns_all, wanted)
+        finally:
+            wb.close()
+    else:
+        raise ValueError(f"Unsupported input format for chunked reading: {ext}")
+
+def _excel_chunk(rows: list, columns: list, wanted: Optional[set]) -> pd.DataFrame:
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=columns)
+    return df if wanted is None else df[[c for c in columns if c in wanted]]
+
+def append_csv(df: pd.DataFrame, path: str | Path, header: bool) -> None:
+    """Append one chunk to a CSV file; the first chunk (header=True) truncates it."""
+    df.to_csv(path, mode="w" if header else "a", header=header, index=False)
+
+class ChunkWriter:
+    """
+    Incremental writer for streamed output: CSV appends, Parquet row groups,
+    or Arrow IPC record batches. The columns and schema come from the first
+    chunk; later chunks are put in that column order (missing columns blank)
+    and cast to it, and a column the first chunk lacks is an error. A column that is entirely blank in the
+    first chunk carries no type, so it takes its `blank_dtypes` entry
+    ("float64", "string", ...) or else string. Use as a context manager, or
+    call close().
+    """
+
+    def __init__(self, path: str | Path, float_dtype: str | None = None,
+                 float_columns: Optional[Iterable[str]] = None,
+                 blank_dtypes: Optional[Mapping[str, str]] = None):
+        self.path = Path(path)
+        self.ext = self.path.suffix.lower()
+        if self.ext not in CSV_EXTS + PARQUET_EXTS + ARROW_EXTS:
+            raise ValueError(f"Unsupported output format: {self.ext}")
+        self.float_dtype = float_dtype
+        self.float_columns = None if float_columns is None else list(float_columns)
+        self.blank_dtypes = dict(blank_dtypes or {})
+        self.rows = 0
+        self._columns: Optional[List[str]] = None
+        self._writer = None
+        self._schema = None
+
+    def _first_schema(self, table):
+        pa = _pyarrow()
+        fields = []
+        for field, column in zip(table.schema, table.columns):
+            if len(column) and column.null_count == len(column) and not pa.types.is_dictionary(field.type):
+                field = field.with_type(pa.type_for_alias(self.blank_dtypes.get(field.name, "string")))
+            elif pa.types.is_null(field.type):
+                field = field.with_type(pa.string())
+            fields.append(field)
+        return pa.schema(fields, metadata=table.schema.metadata)
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _align(self, df: pd.DataFrame) -> pd.DataFrame:
+        """df in the first chunk's column order; CSV rows are positional under its header."""
+        if self._columns is None:
+            self._columns = list(df.columns)
+        elif list(df.columns) != self._columns:
+            extra = [c for c in df.columns if c not in set(self._columns)]
+            if extra:
+                raise ValueError(f"{self.path.name}: chunk has columns the first chunk lacks: {extra}")
+            df = df.reindex(columns=self._columns)
+        return df
+
+    def write(self, df: pd.DataFrame) -> None:
+        df = cast_floats(self._align(df), self.float_dtype, self.float_columns)
+        if self.ext in CSV_EXTS:
+            append_csv(df, self.path, header=(self.rows == 0))
+        else:
+            pa = _pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = self._first_schema(table)
+                if self.ext in PARQUET_EXTS:
+                    self._writer = pa.parquet.ParquetWriter(str(self.path), self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(str(self.path), self._schema)
+            # a column blank in one chunk and filled in another infers different types
+            self._writer.write_table(table.select(self._schema.names).cast(self._schema))
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
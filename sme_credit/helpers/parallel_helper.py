@@ -0,0 +1,128 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .batch_helper import score_many
+from .context_helper import ScoringContext
+from .store_helper import open_store, store_rows
+
+# Set once per worker process by the pool initializer, so the configs,
+# sector curves, rating scale and priors are pickled once per worker
+# instead of once per partition.
+_WORKER_CTX: Optional[ScoringContext] = None
+
+
+def _init_worker(ctx: ScoringContext) -> None:
+    global _WORKER_CTX
+    _WORKER_CTX = ctx
+
+
+def _score_partition(part: pd.DataFrame, sector_col: str, validate: bool, options: dict, accumulator=None):
+    result = score_many(part, sector_col, _WORKER_CTX, validate=validate, accumulator=accumulator, **options)
+    return result if accumulator is None else (result, accumulator)
+
+
+def _score_store_partition(path: str, lo: int, hi: int, columns, sector_col: str, validate: bool, options: dict,
+                           accumulator=None):
+    # each worker maps the store itself, so partitions share the OS page cache instead of being pickled
+    part = open_store(path, columns, start=lo, stop=hi)
+    result = score_many(part, sector_col, _WORKER_CTX, validate=validate, accumulator=accumulator, **options)
+    return result if accumulator is None else (result, accumulator)
+
+
+def _bounds(n_rows: int, n: int) -> np.ndarray:
+    return np.linspace(0, n_rows, num=max(1, min(n, n_rows)) + 1, dtype=int)
+
+
+def _partials(accumulator, starts) -> list:
+    """One empty accumulator per partition, positioned at its first input row."""
+    if accumulator is None:
+        return [None] * len(starts)
+    return [accumulator.fresh(offset=accumulator.next_offset + int(lo)) for lo in starts]
+
+
+def _merge_partials(results: list, accumulator) -> list:
+    if accumulator is None:
+        return results
+    for _, partial in results:
+        accumulator.merge(partial)
+    return [r for r, _ in results]
+
+
+class ParallelScorer:
+    """
+    Process pool that scores DataFrame partitions with a shared ScoringContext.
+
+    Partitions are scored in input order (executor.map), so output rows keep
+    the order of the input; rejects from validate=True are concatenated in
+    the same order. With an `accumulator` option (a PortfolioAccumulator)
+    each partition fills its own copy and the parent merges them in that
+    order. Use as a context manager, or call close().
+    """
+
+    def __init__(self, ctx: ScoringContext, workers: int, partitions_per_worker: int = 4):
+        self.ctx = ctx
+        self.workers = workers
+        self.partitions_per_worker = partitions_per_worker
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ctx,))
+
+    def __enter__(self) -> "ParallelScorer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def score(self, df: pd.DataFrame, sector_col: str, validate: bool = False,
+              **options) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """options are score_many's output-schema keywords (float_dtype, categorical_rating, ...)."""
+        accumulator = options.pop("accumulator", None)
+        bounds = _bounds(len(df), self.workers * self.partitions_per_worker)
+        parts = [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        results = list(self._pool.map(_score_partition, parts, [sector_col] * len(parts),
+                                      [validate] * len(parts), [options] * len(parts),
+                                      _partials(accumulator, bounds[:-1])))
+        return self._combine(_merge_partials(results, accumulator), validate)
+
+    def score_store(self, path: str | Path, sector_col: str, validate: bool = False,
+                    columns: Optional[Iterable[str]] = None,
+                    **options) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Score a store_helper store: workers memory-map row ranges of it
+        directly, so only (lo, hi) goes out and the scored rows come back.
+        """
+        accumulator = options.pop("accumulator", None)
+        n_rows = store_rows(path)
+        bounds = _bounds(n_rows, self.workers * self.partitions_per_worker)
+        cols = None if columns is None else list(columns)
+        k = len(bounds) - 1
+        results = list(self._pool.map(_score_store_partition, [str(path)] * k, bounds[:-1].tolist(),
+                                      bounds[1:].tolist(), [cols] * k, [sector_col] * k,
+                                      [validate] * k, [options] * k, _partials(accumulator, bounds[:-1])))
+        return self._combine(_merge_partials(results, accumulator), validate)
+
+    @staticmethod
+    def _combine(results: list, validate: bool):
+        if not validate:
+            return pd.concat(results, ignore_index=True)
+        scored = pd.concat([r[0] for r in results], ignore_index=True)
+        rejects = pd.concat([r[1] for r in results], ignore_index=True)
+        return scored, rejects
+
+
+def score_parallel(df: pd.DataFrame,
+                   sector_col: str,
+                   ctx: ScoringContext,
+                   workers: int,
+                   validate: bool = False,
+                   **options) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """score_many split across `workers` processes; workers <= 1 scores in-process."""
+    if workers <= 1:
+        return score_many(df, sector_col, ctx, validate=validate, **options)
+    with ParallelScorer(ctx, workers) as scorer:
+        return scorer.score(df, sector_col, validate=validate, **options)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .quant_helper import RatingScale
+from .vector_helper import _num
+
+PORTFOLIO_VERSION = 2
+# per-group sums; everything reported is derived from these, so partials merge by addition
+GROUP_FIELDS = ("rows", "exposure", "pd_rows", "pd_sum", "pd_exposure", "pd_x_exposure")
+TOP_COLUMNS = ("row", "key", "sector", "Country", "exposure", "PD_final", "Rating")
+DEFAULT_TOP_N = 20
+TOP_SHARE_N = 10  # concentration: share of exposure held by the largest N names
+
+
+class PortfolioAccumulator:
+    """
+    Mergeable portfolio aggregates built while scoring.
+
+    Holds sums only (rows, exposure, PD and PD x exposure per rating band of
+    the scale, per sector and per country), the PD range, the top-N riskiest
+    and, with an exposure column, the largest max(N, 10) exposures. It is
+    the `<output>_portfolio.json` sidecar that run_scoring.py writes and the
+    results browser reads (results_helper.load_summary). Chunks call update();
+    workers fill their own fresh() copy and the parent merge()s them in
+    input order, which gives the same result as one pass over the whole
+    book. Without an exposure_col each firm counts 1, so exposure-weighted
+    figures are plain averages and concentration is by firm count; an
+    exposure_col the input lacks is an error, not a silent 1.
+
+    `row` in the top-N tables is the firm's 0-based position in the scored
+    input (rejects included), so it points back into the input file.
+    """
+
+    def __init__(self, rating_scale: RatingScale, sector_col: str = "sector",
+                 exposure_col: Optional[str] = None, key_col: Optional[str] = None,
+                 top_n: int = DEFAULT_TOP_N, offset: int = 0):
+        self.scale = rating_scale
+        self.sector_col = sector_col
+        self.exposure_col = exposure_col
+        self.key_col = key_col
+        self.top_n = int(top_n)
+        self.offset = int(offset)
+        self.seen = 0
+        self.pd_min = math.inf
+        self.pd_max = -math.inf
+        n_bands = len(rating_scale) + 1  # + NR
+        self.band_rows = np.zeros(n_bands, dtype="int64")
+        self.band_exposure = np.zeros(n_bands, dtype="float64")
+        self.groups: Dict[str, Dict[str, np.ndarray]] = {"sector": {}, "country": {}}
+        self.top_risk = pd.DataFrame(columns=list(TOP_COLUMNS))
+        self.top_exposure = pd.DataFrame(columns=list(TOP_COLUMNS))
+
+    def fresh(self, offset: int = 0) -> "PortfolioAccumulator":
+        """Empty accumulator with the same settings, for a partition starting at input row `offset`."""
+        return PortfolioAccumulator(self.scale, self.sector_col, self.exposure_col, self.key_col,
+                                    self.top_n, offset)
+
+    @property
+    def next_offset(self) -> int:
+        """Input position of the next row this accumulator will see."""
+        return self.offset + self.seen
+
+    @property
+    def rows(self) -> int:
+        return int(self.band_rows.sum())
+
+    @property
+    def pd_count(self) -> int:
+        """Rows with a finite PD_final."""
+        return int(self._totals()[2])
+
+    @property
+    def mean_pd(self) -> float:
+        """Plain (unweighted) mean PD_final over pd_count rows."""
+        totals = self._totals()
+        return float(totals[3] / totals[2]) if totals[2] else float("nan")
+
+    @staticmethod
+    def _factorize(inputs: pd.DataFrame, col: str):
+        """(codes, labels) for a text column; missing column or values map to ""."""
+        if col not in inputs.columns:
+            return np.zeros(len(inputs), dtype="intp"), [""]
+        codes, uniques = pd.factorize(inputs[col])
+        labels = [str(u) for u in uniques] + [""]
+        return np.where(codes < 0, len(labels) - 1, codes), labels
+
+    def _add_groups(self, name: str, codes: np.ndarray, labels: List[str], sums: np.ndarray) -> None:
+        per_key = np.column_stack([np.bincount(codes, weights=c, minlength=len(labels)) for c in sums])
+        into = self.groups[name]
+        for key, vals in zip(labels, per_key):
+            if vals[0]:
+                cur = into.get(key)
+                into[key] = vals if cur is None else cur + vals
+
+    @property
+    def _n_exposure(self) -> int:
+        return max(self.top_n, TOP_SHARE_N)
+
+    def _top(self, current: pd.DataFrame, candidates: pd.DataFrame, by: str, n: int) -> pd.DataFrame:
+        if current.empty:
+            merged = candidates
+        elif candidates.empty:
+            merged = current
+        else:
+            merged = pd.concat([current, candidates], ignore_index=True)
+        # ties broken by input position, so the order never depends on chunking
+        return merged.sort_values([by, "row"], ascending=[False, True], kind="stable") \
+            .head(n).reset_index(drop=True)
+
+    def update(self, inputs: pd.DataFrame, pd_final, positions: Optional[np.ndarray] = None,
+               n_input: Optional[int] = None) -> "PortfolioAccumulator":
+        """
+        Add scored rows: `inputs` are the scored input rows, `pd_final` their
+        PD. `positions` are their indices within the batch as it was read
+        (validation removes rows) and `n_input` its length before validation.
+        """
+        if self.exposure_col and self.exposure_col not in inputs.columns:
+            raise ValueError(f"Exposure column {self.exposure_col!r} not found in input")
+        pd_vals = np.asarray(pd_final, dtype="float64")
+        n = len(pd_vals)
+        exposure = _num(inputs, self.exposure_col) if self.exposure_col else np.ones(n)
+        exposure = np.where(np.isfinite(exposure), exposure, 0.0)
+        finite = np.isfinite(pd_vals)
+        pd_w = np.where(finite, exposure, 0.0)
+        pd_x = pd_w * np.where(finite, pd_vals, 0.0)
+        if finite.any():
+            self.pd_min = min(self.pd_min, float(pd_vals[finite].min()))
+            self.pd_max = max(self.pd_max, float(pd_vals[finite].max()))
+
+        band = self.scale.band_index(pd_vals)
+        self.band_rows += np.bincount(band, minlength=len(self.band_rows))
+        self.band_exposure += np.bincount(band, weights=exposure, minlength=len(self.band_rows))
+
+        sums = (np.ones(n), exposure, finite.astype("float64"), np.where(finite, pd_vals, 0.0), pd_w, pd_x)
+        sector_codes, sectors = self._factorize(inputs, self.sector_col)
+        country_codes, countries = self._factorize(inputs, "Country")
+        self._add_groups("sector", sector_codes, sectors, sums)
+        self._add_groups("country", country_codes, countries, sums)
+
+        if n:
+            pos = np.arange(n) if positions is None else np.asarray(positions)
+            row = self.next_offset + pos
+            has_key = bool(self.key_col) and self.key_col in inputs.columns
+            sectors, countries = np.asarray(sectors, dtype=object), np.asarray(countries, dtype=object)
+            labels = np.asarray([*self.scale.labels, "NR"], dtype=object)
+
+            def candidates(score: np.ndarray, k: int) -> pd.DataFrame:
+                idx = np.arange(n)
+                if 0 < k < n:
+                    # everything tied with the k-th value, then position decides (as in _top)
+                    idx = np.flatnonzero(score >= np.partition(score, n - k)[n - k])
+                idx = idx[np.lexsort((row[idx], -score[idx]))[:k]]
+                idx = idx[np.isfinite(score[idx])]
+                keys = inputs[self.key_col].iloc[idx].to_numpy(dtype=object) if has_key \
+                    else np.full(len(idx), None, dtype=object)
+                return pd.DataFrame({"row": row[idx], "key": keys, "sector": sectors[sector_codes[idx]],
+                                     "Country": countries[country_codes[idx]], "exposure": exposure[idx],
+                                     "PD_final": pd_vals[idx], "Rating": labels[band[idx]]})
+
+            self.top_risk = self._top(self.top_risk, candidates(np.where(finite, pd_vals, -np.inf), self.top_n),
+                                      "PD_final", self.top_n)
+            if self.exposure_col:
+                self.top_exposure = self._top(self.top_exposure, candidates(exposure, self._n_exposure),
+                                              "exposure", self._n_exposure)
+        self.seen += n if n_input is None else int(n_input)
+        return self
+
+    def merge(self, other: "PortfolioAccumulator") -> "PortfolioAccumulator":
+        """Fold in a partial (e.g. a worker's); merge partials in input order."""
+        self.band_rows += other.band_rows
+        self.band_exposure += other.band_exposure
+        self.pd_min = min(self.pd_min, other.pd_min)
+        self.pd_max = max(self.pd_max, other.pd_max)
+        for name, theirs in other.groups.items():
+            mine = self.groups[name]
+            for key, vals in theirs.items():
+                cur = mine.get(key)
+                mine[key] = vals.copy() if cur is None else cur + vals
+        self.top_risk = self._top(self.top_risk, other.top_risk, "PD_final", self.top_n)
+        if self.exposure_col:
+            self.top_exposure = self._top(self.top_exposure, other.top_exposure, "exposure", self._n_exposure)
+        self.seen += other.seen
+        return self
+
+    # ---- reporting ----
+
+    def _totals(self) -> np.ndarray:
+        vals = list(self.groups["sector"].values())
+        return np.sum(vals, axis=0) if vals else np.zeros(len(GROUP_FIELDS))
+
+    def band_table(self) -> pd.DataFrame:
+        """Rows and exposure per rating band (scale order, NR last)."""
+        total = self.band_exposure.sum()
+        return pd.DataFrame({
+            "Rating": [*self.scale.labels, "NR"],
+            "rows": self.band_rows,
+            "exposure": self.band_exposure,
+            "exposure_share": self.band_exposure / total if total else np.nan,
+        })
+
+    def group_table(self, name: str) -> pd.DataFrame:
+        """Per sector/country: rows, exposure, share of exposure, exposure-weighted and plain mean PD."""
+        col = self.sector_col if name == "sector" else "Country"
+        groups = self.groups[name]
+        sums = np.array(list(groups.values())).reshape(-1, len(GROUP_FIELDS))
+        total = sums[:, 1].sum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = pd.DataFrame({
+                col: list(groups),
+                "rows": sums[:, 0].astype("int64"),
+                "exposure": sums[:, 1],
+                "exposure_share": sums[:, 1] / total if total else np.nan,
+                "ew_pd": np.where(sums[:, 4] > 0, sums[:, 5] / sums[:, 4], np.nan),
+                "mean_pd": np.where(sums[:, 2] > 0, sums[:, 3] / sums[:, 2], np.nan),
+            })
+        return out.sort_values("exposure", ascending=False, kind="stable", ignore_index=True)
+
+    @staticmethod
+    def _hhi(table: pd.DataFrame) -> Optional[float]:
+        shares = table["exposure_share"].to_numpy(dtype="float64")
+        return float(np.sum(shares ** 2)) if len(shares) and np.isfinite(shares).all() else None
+
+    def to_dict(self) -> dict:
+        rows, exposure, pd_rows, pd_sum, pd_exposure, pd_x = self._totals()
+        sectors, countries = self.group_table("sector"), self.group_table("country")
+        concentration = {"hhi_sector": self._hhi(sectors), "hhi_country": self._hhi(countries)}
+        if self.exposure_col:
+            top10 = self.top_exposure["exposure"].head(TOP_SHARE_N).sum()
+            concentration["top10_exposure_share"] = float(top10 / exposure) if exposure else None
+
+        def records(df: pd.DataFrame) -> List[dict]:
+            return json.loads(df.to_json(orient="records"))
+
+        return {
+            "version": PORTFOLIO_VERSION,
+            "sector_col": self.sector_col, "exposure_col": self.exposure_col, "key_col": self.key_col,
+            "rows": int(rows), "rows_read": int(self.seen),
+            "exposure": float(exposure), "pd_rows": int(pd_rows),
+            "ew_pd": float(pd_x / pd_exposure) if pd_exposure else None,
+            "mean_pd": float(pd_sum / pd_rows) if pd_rows else None,
+            "pd_min": self.pd_min if pd_rows else None, "pd_max": self.pd_max if pd_rows else None,
+            "concentration": concentration,
+            "ratings": records(self.band_table()),
+            "sectors": records(sectors),
+            "countries": records(countries),
+            "top_risk": records(self.top_risk),
+            **({"top_exposure": records(self.top_exposure.head(self.top_n))} if self.exposure_col else {}),
+            # what from_dict() needs on top of the report: raw GROUP_FIELDS sums and every exposure kept
+            "state": {"top_n": self.top_n, "groups": {name: {k: v.tolist() for k, v in groups.items()}
+                                                      for name, groups in self.groups.items()},
+                      "top_exposure": records(self.top_exposure)},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, rating_scale: RatingScale) -> "PortfolioAccumulator":
+        """Accumulator back from to_dict() / a written sidecar, for the same rating scale."""
+        if data.get("version") != PORTFOLIO_VERSION:
+            raise ValueError(f"Unsupported portfolio version {data.get('version')!r}")
+        labels = [r["Rating"] for r in data["ratings"]]
+        if labels != [*rating_scale.labels, "NR"]:
+            raise ValueError("Portfolio summary was built on a different rating scale")
+        state = data["state"]
+        acc = cls(rating_scale, data["sector_col"], data.get("exposure_col"), data.get("key_col"), state["top_n"])
+        acc.seen = int(data["rows_read"])
+        acc.band_rows = np.array([r["rows"] for r in data["ratings"]], dtype="int64")
+        acc.band_exposure = np.array([r["exposure"] for r in data["ratings"]], dtype="float64")
+        acc.pd_min = math.inf if data.get("pd_min") is None else float(data["pd_min"])
+        acc.pd_max = -math.inf if data.get("pd_max") is None else float(data["pd_max"])
+        acc.groups = {name: {k: np.asarray(v, dtype="float64") for k, v in groups.items()}
+                      for name, groups in state["groups"].items()}
+        for name, records in (("top_risk", data["top_risk"]), ("top_exposure", state["top_exposure"])):
+            if records:
+                setattr(acc, name, pd.DataFrame(records, columns=list(TOP_COLUMNS)))
+        return acc
+
+    def write_json(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict(), indent=1), encoding="utf-8")
+        return path
+
+    def long_table(self) -> pd.DataFrame:
+        """Bands, sectors and countries stacked as (dimension, key, rows, exposure, exposure_share, ew_pd)."""
+        bands = self.band_table().rename(columns={"Rating": "key"}).assign(ew_pd=np.nan)
+        parts = [bands.assign(dimension="rating")]
+        for name, col in (("sector", self.sector_col), ("country", "Country")):
+            parts.append(self.group_table(name).rename(columns={col: "key"}).assign(dimension=name))
+        out = pd.concat(parts, ignore_index=True)
+        return out[["dimension", "key", "rows", "exposure", "exposure_share", "ew_pd"]]
+
+    def write_parquet(self, path: str | Path) -> Path:
+        path = Path(path)
+        self.long_table().to_parquet(path, index=False)
+        return path
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:  # not available on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process high-water resident memory in MB (None where unsupported)."""
+    if resource is None:  # pragma: no cover
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RunProfiler:
+    """
+    Per-stage wall time, row counts, rows/sec and peak memory for one run.
+
+    Stages are named blocks (`with prof.stage("score", rows=n)`); repeated
+    stages (one per chunk) accumulate. A disabled profiler keeps the same
+    interface at near-zero cost, so call sites need no branches.
+
+    cprofile=True runs cProfile across the whole run (dumped by
+    write_report); trace_memory=True starts tracemalloc, adds the traced
+    peak per stage and the top allocation sites to the report.
+    """
+
+    def __init__(self, enabled: bool = True, cprofile: bool = False, trace_memory: bool = False):
+        self.enabled = enabled
+        self.stages: Dict[str, dict] = {}
+        self.meta: dict = {}
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc)
+        self._cprofile = None
+        self._tracemalloc = None
+        if enabled and cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if enabled and trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+            self._tracemalloc = tracemalloc
+
+    def _record(self, name: str) -> dict:
+        rec = self.stages.get(name)
+        if rec is None:
+            rec = self.stages[name] = {"calls": 0, "seconds": 0.0, "rows": 0}
+        return rec
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[dict]:
+        """Time a block; set `rec["rows"] += n` inside it if the row count is only known then."""
+        if not self.enabled:
+            yield {"rows": 0}
+            return
+        rec = self._record(name)
+        if self._tracemalloc is not None:
+            self._tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] += time.perf_counter() - t0
+            rec["calls"] += 1
+            if rows is not None:
+                rec["rows"] += int(rows)
+            rec["peak_rss_mb"] = peak_rss_mb()
+            if self._tracemalloc is not None:
+                traced = self._tracemalloc.get_traced_memory()[1] / 2**20
+                rec["peak_traced_mb"] = max(rec.get("peak_traced_mb", 0.0), traced)
+
+    def iter(self, name: str, items: Iterable) -> Iterator:
+        """Wrap an iterator (e.g. a chunk reader) so each next() is timed under `name`."""
+        it = iter(items)
+        while True:
+            with self.stage(name) as rec:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    if self.enabled:
+                        rec["calls"] -= 1  # the exhausted next() is not a chunk
+                    return
+                rec["rows"] += len(item) if hasattr(item, "__len__") else 0
+            yield item
+
+    def report(self) -> dict:
+        wall = time.perf_counter() - self._started
+        stages: List[dict] = []
+        for name, rec in self.stages.items():
+            seconds = rec["seconds"]
+            stages.append({"name": name, **rec,
+                           "rows_per_s": rec["rows"] / seconds if seconds > 0 and rec["rows"] else None})
+        out = {
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "wall_seconds": wall,
+            "peak_rss_mb": peak_rss_mb(),
+            **self.meta,
+            "stages": stages,
+        }
+        if self._tracemalloc is not None:
+            snapshot = self._tracemalloc.take_snapshot()
+            out["top_allocations"] = [
+                {"site": str(stat.traceback[0]), "size_mb": stat.size / 2**20, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:15]
+            ]
+        return out
+
+    def write_report(self, path: str | Path) -> dict:
+        """Write the JSON report (and `<stem>.prof` when cProfile is on); stops the profilers."""
+        path = Path(path)
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            prof_path = path.with_suffix(".prof")
+            self._cprofile.dump_stats(str(prof_path))
+            self.meta["cprofile"] = str(prof_path)
+        report = self.report()
+        if self._tracemalloc is not None:
+            self._tracemalloc.stop()
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return report
+
+
+def format_report(report: dict) -> str:
+    """Plain-text stage table for consoles and logs."""
+    lines = [f"{'stage':<12}{'calls':>7}{'seconds':>10}{'rows':>12}{'rows/s':>12}{'peak MB':>10}"]
+    for s in report.get("stages", []):
+        rps = f"{s['rows_per_s']:,.0f}" if s.get("rows_per_s") else "-"
+        peak = f"{s['peak_rss_mb']:.0f}" if s.get("peak_rss_mb") is not None else "-"
+        lines.append(f"{s['name']:<12}{s['calls']:>7}{s['seconds']:>10.3f}{s['rows']:>12,}{rps:>12}{peak:>10}")
+    lines.append(f"{'total':<12}{'':>7}{report.get('wall_seconds', 0.0):>10.3f}")
+    return "\n".join(lines)
@@ -1,10 +1,109 @@
 
 from __future__ import annotations
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Union
+from bisect import bisect_right
 import math
-import pandas as pd
+from typing import TYPE_CHECKING
+import numpy as np
 
-def map_pd_to_rating(pd_val: float, rating_bands: List[dict]) -> str:
+# pandas is imported where DataFrames are built, so the scalar scoring path
+# (core.small_firm_score, RatingScale, PriorTable.get) starts without it
+if TYPE_CHECKING:
+    import pandas as pd
+
+GCC_COUNTRIES = frozenset({"UAE", "SAUDI ARABIA", "OMAN", "QATAR", "KUWAIT", "BAHRAIN"})
+
+
+def _band_high(band: dict) -> float:
+    high_raw = band.get("high", None)
+    if high_raw is None:
+        return float("inf")
+    try:
+        return float(high_raw)
+    except (ValueError, TypeError):
+        return float("inf")
+
+
+class RatingScale:
+    """
+    Rating bands compiled once from rating_scale.yaml.
+
+    Lookups bisect sorted lower edges (scalars) or use np.searchsorted
+    (arrays); label -> PD is a plain dict. Bands are checked at build time
+    to be ordered, contiguous and non-overlapping.
+    """
+    __slots__ = ("labels", "lows", "highs", "_lows_arr", "_highs_arr", "_labels_arr", "_pd_by_label")
+
+    def __init__(self, rating_bands: List[dict]):
+        if not rating_bands:
+            raise ValueError("Rating scale must contain at least one band")
+        labels = [str(b["label"]) for b in rating_bands]
+        lows = [float(b["low"]) for b in rating_bands]
+        highs = [_band_high(b) for b in rating_bands]
+
+        for i, (label, low, high) in enumerate(zip(labels, lows, highs)):
+            if not low < high:
+                raise ValueError(f"Rating band {label!r}: low {low} must be below high {high}")
+            if i and low != highs[i - 1]:
+                raise ValueError(f"Rating band {label!r} starts at {low} but "
+                                 f"{labels[i - 1]!r} ends at {highs[i - 1]} (bands must be contiguous)")
+        keys = [label.upper().strip() for label in labels]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Rating labels must be unique")
+
+        self.labels = tuple(labels)
+        self.lows = tuple(lows)
+        self.highs = tuple(highs)
+        self._lows_arr = np.asarray(lows, dtype="float64")
+        self._highs_arr = np.asarray(highs, dtype="float64")
+        self._labels_arr = np.asarray(labels + ["NR"], dtype=object)
+        self._pd_by_label = {
+            key: ((low + high)/2 if math.isfinite(high) else low)
+            for key, low, high in zip(keys, lows, highs)
+        }
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def rating(self, pd_val: float) -> str:
+        i = bisect_right(self.lows, pd_val) - 1
+        if i >= 0 and pd_val < self.highs[i]:
+            return self.labels[i]
+        return "NR"
+
+    def band_index(self, pd_vals) -> np.ndarray:
+        """Band position per PD; len(self) where no band matches (NR)."""
+        pd_vals = np.asarray(pd_vals, dtype="float64")
+        idx = np.searchsorted(self._lows_arr, pd_vals, side="right") - 1
+        safe = np.clip(idx, 0, len(self.labels) - 1)
+        hit = (idx >= 0) & (pd_vals < self._highs_arr[safe])
+        return np.where(hit, safe, len(self.labels))
+
+    def ratings(self, pd_vals) -> np.ndarray:
+        return self._labels_arr[self.band_index(pd_vals)]
+
+    def rating_dtype(self) -> pd.CategoricalDtype:
+        """Ordered categorical over the scale labels (best first) plus a trailing NR."""
+        import pandas as pd
+
+        return pd.CategoricalDtype([*self.labels, "NR"], ordered=True)
+
+    def categorical(self, pd_vals) -> pd.Categorical:
+        """Ratings as integer codes into rating_dtype(); no per-row strings."""
+        import pandas as pd
+
+        return pd.Categorical.from_codes(self.band_index(pd_vals), dtype=self.rating_dtype())
+
+    def pd_for(self, rating: str) -> float:
+        pd_val = self._pd_by_label.get(rating)
+        if pd_val is None:
+            pd_val = self._pd_by_label.get((rating or "").upper().strip(), 1.0)
+        return pd_val
+
+
+def map_pd_to_rating(pd_val: float, rating_bands: Union[List[dict], RatingScale]) -> str:
+    if isinstance(rating_bands, RatingScale):
+        return rating_bands.rating(pd_val)
     for band in rating_bands:
         low = float(band["low"])
         high_raw = band.get("high", None)
@@ -19,7 +118,9 @@ def map_pd_to_rating(pd_val: float, rating_bands: List[dict]) -> str:
             return band["label"]
     return "NR"
 
-def rating_to_pd(rating: str, rating_bands: List[dict]) -> float:
+def rating_to_pd(rating: str, rating_bands: Union[List[dict], RatingScale]) -> float:
+    if isinstance(rating_bands, RatingScale):
+        return rating_bands.pd_for(rating)
     rating = (rating or "").upper().strip()
     for band in rating_bands:
         if band["label"].upper().strip() == rating:
@@ -35,6 +136,8 @@ def rating_to_pd(rating: str, rating_bands: List[dict]) -> float:
     return 1.0
 
 def load_priors(path: str, sheet: str) -> Dict[Tuple[str, str], float]:
+    import pandas as pd
+
     df = pd.read_excel(path, sheet_name=sheet)
     required = {"Country", "Sector", "Prior_PD"}
     if not required.issubset(df.columns):
@@ -51,9 +154,92 @@ def get_prior_pd(country: str, sector: str, lookup: Dict[Tuple[str, str], float]
            lookup.get(("*", sector),
            lookup.get(("*", "*"), fallback)))
 
+def _as_text(value) -> str:
+    """str() with None/NaN as "" (pandas' fillna("").astype(str) for one value)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+PRIOR_LEVELS = ("exact", "sector_wildcard", "global_wildcard", "default")
+
+
+class PriorTable:
+    """
+    Dense country x sector prior-PD matrix with the get_prior_pd wildcard
+    fallbacks already resolved.
+
+    Countries and sectors seen in the lookup are interned as integer codes
+    (one extra trailing code for "anything else"), so a whole batch resolves
+    with one gather. A parallel matrix records which fallback level
+    (PRIOR_LEVELS) each cell came from.
+    """
+    __slots__ = ("countries", "sectors", "fallback", "matrix", "levels", "_c_index", "_s_index")
+
+    def __init__(self, lookup: Dict[Tuple[str, str], float], fallback: float = 0.05):
+        countries = sorted({c for c, _ in lookup})
+        sectors = sorted({s for _, s in lookup})
+        self.countries = tuple(countries)
+        self.sectors = tuple(sectors)
+        self.fallback = float(fallback)
+        # plain dicts (not pd.Index) so cached contexts unpickle without pandas
+        self._c_index = {c: i for i, c in enumerate(countries)}
+        self._s_index = {s: i for i, s in enumerate(sectors)}
+
+        # None never matches a key, so the trailing row/column take the wildcards
+        matrix = np.empty((len(countries) + 1, len(sectors) + 1), dtype="float64")
+        levels = np.empty(matrix.shape, dtype="int8")
+        for i, c in enumerate(countries + [None]):
+            for j, s in enumerate(sectors + [None]):
+                if (c, s) in lookup:
+                    matrix[i, j], levels[i, j] = lookup[(c, s)], 0
+                elif ("*", s) in lookup:
+                    matrix[i, j], levels[i, j] = lookup[("*", s)], 1
+                elif ("*", "*") in lookup:
+                    matrix[i, j], levels[i, j] = lookup[("*", "*")], 2
+                else:
+                    matrix[i, j], levels[i, j] = self.fallback, 3
+        self.matrix = matrix
+        self.levels = levels
+
+    @classmethod
+    def from_file(cls, path: str, sheet: str, fallback: float = 0.05) -> "PriorTable":
+        return cls(load_priors(path, sheet), fallback=fallback)
+
+    def codes(self, countries, sectors) -> Tuple[np.ndarray, np.ndarray]:
+        """Integer (country, sector) codes after get_prior_pd normalisation."""
+        import pandas as pd
+
+        c = pd.Series(countries, dtype=object).fillna("").astype(str).str.upper().str.strip()
+        s = pd.Series(sectors, dtype=object).fillna("").astype(str).str.strip()
+        ci = pd.Index(self.countries, dtype=object).get_indexer(c)
+        si = pd.Index(self.sectors, dtype=object).get_indexer(s)
+        ci[ci < 0] = len(self.countries)
+        si[si < 0] = len(self.sectors)
+        return ci, si
+
+    def resolve(self, countries, sectors, return_levels: bool = False):
+        """Prior PD per row (and optionally the fallback level code per row)."""
+        ci, si = self.codes(countries, sectors)
+        if return_levels:
+            return self.matrix[ci, si], self.levels[ci, si]
+        return self.matrix[ci, si]
+
+    def get(self, country: str, sector: str) -> float:
+        """Scalar lookup (dicts only, no pandas); same normalisation as codes()."""
+        ci = self._c_index.get(_as_text(country).upper().strip(), len(self.countries))
+        si = self._s_index.get(_as_text(sector).strip(), len(self.sectors))
+        return float(self.matrix[ci, si])
+
+    def coverage(self, countries, sectors) -> Dict[str, int]:
+        """Row counts per fallback level, e.g. to spot gaps in the priors workbook."""
+        _, levels = self.resolve(countries, sectors, return_levels=True)
+        counts = np.bincount(levels, minlength=len(PRIOR_LEVELS))
+        return {name: int(n) for name, n in zip(PRIOR_LEVELS, counts)}
+
+
 def get_bayes_alpha(country: str, alpha_by_country: dict, default_alpha: float) -> float:
     country = (country or "").upper().strip()
-    gcc_countries = {"UAE", "SAUDI ARABIA", "OMAN", "QATAR", "KUWAIT", "BAHRAIN"}
-    if country in gcc_countries and "GCC" in alpha_by_country:
+    if country in GCC_COUNTRIES and "GCC" in alpha_by_country:
         return float(alpha_by_country["GCC"])
     return float(alpha_by_country.get(country, default_alpha))
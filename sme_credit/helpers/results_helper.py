@@ -0,0 +1,309 @@
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .io_helper import ARROW_EXTS, CSV_EXTS, PARQUET_EXTS, _pyarrow
+from .portfolio_helper import PortfolioAccumulator
+from .quant_helper import RatingScale
+
+OUTPUT_GLOBS = ("*.csv", "*.parquet", "*.feather")
+CSV_SCAN_ROWS = 100_000
+
+
+class ResultFilter(NamedTuple):
+    """Row filter for scored output; empty selections / None bounds mean "any"."""
+    ratings: Tuple[str, ...] = ()
+    sectors: Tuple[str, ...] = ()
+    countries: Tuple[str, ...] = ()
+    pd_min: Optional[float] = None
+    pd_max: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return not (self.ratings or self.sectors or self.countries) \
+            and self.pd_min is None and self.pd_max is None
+
+    def columns(self, sector_col: str) -> List[str]:
+        """Columns the filter reads."""
+        cols = [("Rating", self.ratings), (sector_col, self.sectors), ("Country", self.countries),
+                ("PD_final", self.pd_min is not None or self.pd_max is not None)]
+        return [c for c, used in cols if used]
+
+
+def summary_path(output_path: str | Path) -> Path:
+    """Sidecar written next to a scored output: `<stem>_portfolio.json` (a PortfolioAccumulator)."""
+    p = Path(output_path)
+    return p.with_name(f"{p.stem}_portfolio.json")
+
+
+class ResultIndex:
+    """
+    Scored output files in a directory, newest first.
+
+    A file counts as a scored output when its summary_path() sidecar sits
+    next to it, as run_scoring.py and the in-process run write one for
+    every output (and only once the output is complete). Rejects, per-source
+    counts, portfolio tables and other tools' reports have none, so they
+    are never listed. The listing (with each file's mtime and size) is rebuilt only when the
+    directory's own mtime changes, i.e. when a file is added, removed or
+    renamed, so UI reruns cost one stat() instead of one per file.
+    """
+
+    def __init__(self, directory: str | Path, globs: Sequence[str] = OUTPUT_GLOBS):
+        self.directory = Path(directory)
+        self.globs = tuple(globs)
+        self._mtime_ns: Optional[int] = None
+        self._entries: List[Tuple[Path, int, int]] = []
+
+    def refresh(self) -> bool:
+        """Rescan if the directory changed; True when the listing was rebuilt."""
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._mtime_ns, self._entries = None, []
+            return False
+        if mtime == self._mtime_ns:
+            return False
+        suffixes = {g.lstrip("*").lower() for g in self.globs}
+        with os.scandir(self.directory) as it:
+            files = {e.name: e for e in it if e.is_file()}
+        entries = []
+        for name, e in files.items():
+            if Path(name).suffix.lower() in suffixes and summary_path(name).name in files:
+                st = e.stat()
+                entries.append((Path(e.path), st.st_mtime_ns, st.st_size))
+        entries.sort(key=lambda t: t[1], reverse=True)
+        self._mtime_ns, self._entries = mtime, entries
+        return True
+
+    def files(self, prefix: Optional[str] = None) -> List[Path]:
+        self.refresh()
+        return [p for p, _, _ in self._entries if not prefix or p.name.startswith(prefix)]
+
+    def size(self, path: Path) -> Optional[int]:
+        return next((s for p, _, s in self._entries if p == path), None)
+
+
+def _frame_mask(df: pd.DataFrame, flt: ResultFilter, sector_col: str) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    for col, wanted in (("Rating", flt.ratings), (sector_col, flt.sectors), ("Country", flt.countries)):
+        if wanted and col in df.columns:
+            mask &= df[col].astype(object).isin(list(wanted)).to_numpy()
+    if "PD_final" in df.columns and (flt.pd_min is not None or flt.pd_max is not None):
+        pd_vals = pd.to_numeric(df["PD_final"], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        if flt.pd_min is not None:
+            mask &= pd_vals >= flt.pd_min
+        if flt.pd_max is not None:
+            mask &= pd_vals <= flt.pd_max
+    return mask
+
+
+def filter_frame(df: pd.DataFrame, flt: Optional[ResultFilter], sector_col: str = "sector") -> pd.DataFrame:
+    """In-memory counterpart of the pushed-down filter (for a frame already loaded)."""
+    if flt is None or flt.is_empty():
+        return df
+    return df[_frame_mask(df, flt, sector_col)]
+
+
+def _arrow_dataset(path: Path):
+    _pyarrow()
+    import pyarrow.dataset as ds
+
+    return ds.dataset(str(path), format="parquet" if path.suffix.lower() in PARQUET_EXTS else "ipc")
+
+
+def _arrow_filter(flt: Optional[ResultFilter], sector_col: str, names: Iterable[str]):
+    """pyarrow expression for the filter (None = no filter); unknown columns are ignored."""
+    if flt is None or flt.is_empty():
+        return None
+    import pyarrow.compute as pc
+
+    names = set(names)
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    for col, wanted in (("Rating", flt.ratings), (sector_col, flt.sectors), ("Country", flt.countries)):
+        if wanted and col in names:
+            expr = _and(pc.field(col).isin(list(wanted)))
+    if "PD_final" in names:
+        if flt.pd_min is not None:
+            expr = _and(pc.field("PD_final") >= flt.pd_min)
+        if flt.pd_max is not None:
+            expr = _and(pc.field("PD_final") <= flt.pd_max)
+    return expr
+
+
+def _csv_chunks(path: Path, columns: Optional[List[str]] = None, chunk_rows: int = CSV_SCAN_ROWS):
+    usecols = None if columns is None else (lambda c: c in set(columns))
+    with pd.read_csv(path, chunksize=chunk_rows, usecols=usecols) as reader:
+        yield from reader
+
+
+def _unfiltered_arrow_page(path: Path, offset: int, limit: int, columns: Optional[List[str]]) -> pd.DataFrame:
+    """Read only the row groups / record batches overlapping [offset, offset+limit)."""
+    pa = _pyarrow()
+    if path.suffix.lower() in PARQUET_EXTS:
+        pf = pa.parquet.ParquetFile(path)
+        schema = pf.schema_arrow
+        sizes = [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)]
+
+        def read(i):
+            return pf.read_row_group(i, columns=columns)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(str(path), "r"))
+        schema = reader.schema
+        sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+
+        def read(i):
+            batch = reader.get_batch(i)
+            return pa.Table.from_batches([batch if columns is None else batch.select(columns)])
+
+    tables, start, end = [], 0, offset + limit
+    for i, n in enumerate(sizes):
+        if start + n > offset:
+            lo = max(offset - start, 0)
+            tables.append(read(i).slice(lo, end - start - lo))
+        start += n
+        if start >= end:
+            break
+    if not tables:
+        names = schema.names if columns is None else columns
+        empty = pa.schema([schema.field(c) for c in names], metadata=schema.metadata)
+        return empty.empty_table().to_pandas()
+    return pa.concat_tables(tables).to_pandas()
+
+
+def read_page(path: str | Path, page: int = 0, page_size: int = 200,
+              flt: Optional[ResultFilter] = None, sector_col: str = "sector",
+              columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    One page (0-based) of the rows matching `flt`, without loading the file.
+
+    Parquet/Feather push the filter into the Arrow scanner (Parquet skips row
+    groups whose statistics cannot match) and, unfiltered, read only the row
+    groups/record batches holding the page. CSV streams chunks and stops as
+    soon as the page is filled.
+    """
+    path = Path(path)
+    ext = path.suffix.lower()
+    offset, limit = max(page, 0) * page_size, page_size
+    cols = None if columns is None else list(columns)
+    if ext in PARQUET_EXTS + ARROW_EXTS:
+        if flt is None or flt.is_empty():
+            return _unfiltered_arrow_page(path, offset, limit, cols)
+        dataset = _arrow_dataset(path)
+        expr = _arrow_filter(flt, sector_col, dataset.schema.names)
+        batches, skipped, taken = [], 0, 0
+        for batch in dataset.scanner(columns=cols, filter=expr).to_batches():
+            if skipped + batch.num_rows <= offset:
+                skipped += batch.num_rows
+                continue
+            lo = max(offset - skipped, 0)
+            part = batch.slice(lo, limit - taken)
+            skipped += lo
+            batches.append(part)
+            taken += part.num_rows
+            if taken >= limit:
+                break
+        pa = _pyarrow()
+        schema = dataset.schema if cols is None else pa.schema([dataset.schema.field(c) for c in cols])
+        return pa.Table.from_batches(batches, schema=schema).to_pandas()
+    if ext in CSV_EXTS:
+        if flt is None or flt.is_empty():
+            usecols = None if cols is None else (lambda c: c in set(cols))
+            return pd.read_csv(path, skiprows=range(1, offset + 1), nrows=limit, usecols=usecols)
+        parts, skipped, taken = [], 0, 0
+        for chunk in _csv_chunks(path):
+            chunk = chunk[_frame_mask(chunk, flt, sector_col)]
+            if skipped + len(chunk) <= offset:
+                skipped += len(chunk)
+                continue
+            lo = max(offset - skipped, 0)
+            part = chunk.iloc[lo:lo + limit - taken]
+            skipped += lo
+            parts.append(part if cols is None else part[[c for c in chunk.columns if c in set(cols)]])
+            taken += len(part)
+            if taken >= limit:
+                break
+        if not parts:
+            return pd.read_csv(path, nrows=0, usecols=None if cols is None else (lambda c: c in set(cols)))
+        return pd.concat(parts, ignore_index=True)
+    raise ValueError(f"Unsupported output format: {ext}")
+
+
+def count_rows(path: str | Path, flt: Optional[ResultFilter] = None, sector_col: str = "sector") -> int:
+    """Rows matching `flt`; reads only the filter's columns (file metadata when unfiltered, for Arrow)."""
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext in PARQUET_EXTS + ARROW_EXTS:
+        dataset = _arrow_dataset(path)
+        expr = _arrow_filter(flt, sector_col, dataset.schema.names)
+        return int(dataset.count_rows() if expr is None else dataset.scanner(filter=expr).count_rows())
+    if ext in CSV_EXTS:
+        header = list(pd.read_csv(path, nrows=0).columns)
+        needed = [c for c in (flt.columns(sector_col) if flt else []) if c in header] or header[:1]
+        return sum(int(_frame_mask(chunk, flt, sector_col).sum()) if flt else len(chunk)
+                   for chunk in _csv_chunks(path, needed))
+    raise ValueError(f"Unsupported output format: {ext}")
+
+
+def summarize_file(path: str | Path, rating_scale: RatingScale,
+                   sector_col: str = "sector") -> PortfolioAccumulator:
+    """
+    Build the portfolio summary by streaming only PD_final / sector / Country.
+    A file without PD_final is not a scored output and raises ValueError.
+    """
+    path = Path(path)
+    ext = path.suffix.lower()
+    summary = PortfolioAccumulator(rating_scale, sector_col)
+    wanted = ["PD_final", sector_col, "Country"]
+
+    def update(frame: pd.DataFrame) -> None:
+        summary.update(frame, pd.to_numeric(frame["PD_final"], errors="coerce"))
+
+    def check(names: Iterable[str]) -> None:
+        if "PD_final" not in names:
+            raise ValueError(f"{path.name} is not a scored output (no PD_final column)")
+
+    if ext in PARQUET_EXTS + ARROW_EXTS:
+        dataset = _arrow_dataset(path)
+        check(dataset.schema.names)
+        cols = [c for c in wanted if c in dataset.schema.names]
+        for batch in dataset.to_batches(columns=cols):
+            update(batch.to_pandas())
+    elif ext in CSV_EXTS:
+        check(pd.read_csv(path, nrows=0).columns)
+        for chunk in _csv_chunks(path, wanted):
+            update(chunk)
+    else:
+        raise ValueError(f"Unsupported output format: {ext}")
+    return summary
+
+
+def load_summary(path: str | Path, rating_scale: RatingScale, sector_col: str = "sector",
+                 write_sidecar: bool = True) -> PortfolioAccumulator:
+    """
+    The `<output>_portfolio.json` sidecar when it is at least as new as the
+    output; otherwise one streaming pass (written back as the sidecar).
+    Raises ValueError, writing nothing, for a file that is not a scored output.
+    """
+    path = Path(path)
+    sidecar = summary_path(path)
+    if sidecar.exists() and sidecar.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        try:
+            return PortfolioAccumulator.from_dict(json.loads(sidecar.read_text(encoding="utf-8")), rating_scale)
+        except (ValueError, KeyError):
+            pass  # stale or foreign sidecar: rebuild below
+    summary = summarize_file(path, rating_scale, sector_col)
+    if write_sidecar:
+        try:
+            summary.write_json(sidecar)
+        except OSError:
+            pass
+    return summary
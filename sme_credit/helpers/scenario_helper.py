@@ -0,0 +1,172 @@
+from __future__ import annotations
+import itertools
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .context_helper import ScoringContext
+from .quant_helper import RatingScale
+from .vector_helper import INPUT_DEFAULTS, _num, _text, pd_from_z, score_components
+
+# Config values a scenario may override. Sector curves are overridden with
+# "<Sector>.slope" / "<Sector>.int" keys, e.g. {"Banks.slope": -0.0007}.
+SCENARIO_PARAMS = ("W_X1", "W_X2", "W_X3", "W_X4", "W_X5", "ALT_WT", "QUAL_WT", "MV_CAP")
+CURVE_FIELDS = ("slope", "int")
+_Z_RAW_PARAMS = frozenset({"W_X1", "W_X2", "W_X3", "W_X4", "W_X5", "MV_CAP"})
+
+
+def split_overrides(overrides: Mapping[str, float]) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+    """Separate scalar parameter overrides from per-sector curve overrides."""
+    params, curves = {}, {}
+    for key, value in overrides.items():
+        if key in SCENARIO_PARAMS:
+            params[key] = float(value)
+            continue
+        sector, _, field = key.rpartition(".")
+        if not sector or field not in CURVE_FIELDS:
+            raise ValueError(f"Unknown scenario override {key!r}; expected one of {SCENARIO_PARAMS} "
+                             f"or '<Sector>.slope' / '<Sector>.int'")
+        curves.setdefault(sector, {})[field] = float(value)
+    return params, curves
+
+
+def scenario_grid(axes: Mapping[str, Iterable[float]]) -> Dict[str, dict]:
+    """Cartesian product of override values, keyed by a readable scenario name."""
+    keys = list(axes)
+    if not keys:
+        return {}
+    grid = {}
+    for values in itertools.product(*(list(axes[k]) for k in keys)):
+        overrides = dict(zip(keys, values))
+        grid[", ".join(f"{k}={v}" for k, v in overrides.items())] = overrides
+    return grid
+
+
+def migration_matrix(scale: RatingScale, base_index: np.ndarray, new_index: np.ndarray) -> pd.DataFrame:
+    """Firm counts from base rating (rows) to scenario rating (columns), NR last."""
+    n = len(scale) + 1
+    counts = np.bincount(base_index * n + new_index, minlength=n * n).reshape(n, n)
+    labels = [*scale.labels, "NR"]
+    return pd.DataFrame(counts, index=pd.Index(labels, name="from"), columns=pd.Index(labels, name="to"))
+
+
+class ScenarioEngine:
+    """
+    Evaluates a portfolio under many config overrides from one base scoring.
+
+    The ratios X1-X5 and the overlay components are computed once; each
+    scenario only recomputes the terms its overrides reach (Z_raw, alt_adj,
+    qual_adj, sector curves) and then Z_adj -> PD -> rating. With no
+    overrides, evaluate() reproduces the base scores exactly.
+    """
+
+    def __init__(self, df: pd.DataFrame, sector_col: str, ctx: ScoringContext):
+        self.ctx = ctx
+        self.base = score_components(df, sector_col, ctx)
+        self.base_index = ctx.rating_scale.band_index(self.base["PD_final"])
+        self._sector_codes, self._sectors = pd.factorize(_text(df, sector_col, "Industrials"),
+                                                         use_na_sentinel=False)
+        self._qual_inputs = tuple(_num(df, k, INPUT_DEFAULTS[k])
+                                  for k in ("mgmt_track_record", "industry_survival_rate", "geo_risk"))
+
+    def __len__(self) -> int:
+        return len(self.base_index)
+
+    def _curves(self, curves: Dict[str, Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        b = self.base
+        if not curves or not any(s in curves for s in self._sectors):
+            return b["sector_slope"], b["sector_int"]
+        slope_u, int_u = [], []
+        for sector in self._sectors:
+            slope, intercept = self.ctx.curve_for(sector)
+            override = curves.get(sector, {})
+            slope_u.append(override.get("slope", slope))
+            int_u.append(override.get("int", intercept))
+        codes = self._sector_codes
+        return np.asarray(slope_u, dtype="float64")[codes], np.asarray(int_u, dtype="float64")[codes]
+
+    def evaluate(self, overrides: Mapping[str, float]) -> Dict[str, np.ndarray]:
+        """Z_raw, Z_adj, PD_model, PD_final and rating band index under `overrides`."""
+        params, curves = split_overrides(overrides)
+        ctx, b = self.ctx, self.base
+
+        def value(name):
+            return params.get(name, getattr(ctx, name))
+
+        if _Z_RAW_PARAMS.intersection(params):
+            X4 = b["X4"]
+            if "MV_CAP" in params:
+                cap, mv_ratio = params["MV_CAP"], b["mv_ratio"]
+                X4 = np.where(cap < mv_ratio, cap, mv_ratio)
+            z_raw = (value("W_X1")*b["X1"] + value("W_X2")*b["X2"] + value("W_X3")*b["X3"] +
+                     value("W_X4")*X4 + value("W_X5")*b["X5"])
+        else:
+            z_raw = b["Z_raw"]
+
+        alt_adj = params["ALT_WT"] * (b["alt_mean"] - 0.5) if "ALT_WT" in params else b["alt_adj"]
+        if "QUAL_WT" in params:
+            qw = params["QUAL_WT"]
+            mgmt, survival, geo = self._qual_inputs
+            qual_adj = b["age_pen"] + qw*(mgmt - 0.5) + qw*(survival - 0.5) - qw*geo
+        else:
+            qual_adj = b["qual_adj"]
+
+        z_adj = z_raw + alt_adj + b["cf_adj"] + qual_adj + b["scale_pen"] + b["lev_pen"]
+        slope, intercept = self._curves(curves)
+        pd_model, pd_final = pd_from_z(ctx, z_adj, slope, intercept,
+                                       b["prior_pd"], b["bayes_alpha"], b["floor_pd"])
+        return {"Z_raw": z_raw, "Z_adj": z_adj, "PD_model": pd_model, "PD_final": pd_final,
+                "band": ctx.rating_scale.band_index(pd_final)}
+
+    def run(self, scenarios: Union[Mapping[str, Mapping[str, float]], List[Mapping[str, float]]]) -> Dict[str, dict]:
+        """
+        Evaluate every scenario (a name -> overrides mapping, or a list of
+        overrides named by scenario_grid's convention). Per scenario: the
+        overrides, the rating migration matrix against the base case, mean PD
+        and the number of firms upgraded / downgraded.
+        """
+        if not isinstance(scenarios, Mapping):
+            scenarios = {", ".join(f"{k}={v}" for k, v in o.items()) or "base": o for o in scenarios}
+        base_pd = float(np.nanmean(self.base["PD_final"])) if len(self) else float("nan")
+        results = {}
+        for name, overrides in scenarios.items():
+            out = self.evaluate(overrides)
+            band = out["band"]
+            results[name] = {
+                "overrides": dict(overrides),
+                "migration": migration_matrix(self.ctx.rating_scale, self.base_index, band),
+                "mean_pd": float(np.nanmean(out["PD_final"])) if len(self) else float("nan"),
+                "base_mean_pd": base_pd,
+                "upgrades": int((band < self.base_index).sum()),
+                "downgrades": int((band > self.base_index).sum()),
+            }
+        return results
+
+
+def run_scenarios(df: pd.DataFrame, sector_col: str, ctx: ScoringContext,
+                  scenarios: Union[Mapping[str, Mapping[str, float]], List[Mapping[str, float]]]) -> Dict[str, dict]:
+    """One-shot ScenarioEngine(df, sector_col, ctx).run(scenarios)."""
+    return ScenarioEngine(df, sector_col, ctx).run(scenarios)
+
+
+def scenario_summary(results: Mapping[str, dict]) -> pd.DataFrame:
+    """One row per scenario: mean PD (base and scenario), upgrades, downgrades, unchanged."""
+    rows = []
+    for name, r in results.items():
+        m = r["migration"].to_numpy()
+        rows.append({"scenario": name, "base_mean_pd": r["base_mean_pd"], "mean_pd": r["mean_pd"],
+                     "upgrades": r["upgrades"], "downgrades": r["downgrades"],
+                     "unchanged": int(np.trace(m))})
+    return pd.DataFrame(rows)
+
+
+def migrations_long(results: Mapping[str, dict]) -> pd.DataFrame:
+    """All migration matrices stacked as (scenario, from, to, firms), non-zero cells only."""
+    frames = []
+    for name, r in results.items():
+        cells = r["migration"].stack()
+        cells = cells[cells > 0].rename("firms").reset_index()
+        frames.append(cells.assign(scenario=name)[["scenario", "from", "to", "firms"]])
+    if not frames:
+        return pd.DataFrame(columns=["scenario", "from", "to", "firms"])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,333 @@
+from __future__ import annotations
+import asyncio
+import json
+import math
+import sys
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from ..core import INPUT_DEFAULTS, OUTPUT_COLUMNS, small_firm_score
+from .context_helper import ScoringContext
+from .validation_helper import REASON_CODES, REQUIRED_NUMERIC, validate_record
+
+# JSON clients may send numbers as strings; validate_record accepts anything float() takes
+NUMERIC_FIELDS = (*REQUIRED_NUMERIC, *INPUT_DEFAULTS)
+
+
+class LatencyHistogram:
+    """
+    Log-spaced latency histogram (10 buckets per decade from 1us to 10s).
+    Cheap enough to update on every request; quantiles are read from the
+    bucket upper edges.
+    """
+    EDGES_US = tuple(10 ** (k / 10) for k in range(0, 71))
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES_US) + 1)
+        self.total = 0
+        self.sum_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, seconds: float) -> None:
+        us = seconds * 1e6
+        self.counts[bisect_right(self.EDGES_US, us)] += 1
+        self.total += 1
+        self.sum_us += us
+        self.max_us = max(self.max_us, us)
+
+    def quantile(self, q: float) -> float:
+        if not self.total:
+            return 0.0
+        target = q * self.total
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return self.EDGES_US[i] if i < len(self.EDGES_US) else self.max_us
+        return self.max_us
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.total,
+            "mean_us": self.sum_us / self.total if self.total else 0.0,
+            "p50_us": self.quantile(0.50),
+            "p90_us": self.quantile(0.90),
+            "p99_us": self.quantile(0.99),
+            "max_us": self.max_us,
+        }
+
+
+def _clean(value):
+    """JSON-safe scalar (numpy -> python, NaN/inf -> None)."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class ScoringService:
+    """
+    Long-lived scorer that keeps a ScoringContext warm and coalesces
+    concurrent requests into micro-batches.
+
+    Requests wait at most `max_wait_ms` for company; a batch closes at
+    `max_batch` records. Batches smaller than `vector_min` go through
+    core.small_firm_score per record (lowest latency for a lone applicant),
+    larger ones through the vectorized engine.
+    """
+
+    def __init__(self, ctx: ScoringContext, sector_col: str = "sector",
+                 max_batch: int = 256, max_wait_ms: float = 1.0, vector_min: int = 32):
+        self.ctx = ctx
+        self.sector_col = sector_col
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.vector_min = vector_min
+        self.latency = LatencyHistogram()
+        self.batch_latency = LatencyHistogram()
+        self.batch_sizes: Dict[int, int] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "ScoringService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    # ---- scoring ----
+    def score_records(self, records: List[dict]) -> List[dict]:
+        """Score records synchronously; invalid ones get an `error` entry instead."""
+        # JSON null means "not supplied", like a missing key
+        records = [{k: v for k, v in rec.items() if v is not None} if isinstance(rec, dict) else rec
+                   for rec in records]
+        results: List[Optional[dict]] = [None] * len(records)
+        valid = []
+        for i, rec in enumerate(records):
+            if not isinstance(rec, dict):
+                results[i] = {"error": f"record must be a JSON object, got {type(rec).__name__}"}
+                continue
+            reasons = validate_record(rec)
+            if reasons:
+                results[i] = {"error": "; ".join(REASON_CODES[r] for r in reasons), "reason_codes": reasons}
+            else:
+                valid.append(i)
+
+        if len(valid) < self.vector_min:
+            for i in valid:
+                results[i] = self._score_one(records[i])
+        elif valid:
+            try:
+                self._score_vectorized(records, valid, results)
+            except Exception:  # one record the frame path chokes on must not fail the rest
+                for i in valid:
+                    results[i] = self._score_one(records[i])
+        return results
+
+    def _score_one(self, rec: dict) -> dict:
+        """Scalar path for one validated record; a failure becomes that record's `error`."""
+        try:
+            rec = {**rec, **{k: float(rec[k]) for k in NUMERIC_FIELDS if k in rec}}
+            sector = rec.get(self.sector_col, "Industrials")
+            prior = self.ctx.prior_table.get(rec.get("Country", "") or "", sector or "")
+            data = {**INPUT_DEFAULTS, **rec, "sector_prior_pd": prior}
+            out = small_firm_score(data, sector, self.ctx)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        return {k: _clean(v) for k, v in out.items()}
+
+    def _score_vectorized(self, records: List[dict], valid: List[int], results: List[Optional[dict]]) -> None:
+        import pandas as pd
+        from .vector_helper import score_frame
+
+        df = pd.DataFrame.from_records([records[i] for i in valid])
+        # keys absent from some records take the same defaults as the scalar path
+        df = df.fillna({k: v for k, v in INPUT_DEFAULTS.items() if k in df.columns})
+        frame = score_frame(df, self.sector_col, self.ctx)
+        cols = [frame[c].to_numpy() for c in OUTPUT_COLUMNS]
+        for row, i in enumerate(valid):
+            results[i] = {c: _clean(col[row]) for c, col in zip(OUTPUT_COLUMNS, cols)}
+
+    def _score_alone(self, record: dict) -> dict:
+        try:
+            return self.score_records([record])[0]
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    async def score(self, record: dict) -> dict:
+        """Score one applicant; concurrent calls are coalesced into batches."""
+        if self._worker is None:
+            await self.start()
+        fut = asyncio.get_running_loop().create_future()
+        t0 = time.perf_counter()
+        await self._queue.put((record, fut))
+        result = await fut
+        self.latency.record(time.perf_counter() - t0)
+        return result
+
+    async def score_batch(self, records: List[dict]) -> List[dict]:
+        """Score a client micro-batch; its records join the shared coalescing queue."""
+        return list(await asyncio.gather(*(self.score(r) for r in records)))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            t0 = time.perf_counter()
+            try:
+                results = self.score_records([rec for rec, _ in batch])
+            except Exception:  # never leave callers hanging; only the offending record gets the error
+                results = [self._score_alone(rec) for rec, _ in batch]
+            self.batch_latency.record(time.perf_counter() - t0)
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+
+    def stats(self) -> dict:
+        return {
+            "request_latency": self.latency.snapshot(),
+            "batch_latency": self.batch_latency.snapshot(),
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
+
+    # ---- JSON-lines protocol ----
+    async def handle_message(self, msg: dict) -> dict:
+        """
+        {"id": .., "record": {...}}    -> {"id": .., "result": {...}}
+        {"id": .., "records": [...]}   -> {"id": .., "results": [...]}
+        {"id": .., "op": "stats"}      -> {"id": .., "stats": {...}}
+        """
+        reply = {"id": msg.get("id")}
+        if "record" in msg:
+            reply["result"] = await self.score(msg["record"])
+        elif "records" in msg:
+            reply["results"] = await self.score_batch(msg["records"])
+        elif msg.get("op") == "stats":
+            reply["stats"] = self.stats()
+        else:
+            reply["error"] = "expected 'record', 'records' or op='stats'"
+        return reply
+
+    async def handle_line(self, line: str) -> str:
+        try:
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise ValueError("message must be a JSON object")
+        except ValueError as e:
+            return json.dumps({"id": None, "error": f"bad request: {e}"})
+        return json.dumps(await self.handle_message(msg))
+
+
+async def serve_stdio(service: ScoringService) -> None:
+    """JSON-lines over stdin/stdout; requests are handled concurrently."""
+    loop = asyncio.get_running_loop()
+    write_lock = asyncio.Lock()
+    pending = set()
+
+    async def _one(line: str) -> None:
+        reply = await service.handle_line(line)
+        async with write_lock:
+            sys.stdout.write(reply + "\n")
+            sys.stdout.flush()
+
+    async with service:
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(_one(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+
+async def serve_tcp(service: ScoringService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """JSON-lines over TCP; each connection may pipeline requests."""
+    async def _client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def _one(line: str) -> None:
+            reply = await service.handle_line(line)
+            async with lock:
+                writer.write((reply + "\n").encode())
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(_one(line.decode()))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async with service:
+        server = await asyncio.start_server(_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+class LocalClient:
+    """
+    In-process stand-in for a remote client: speaks the JSON-lines protocol
+    (serialises requests and parses replies) without a socket.
+    """
+
+    def __init__(self, service: ScoringService):
+        self.service = service
+        self._next_id = 0
+
+    async def _call(self, payload: dict) -> dict:
+        self._next_id += 1
+        rid = self._next_id
+        reply = json.loads(await self.service.handle_line(json.dumps({"id": rid, **payload})))
+        if reply.get("id") != rid:
+            raise RuntimeError("reply id mismatch")
+        return reply
+
+    async def score(self, record: dict) -> dict:
+        return (await self._call({"record": record}))["result"]
+
+    async def score_batch(self, records: List[dict]) -> List[dict]:
+        return (await self._call({"records": records}))["results"]
+
+    async def stats(self) -> dict:
+        return (await self._call({"op": "stats"}))["stats"]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .io_helper import read_table
+
+STORE_VERSION = 1
+STORE_MANIFEST = "store.json"
+
+
+def is_store(path: str | Path) -> bool:
+    """True for a directory written by write_store."""
+    return (Path(path) / STORE_MANIFEST).is_file()
+
+
+def _codes_dtype(n_categories: int) -> str:
+    # the code width pandas picks itself, so from_codes keeps the memmap as-is
+    if n_categories < 2**7:
+        return "int8"
+    if n_categories < 2**15:
+        return "int16"
+    return "int32"
+
+
+def _encode(col: pd.Series) -> tuple:
+    """(array, manifest entry) for one column: numeric/bool/datetime as-is, text dictionary-encoded."""
+    dtype = col.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype)):
+        cat = col if isinstance(dtype, pd.CategoricalDtype) else col.astype("category")
+        categories = [str(c) for c in cat.cat.categories]
+        codes = cat.cat.codes.to_numpy().astype(_codes_dtype(len(categories)))
+        return codes, {"kind": "dict", "categories": categories}
+    if getattr(dtype, "tz", None) is not None:
+        return col.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(), {"kind": "numeric", "tz": str(dtype.tz)}
+    if pd.api.types.is_extension_array_dtype(dtype):
+        # nullable Int64/Float64/boolean: NA -> NaN, stored as float64
+        return col.to_numpy(dtype="float64", na_value=np.nan), {"kind": "numeric"}
+    return col.to_numpy(), {"kind": "numeric"}
+
+
+def write_store(df: pd.DataFrame, path: str | Path) -> Path:
+    """
+    Write df as a columnar store: one `.npy` file per column plus store.json.
+
+    Text and categorical columns (sector, Country, ratings, names) are
+    dictionary-encoded as integer codes with the categories in the manifest;
+    numeric, bool and datetime columns are stored as they are. The store is
+    written next to `path` and swapped in, so readers never see half a store.
+    """
+    path = Path(path)
+    if len(set(df.columns)) != len(df.columns):
+        raise ValueError("Store columns must be unique")
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    columns = []
+    for i, name in enumerate(df.columns):
+        array, entry = _encode(df[name])
+        fname = f"c{i:04d}.npy"
+        np.save(tmp / fname, np.ascontiguousarray(array), allow_pickle=False)
+        columns.append({"name": str(name), "file": fname, "dtype": str(array.dtype), **entry})
+    manifest = {"version": STORE_VERSION, "rows": len(df), "columns": columns}
+    (tmp / STORE_MANIFEST).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return path
+
+
+def store_manifest(path: str | Path) -> dict:
+    manifest = json.loads((Path(path) / STORE_MANIFEST).read_text(encoding="utf-8"))
+    if manifest.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported store version {manifest.get('version')!r} in {path}; rebuild it")
+    return manifest
+
+
+def open_store(path: str | Path, columns: Optional[Iterable[str]] = None,
+               start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+    """
+    The store as a DataFrame whose columns are read-only views of the
+    memory-mapped `.npy` files (no parse, no copy). Dictionary columns come
+    back as categoricals over the stored codes. `columns` projects (names
+    missing from the store are ignored, like read_table); start/stop select
+    a row range without touching the other pages. Processes opening the same
+    store share its pages through the OS page cache.
+    """
+    path = Path(path)
+    manifest = store_manifest(path)
+    wanted = None if columns is None else set(columns)
+    data = {}
+    for entry in manifest["columns"]:
+        if wanted is not None and entry["name"] not in wanted:
+            continue
+        array = np.load(path / entry["file"], mmap_mode="r")[start:stop]
+        if entry["kind"] == "dict":
+            data[entry["name"]] = pd.Categorical.from_codes(array, categories=entry["categories"])
+        elif "tz" in entry:
+            data[entry["name"]] = pd.Series(array).dt.tz_localize("UTC").dt.tz_convert(entry["tz"]).array
+        else:
+            data[entry["name"]] = array
+    n = len(range(manifest["rows"])[start:stop])
+    return pd.DataFrame(data, index=pd.RangeIndex(n), copy=False)
+
+
+def iter_store_chunks(path: str | Path, chunk_size: int,
+                      columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """Row slices of the store, each a zero-copy view like open_store."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    rows = store_manifest(path)["rows"]
+    cols: Optional[List[str]] = None if columns is None else list(columns)
+    for lo in range(0, rows, chunk_size):
+        yield open_store(path, cols, start=lo, stop=lo + chunk_size)
+
+
+def store_rows(path: str | Path) -> int:
+    return int(store_manifest(path)["rows"])
+
+
+def read_input(path: str | Path, sheet: Optional[str] = None,
+               columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """open_store for a store directory, read_table for anything else."""
+    if is_store(path):
+        return open_store(path, columns)
+    return read_table(path, sheet=sheet, columns=columns)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+from typing import Dict, List, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from .context_helper import ScoringContext
+from .quant_helper import GCC_COUNTRIES
+from .scenario_helper import migration_matrix
+from .vector_helper import _num, _text, pd_from_z, score_components
+
+# Shock types a stress scenario may list. Every shock can be narrowed with
+# `countries:` (upper-cased; "GCC" expands to its members) and `sectors:`.
+#   sovereign_downgrade  notches: n        country rating moved n notches down the scale
+#   prior_shock          multiplier / add  Bayes prior PD scaled and/or shifted (clipped to [0, 1])
+#   revenue_haircut      pct               revenue *= 1 - pct  (X5, SCALE_PEN threshold)
+#   ebit_haircut         pct               ebit *= 1 - pct     (X3)
+#   liabilities_uplift   pct               total_liabilities *= 1 + pct  (X4, LOW_LEV_PEN line)
+SHOCK_TYPES = ("sovereign_downgrade", "prior_shock", "revenue_haircut", "ebit_haircut", "liabilities_uplift")
+PD_QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_LGD = 0.45
+
+
+def _country_set(countries: Sequence[str]) -> set:
+    names = {str(c).upper().strip() for c in countries}
+    if "GCC" in names:
+        names |= GCC_COUNTRIES
+    return names
+
+
+def check_shocks(shocks: List[dict]) -> List[dict]:
+    """Validate a scenario's shock list up front so a typo fails before any scoring."""
+    for shock in shocks:
+        kind = shock.get("type")
+        if kind not in SHOCK_TYPES:
+            raise ValueError(f"Unknown shock type {kind!r}; expected one of {SHOCK_TYPES}")
+        if kind == "sovereign_downgrade" and int(shock.get("notches", 0)) < 0:
+            raise ValueError("sovereign_downgrade notches must be >= 0")
+        if kind in ("revenue_haircut", "ebit_haircut", "liabilities_uplift") and "pct" not in shock:
+            raise ValueError(f"{kind} needs a `pct`")
+    return shocks
+
+
+class StressEngine:
+    """
+    Applies YAML-declared shocks as array operations over a scored base case.
+
+    Inputs and components are read once; a scenario re-derives only what its
+    shocks touch (X3/X5/SCALE_PEN for revenue/EBIT haircuts, X4/LOW_LEV_PEN
+    for liabilities, the prior or the sovereign floor) and re-runs
+    Z_adj -> PD -> rating. Per-firm results are not kept, so many scenarios
+    over a large book only cost a few arrays each.
+    """
+
+    def __init__(self, df: pd.DataFrame, sector_col: str, ctx: ScoringContext,
+                 exposure: Optional[np.ndarray] = None, lgd=DEFAULT_LGD):
+        self.ctx = ctx
+        self.base = score_components(df, sector_col, ctx)
+        self.n = len(df)
+        self.base_index = ctx.rating_scale.band_index(self.base["PD_final"])
+        self.exposure = np.ones(self.n) if exposure is None else np.asarray(exposure, dtype="float64")
+        self.lgd = np.broadcast_to(np.asarray(lgd, dtype="float64"), (self.n,))
+
+        self.raw = {k: _num(df, k) for k in ("revenue", "ebit", "total_assets",
+                                             "total_liabilities", "market_value_equity")}
+        self.country = _text(df, "Country").astype(str).str.upper().str.strip().to_numpy()
+        self.sector = _text(df, sector_col, "Industrials").astype(str).str.strip().to_numpy()
+
+        # country rating as a position on the scale (-1 = unrated / unknown label)
+        scale = ctx.rating_scale
+        primary = _text(df, "Country Rating")
+        ctry_rating = primary.where(primary.astype(bool), _text(df, "country_rating"))
+        pos = {label.upper().strip(): i for i, label in enumerate(scale.labels)}
+        self.ctry_index = ctry_rating.astype(str).str.upper().str.strip().map(pos).fillna(-1) \
+            .to_numpy(dtype="int64")
+        self._notch_pd = np.array([scale.pd_for(label) for label in scale.labels], dtype="float64")
+
+    def _mask(self, shock: dict) -> np.ndarray:
+        mask = np.ones(self.n, dtype=bool)
+        if shock.get("countries"):
+            mask &= np.isin(self.country, list(_country_set(shock["countries"])))
+        if shock.get("sectors"):
+            mask &= np.isin(self.sector, [str(s).strip() for s in shock["sectors"]])
+        return mask
+
+    def evaluate(self, shocks: List[dict]) -> Dict[str, np.ndarray]:
+        """PD_final, rating band and the shocked penalties under one scenario's shocks."""
+        ctx, b, raw = self.ctx, self.base, self.raw
+        rev, ebit, tl = raw["revenue"], raw["ebit"], raw["total_liabilities"]
+        prior, floor = b["prior_pd"], b["floor_pd"]
+        notches = np.zeros(self.n, dtype="int64")
+        touched = set()
+
+        for shock in check_shocks(shocks):
+            kind, mask = shock["type"], self._mask(shock)
+            if kind == "revenue_haircut":
+                rev = np.where(mask, rev * (1 - float(shock["pct"])), rev)
+            elif kind == "ebit_haircut":
+                ebit = np.where(mask, ebit * (1 - float(shock["pct"])), ebit)
+            elif kind == "liabilities_uplift":
+                tl = np.where(mask, tl * (1 + float(shock["pct"])), tl)
+            elif kind == "prior_shock":
+                shocked = prior * float(shock.get("multiplier", 1.0)) + float(shock.get("add", 0.0))
+                prior = np.where(mask, np.clip(shocked, 0.0, 1.0), prior)
+            else:
+                notches = notches + np.where(mask, int(shock.get("notches", 1)), 0)
+            touched.add(kind)
+
+        ta = raw["total_assets"]
+        X3, X4, X5 = b["X3"], b["X4"], b["X5"]
+        scale_pen, lev_pen = b["scale_pen"], b["lev_pen"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if "ebit_haircut" in touched:
+                X3 = ebit / ta
+            if "revenue_haircut" in touched:
+                X5 = rev / ta
+                scale_pen = np.where(rev < 5_000_000, float(ctx.SCALE_PEN), 0.0)
+            if "liabilities_uplift" in touched:
+                mv_ratio = raw["market_value_equity"] / tl
+                X4 = np.where(ctx.MV_CAP < mv_ratio, ctx.MV_CAP, mv_ratio)
+                lev_pen = np.where(tl / ta > 0.5, float(ctx.LOW_LEV_PEN), 0.0)
+
+        if touched & {"ebit_haircut", "revenue_haircut", "liabilities_uplift"}:
+            z_raw = ctx.W_X1*b["X1"] + ctx.W_X2*b["X2"] + ctx.W_X3*X3 + ctx.W_X4*X4 + ctx.W_X5*X5
+        else:
+            z_raw = b["Z_raw"]
+        z_adj = z_raw + b["alt_adj"] + b["cf_adj"] + b["qual_adj"] + scale_pen + lev_pen
+
+        if notches.any():
+            rated = self.ctry_index >= 0
+            moved = np.minimum(self.ctry_index + notches, len(self._notch_pd) - 1)
+            floor = np.where(rated & (notches > 0), self._notch_pd[np.where(rated, moved, 0)], floor)
+
+        _, pd_final = pd_from_z(ctx, z_adj, b["sector_slope"], b["sector_int"],
+                                prior, b["bayes_alpha"], floor)
+        return {"PD_final": pd_final, "band": ctx.rating_scale.band_index(pd_final),
+                "scale_pen": scale_pen, "lev_pen": lev_pen}
+
+    def expected_loss(self, pd_final: np.ndarray) -> float:
+        return float(np.nansum(self.exposure * self.lgd * pd_final))
+
+    def _stats(self, pd_final: np.ndarray) -> dict:
+        finite = pd_final[np.isfinite(pd_final)]
+        stats = {"mean_pd": float(finite.mean()) if finite.size else float("nan")}
+        for q in PD_QUANTILES:
+            stats[f"p{round(q * 100)}_pd"] = float(np.quantile(finite, q)) if finite.size else float("nan")
+        return stats
+
+    def run(self, scenarios: Mapping[str, List[dict]]) -> Dict[str, dict]:
+        """
+        Per scenario: PD distribution (mean and PD_QUANTILES), expected loss
+        and its delta against the base case, firms pushed under the SCALE_PEN
+        revenue threshold or over the LOW_LEV_PEN leverage line, rating
+        counts and the base -> stressed migration matrix.
+        """
+        scale = self.ctx.rating_scale
+        b = self.base
+        base_el = self.expected_loss(b["PD_final"])
+        labels = [*scale.labels, "NR"]
+        results = {"base": {
+            **self._stats(b["PD_final"]), "el": base_el, "el_delta": 0.0, "el_delta_pct": 0.0,
+            "upgrades": 0, "downgrades": 0, "new_scale_pen": 0, "new_lev_pen": 0,
+            "ratings": pd.Series(np.bincount(self.base_index, minlength=len(labels)), index=labels),
+            "migration": migration_matrix(scale, self.base_index, self.base_index),
+        }}
+        for name, shocks in scenarios.items():
+            out = self.evaluate(shocks)
+            band, el = out["band"], self.expected_loss(out["PD_final"])
+            results[name] = {
+                **self._stats(out["PD_final"]),
+                "el": el,
+                "el_delta": el - base_el,
+                "el_delta_pct": (el - base_el) / base_el if base_el else float("nan"),
+                "upgrades": int((band < self.base_index).sum()),
+                "downgrades": int((band > self.base_index).sum()),
+                "new_scale_pen": int(((out["scale_pen"] != 0) & (b["scale_pen"] == 0)).sum()),
+                "new_lev_pen": int(((out["lev_pen"] != 0) & (b["lev_pen"] == 0)).sum()),
+                "ratings": pd.Series(np.bincount(band, minlength=len(labels)), index=labels),
+                "migration": migration_matrix(scale, self.base_index, band),
+            }
+        return results
+
+
+def stress_summary(results: Mapping[str, dict]) -> pd.DataFrame:
+    """One row per scenario (base first) with the scalar results."""
+    rows = [{"scenario": name, **{k: v for k, v in r.items() if np.isscalar(v)}}
+            for name, r in results.items()]
+    return pd.DataFrame(rows)
+
+
+def rating_distribution(results: Mapping[str, dict]) -> pd.DataFrame:
+    """Firms per rating, one column per scenario."""
+    return pd.DataFrame({name: r["ratings"] for name, r in results.items()}).rename_axis("Rating")
+
+
+def load_stress_spec(spec: dict) -> tuple:
+    """(scenarios, lgd) from a parsed stress YAML; every shock list is validated."""
+    scenarios = spec.get("scenarios") or {}
+    if not scenarios:
+        raise ValueError("Stress spec defines no scenarios")
+    scenarios = {name: check_shocks(list(shocks or [])) for name, shocks in scenarios.items()}
+    return scenarios, float(spec.get("lgd", DEFAULT_LGD))
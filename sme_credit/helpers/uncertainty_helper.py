@@ -0,0 +1,232 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from ..core import INPUT_DEFAULTS
+from .context_helper import ScoringContext
+from .explain_helper import OVERLAY_TERMS
+from .vector_helper import _num, pd_from_z, score_components
+
+DISTRIBUTIONS = ("beta", "normal", "lognormal", "uniform")
+DEFAULT_DRAWS = 1000
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+DEFAULT_MEMORY_MB = 256
+# float64 (firms x draws) arrays alive at once while a block is simulated
+CELL_ARRAYS = 6
+_EPS = 1e-9
+
+
+def load_uncertainty_spec(spec: Mapping) -> dict:
+    """Validate a parsed uncertainty YAML (see config/uncertainty.yaml) and fill in the defaults."""
+    inputs = {}
+    for field, d in (spec.get("inputs") or {}).items():
+        d = dict(d or {})
+        if field not in OVERLAY_TERMS:
+            raise ValueError(f"Cannot sample {field!r}; expected one of {sorted(OVERLAY_TERMS)}")
+        dist = d.get("dist")
+        if dist not in DISTRIBUTIONS:
+            raise ValueError(f"{field}: unknown dist {dist!r}; expected one of {DISTRIBUTIONS}")
+        if dist == "uniform":
+            if not float(d.get("low", np.nan)) < float(d.get("high", np.nan)):
+                raise ValueError(f"{field}: uniform needs low < high")
+            if d.get("observed_sd"):
+                raise ValueError(f"{field}: observed_sd needs a beta, normal or lognormal dist")
+        elif not float(d.get("sd", 0)) > 0:
+            raise ValueError(f"{field}: {dist} needs sd > 0")
+        d.setdefault("mean", INPUT_DEFAULTS[field])
+        inputs[field] = d
+    prior = spec.get("prior")
+    if prior is not None:
+        if prior.get("dist", "beta") != "beta" or float(prior.get("rel_sd", -1)) < 0:
+            raise ValueError("prior: expected {dist: beta, rel_sd: >= 0}")
+        prior = {"dist": "beta", "rel_sd": float(prior["rel_sd"])}
+    quantiles = tuple(sorted(float(q) for q in spec.get("quantiles", DEFAULT_QUANTILES)))
+    if not all(0 < q < 1 for q in quantiles):
+        raise ValueError("quantiles must lie strictly between 0 and 1")
+    draws = int(spec.get("draws", DEFAULT_DRAWS))
+    if draws <= 0:
+        raise ValueError("draws must be positive")
+    return {
+        "draws": draws,
+        "seed": spec.get("seed"),
+        "quantiles": quantiles,
+        "memory_mb": float(spec.get("memory_mb", DEFAULT_MEMORY_MB)),
+        "inputs": inputs,
+        "prior": prior,
+    }
+
+
+def _beta(rng: np.random.Generator, mean, sd, shape) -> np.ndarray:
+    """Beta draws with the given mean/sd (sd capped where the beta would turn U-shaped)."""
+    m = np.clip(mean, _EPS, 1 - _EPS)
+    var = np.clip(np.square(sd), 1e-18, m*(1 - m)*0.999)
+    k = m*(1 - m)/var - 1
+    return rng.beta(m*k, (1 - m)*k, shape)
+
+
+def _draw(rng: np.random.Generator, d: dict, center, sd: float, shape) -> np.ndarray:
+    dist = d["dist"]
+    if dist == "uniform":
+        return rng.uniform(float(d["low"]), float(d["high"]), shape)
+    if dist == "beta":
+        return _beta(rng, center, sd, shape)
+    if dist == "lognormal":
+        m = np.maximum(center, _EPS)
+        s2 = np.log1p(np.square(sd / m))
+        return np.exp(np.log(m) - s2/2 + np.sqrt(s2)*rng.standard_normal(shape))
+    x = center + sd*rng.standard_normal(shape)
+    if "low" in d or "high" in d:
+        x = np.clip(x, float(d.get("low", -np.inf)), float(d.get("high", np.inf)))
+    return x
+
+
+def quantile_columns(quantiles: Sequence[float]) -> List[str]:
+    return [f"p{q * 100:g}" for q in quantiles]
+
+
+def simulate_block(ctx: ScoringContext, spec: dict, block: Dict[str, np.ndarray],
+                   seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """
+    Score every draw of one block of firms as (firms x draws) arrays and
+    reduce them to per-firm statistics.
+    """
+    rng = np.random.default_rng(seed)
+    draws = spec["draws"]
+    z = np.repeat(block["z"][:, None], draws, axis=1)
+    for field, d in spec["inputs"].items():
+        raw = block[f"in:{field}"]
+        missing = np.isnan(raw)
+        rows = missing if not d.get("observed_sd") else np.ones(len(raw), dtype=bool)
+        if not rows.any():
+            continue
+        point = np.where(missing, INPUT_DEFAULTS[field], raw)[rows]
+        center = np.where(missing[rows], float(d["mean"]), point)[:, None]
+        sd = np.where(missing[rows], float(d.get("sd", 0.0)), float(d.get("observed_sd", 0.0)))[:, None]
+        sampled = _draw(rng, d, center, sd, (int(rows.sum()), draws))
+        term = OVERLAY_TERMS[field]
+        z[rows] += term(ctx, sampled) - term(ctx, point)[:, None]
+
+    prior = block["prior"][:, None]
+    if ctx.USE_BAYES_PRIOR and spec["prior"] and spec["prior"]["rel_sd"] > 0:
+        prior = _beta(rng, prior, spec["prior"]["rel_sd"]*prior, z.shape)
+    _, pd_final = pd_from_z(ctx, z, block["slope"][:, None], block["int"][:, None],
+                            prior, block["alpha"][:, None], block["floor"][:, None])
+    del z, prior
+
+    scale = ctx.rating_scale
+    band, base = scale.band_index(pd_final), block["band"][:, None]
+    out = {
+        "PD_mean": pd_final.mean(axis=1),
+        "PD_sd": pd_final.std(axis=1),
+        "flip_prob": (band != base).mean(axis=1),
+        "downgrade_prob": (band > base).mean(axis=1),
+        "upgrade_prob": (band < base).mean(axis=1),
+    }
+    del band
+    qs = np.quantile(pd_final, spec["quantiles"], axis=1)
+    for name, values in zip(quantile_columns(spec["quantiles"]), qs):
+        out[f"PD_{name}"] = values
+    return out
+
+
+_WORKER: Optional[Tuple[ScoringContext, dict]] = None
+
+
+def _init_worker(ctx: ScoringContext, spec: dict) -> None:
+    global _WORKER
+    _WORKER = (ctx, spec)
+
+
+def _simulate_in_worker(block: Dict[str, np.ndarray], seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    return simulate_block(*_WORKER, block, seed)
+
+
+class UncertaintyEngine:
+    """
+    Monte Carlo PD and rating intervals for a book.
+
+    The point PD and rating are the book's ordinary score, as score_many
+    gives it (a blank overlay input leaves Z_adj NaN, so PD_model is 0).
+    Draws start from Z_adj with blank sampled inputs at their INPUT_DEFAULTS
+    value (rescoring only the rows that have one); each draw then only moves
+    the Z_adj terms of the sampled inputs and the Bayes prior, and re-runs
+    Z_adj -> PD. Firms are simulated in blocks sized so the
+    (firms x draws) arrays of a block stay within memory_mb; blocks can go
+    to worker processes. Every block has its own random stream derived
+    from (seed, block number), so the results depend on seed, draws and
+    memory_mb but not on the number of workers.
+    """
+
+    def __init__(self, df: pd.DataFrame, sector_col: str, ctx: ScoringContext, spec: Mapping):
+        self.ctx = ctx
+        self.spec = load_uncertainty_spec(spec)
+        self.n = len(df)
+        raw = {f: _num(df, f) for f in self.spec["inputs"]}
+        self.point = p = score_components(df, sector_col, ctx)
+        z = p["Z_adj"].copy()
+        blank = np.zeros(self.n, dtype=bool)
+        for f, v in raw.items():
+            if f in df.columns:  # an absent column is already scored at its default
+                blank |= np.isnan(v)
+        if blank.any():
+            filled = df[blank].assign(**{f: np.where(np.isnan(v[blank]), INPUT_DEFAULTS[f], v[blank])
+                                         for f, v in raw.items()})
+            z[blank] = score_components(filled, sector_col, ctx)["Z_adj"]
+        self.arrays = {
+            "z": z, "slope": p["sector_slope"], "int": p["sector_int"],
+            "alpha": p["bayes_alpha"], "prior": p["prior_pd"], "floor": p["floor_pd"],
+            "band": ctx.rating_scale.band_index(p["PD_final"]),
+            **{f"in:{f}": v for f, v in raw.items()},
+        }
+
+    def block_rows(self, draws: int, memory_mb: float) -> int:
+        return max(1, int(memory_mb * 2**20 // (draws * 8 * CELL_ARRAYS)))
+
+    def run(self, draws: Optional[int] = None, seed: Optional[int] = None,
+            memory_mb: Optional[float] = None, workers: int = 1) -> pd.DataFrame:
+        """
+        Per firm (input order): the point PD and rating, mean/sd and quantiles
+        of the simulated PD with the rating at each quantile, and the
+        probability that a draw's rating differs from (is worse / better
+        than) the point rating. Arguments override the spec's values.
+        """
+        spec = dict(self.spec)
+        spec["draws"] = int(draws or spec["draws"])
+        spec["memory_mb"] = float(memory_mb or spec["memory_mb"])
+        seed = spec["seed"] if seed is None else seed
+        rows = self.block_rows(spec["draws"], spec["memory_mb"])
+        starts = range(0, self.n, rows)
+        blocks = [{k: v[lo:lo + rows] for k, v in self.arrays.items()} for lo in starts]
+        root = np.random.SeedSequence(seed)
+        seeds = [np.random.SeedSequence(root.entropy, spawn_key=(i,)) for i in range(len(blocks))]
+
+        if workers > 1 and len(blocks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.ctx, spec)) as pool:
+                parts = list(pool.map(_simulate_in_worker, blocks, seeds))
+        else:
+            parts = [simulate_block(self.ctx, spec, b, s) for b, s in zip(blocks, seeds)]
+
+        scale = self.ctx.rating_scale
+        out = {"PD_point": self.point["PD_final"], "Rating_point": self.point["Rating"]}
+        for name in (parts[0] if parts else {}):
+            out[name] = np.concatenate([part[name] for part in parts])
+        for name in quantile_columns(spec["quantiles"]):
+            if f"PD_{name}" in out:
+                out[f"Rating_{name}"] = scale.ratings(out[f"PD_{name}"])
+        return pd.DataFrame(out)
+
+
+def uncertainty_summary(result: pd.DataFrame) -> dict:
+    """Book-level view: mean PD spread, average flip probability and firms likely to move."""
+    finite = result[np.isfinite(result["PD_mean"])]
+    return {
+        "firms": int(len(result)),
+        "mean_pd_point": float(finite["PD_point"].mean()),
+        "mean_pd_sim": float(finite["PD_mean"].mean()),
+        "mean_pd_sd": float(finite["PD_sd"].mean()),
+        "mean_flip_prob": float(finite["flip_prob"].mean()),
+        "firms_flip_over_50pct": int((finite["flip_prob"] > 0.5).sum()),
+    }
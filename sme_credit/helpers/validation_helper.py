@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+import numpy as np
+
+if TYPE_CHECKING:  # validate_record stays pandas-free for the service's scalar path
+    import pandas as pd
+
+# lightweight schema for validation (no extra deps)
+REQUIRED_NUMERIC = [
+    "revenue",
+    "total_assets",
+    "total_liabilities",
+    "ebit",
+    "retained_earnings",
+    "working_capital",
+    "market_value_equity",
+]
+
+# overlay inputs that are scores on [0, 1]
+UNIT_SCORES = [
+    "trade_credit",
+    "utility_pay",
+    "bank_tx",
+    "tax_compliance",
+    "digital_footprint",
+    "revenue_quality",
+    "mgmt_track_record",
+    "industry_survival_rate",
+    "geo_risk",
+]
+
+# reason code -> description (one bit per rule in the packed row code)
+REASON_CODES: Dict[str, str] = {
+    "NON_NUMERIC": "required numeric field missing, NaN or not a number",
+    "ZERO_TOTAL_ASSETS": "total_assets is zero (X1/X2/X3/X5 divide by it)",
+    "ZERO_TOTAL_LIABILITIES": "total_liabilities is zero (X4 divides by it)",
+    "OVERLAY_OUT_OF_RANGE": "overlay score outside [0, 1]",
+}
+
+
+def _coerce(df: pd.DataFrame, col: str) -> np.ndarray:
+    import pandas as pd
+
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def rule_masks(df: pd.DataFrame,
+               required_numeric: Iterable[str] = REQUIRED_NUMERIC,
+               unit_scores: Iterable[str] = UNIT_SCORES) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Evaluate every rule as a boolean mask over the whole frame.
+    Returns (masks by reason code, bad-required-column matrix, out-of-range matrix).
+    """
+    required_numeric = list(required_numeric)
+    unit_scores = [c for c in unit_scores if c in df.columns]
+    num = {c: _coerce(df, c) for c in required_numeric}
+
+    bad_num = np.column_stack([np.isnan(num[c]) for c in required_numeric]) if required_numeric \
+        else np.zeros((len(df), 0), dtype=bool)
+    if unit_scores:
+        units = np.column_stack([_coerce(df, c) for c in unit_scores])
+        out_of_range = (units < 0) | (units > 1)
+    else:
+        out_of_range = np.zeros((len(df), 0), dtype=bool)
+
+    # a missing total_assets column counts as zero, as in the per-row check
+    ta = num["total_assets"] if "total_assets" in num else _coerce(df, "total_assets")
+    tl = num["total_liabilities"] if "total_liabilities" in num else _coerce(df, "total_liabilities")
+    masks = {
+        "NON_NUMERIC": bad_num.any(axis=1),
+        "ZERO_TOTAL_ASSETS": (ta == 0) | ("total_assets" not in df.columns),
+        "ZERO_TOTAL_LIABILITIES": tl == 0,
+        "OVERLAY_OUT_OF_RANGE": out_of_range.any(axis=1),
+    }
+    return masks, bad_num, out_of_range
+
+
+def _describe(code: int, required_numeric: List[str], unit_scores: List[str]) -> Tuple[str, str]:
+    """(_error message, _reason_codes) for one packed row code."""
+    n_req, n_unit = len(required_numeric), len(unit_scores)
+    bad = [c for i, c in enumerate(required_numeric) if code >> i & 1]
+    rng = [c for i, c in enumerate(unit_scores) if code >> (n_req + i) & 1]
+    rule_bits = code >> (n_req + n_unit)
+    reasons = [r for i, r in enumerate(REASON_CODES) if rule_bits >> i & 1]
+    errs = []
+    if bad:
+        errs.append(f"non-numeric/NaN: {bad}")
+    if "ZERO_TOTAL_ASSETS" in reasons:
+        errs.append("total_assets==0")
+    if "ZERO_TOTAL_LIABILITIES" in reasons:
+        errs.append("total_liabilities==0")
+    if rng:
+        errs.append(f"out-of-range [0,1]: {rng}")
+    return "; ".join(errs), ";".join(reasons)
+
+
+def validate_frame(df: pd.DataFrame,
+                   required_numeric: Iterable[str] = REQUIRED_NUMERIC,
+                   unit_scores: Iterable[str] = UNIT_SCORES) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Vectorized batch validation in one pass.
+
+    Returns (valid_mask, rejects_df). rejects_df holds the failing input rows
+    plus `_error` (readable message) and `_reason_codes` (';'-joined keys of
+    REASON_CODES).
+    """
+    import pandas as pd
+
+    required_numeric = list(required_numeric)
+    unit_scores = [c for c in unit_scores if c in df.columns]
+    masks, bad_num, out_of_range = rule_masks(df, required_numeric, unit_scores)
+
+    rule_matrix = np.column_stack([masks[r] for r in REASON_CODES])
+    invalid = rule_matrix.any(axis=1)
+    if not invalid.any():
+        return ~invalid, df.iloc[0:0].assign(_error=pd.Series(dtype=str),
+                                             _reason_codes=pd.Series(dtype=str))
+
+    # pack each failing row's column/rule flags into one integer, then build
+    # the messages once per distinct pattern instead of once per row
+    bits = np.hstack([bad_num, out_of_range, rule_matrix])[invalid]
+    packed = (bits.astype(np.int64) << np.arange(bits.shape[1], dtype=np.int64)).sum(axis=1)
+    codes, uniques = pd.factorize(packed)
+    described = [_describe(int(u), required_numeric, unit_scores) for u in uniques]
+    errors = np.array([d[0] for d in described], dtype=object)[codes]
+    reasons = np.array([d[1] for d in described], dtype=object)[codes]
+
+    rejects = df[invalid].reset_index(drop=True).assign(_error=errors, _reason_codes=reasons)
+    return ~invalid, rejects
+
+
+def validate_record(record: dict,
+                    required_numeric: Iterable[str] = REQUIRED_NUMERIC,
+                    unit_scores: Iterable[str] = UNIT_SCORES) -> List[str]:
+    """Reason codes for a single record (same rules as validate_frame, no pandas)."""
+    def num(x):
+        try:
+            v = float(x)
+        except (TypeError, ValueError):
+            return None
+        return None if v != v else v
+
+    reasons = []
+    values = {c: num(record.get(c)) for c in required_numeric}
+    if any(v is None for v in values.values()):
+        reasons.append("NON_NUMERIC")
+    if "total_assets" not in record or num(record["total_assets"]) == 0:
+        reasons.append("ZERO_TOTAL_ASSETS")
+    if num(record.get("total_liabilities")) == 0:
+        reasons.append("ZERO_TOTAL_LIABILITIES")
+    scores = [num(record[c]) for c in unit_scores if c in record]
+    if any(v is not None and not 0 <= v <= 1 for v in scores):
+        reasons.append("OVERLAY_OUT_OF_RANGE")
+    return reasons
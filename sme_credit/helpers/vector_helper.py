@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from ..core import ALT_KEYS, INPUT_DEFAULTS, OUTPUT_COLUMNS
+from .context_helper import ScoringContext, as_context
+from .quant_helper import RatingScale
+
+# Columnar counterpart of core.small_firm_score. The per-row function stays the
+# reference implementation; everything here must reproduce it row for row.
+
+
+def _num(df: pd.DataFrame, col: str, default: float | None = None) -> np.ndarray:
+    """Column as float64; a missing column takes `default` (NaN if none)."""
+    if col not in df.columns:
+        fill = np.nan if default is None else float(default)
+        return np.full(len(df), fill, dtype="float64")
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _text(df: pd.DataFrame, col: str, default: str = "") -> pd.Series:
+    if col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[col].astype(object).where(df[col].notna(), "")
+
+
+def _per_unique(values: pd.Series, fn) -> np.ndarray:
+    """Evaluate `fn` once per distinct value and broadcast back to rows."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = np.array([fn(u) for u in uniques], dtype="float64")
+    return mapped[codes] if len(uniques) else np.empty(0, dtype="float64")
+
+
+def pd_from_z(ctx: ScoringContext, z_adj, slope, intercept, prior_pd, alpha, floor_pd):
+    """Sector Z->PD, Bayes blend and sovereign floor (NaN floor = none); returns (PD_model, PD_final)."""
+    pd_lin = slope*z_adj + intercept
+    pd_model = np.where(pd_lin > 0.0, pd_lin, 0.0)
+    if ctx.USE_BAYES_PRIOR:
+        pd_final = (1 - alpha)*pd_model + alpha*prior_pd
+    else:
+        pd_final = pd_model.copy()
+    if ctx.CAP_COUNTRY_RATING:
+        pd_final = np.where(floor_pd > pd_final, floor_pd, pd_final)
+    return pd_model, pd_final
+
+
+def score_components(df: pd.DataFrame,
+                     sector_col: str,
+                     cfg: Union[dict, ScoringContext],
+                     sector_curves: Optional[dict] = None,
+                     rating_bands: Union[List[dict], RatingScale, None] = None,
+                     prior_lookup: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute every small_firm_score output for a whole frame at once.
+    Returns a dict of column arrays (OUTPUT_COLUMNS plus intermediates).
+    """
+    ctx = as_context(cfg, sector_curves, rating_bands, prior_lookup)
+    MV_CAP = ctx.MV_CAP
+
+    rev = _num(df, "revenue"); ta = _num(df, "total_assets"); tl = _num(df, "total_liabilities")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Financial ratios
+        X1 = _num(df, "working_capital") / ta
+        X2 = _num(df, "retained_earnings") / ta
+        X3 = _num(df, "ebit") / ta
+        mv_ratio = _num(df, "market_value_equity") / tl
+        X4 = np.where(MV_CAP < mv_ratio, MV_CAP, mv_ratio)
+        X5 = rev / ta
+        lev_ratio = tl / ta
+
+    z_raw = ctx.W_X1*X1 + ctx.W_X2*X2 + ctx.W_X3*X3 + ctx.W_X4*X4 + ctx.W_X5*X5
+
+    # Alternative-data overlay
+    alt_mean = sum(_num(df, k, INPUT_DEFAULTS[k]) for k in ALT_KEYS) / len(ALT_KEYS)
+    alt_adj = ctx.ALT_WT * (alt_mean - 0.5)
+
+    # Cash-flow overlay
+    cf_adj = (ctx.CF_FCF * _num(df, "fcf_vol_ratio", INPUT_DEFAULTS["fcf_vol_ratio"]) +
+              ctx.CF_IC * np.log1p(_num(df, "cf_int_cov", INPUT_DEFAULTS["cf_int_cov"])) +
+              ctx.CF_RQ * (_num(df, "revenue_quality", INPUT_DEFAULTS["revenue_quality"]) - 0.5))
+
+    # Qualitative overlay
+    age = _num(df, "business_age_years", INPUT_DEFAULTS["business_age_years"])
+    age_pen = np.where(age < 3, ctx.AGE_PEN_LT3, np.where(age < 5, ctx.AGE_PEN_3_5, 0.0))
+    QUAL_WT = ctx.QUAL_WT
+    qual_adj = (age_pen +
+                QUAL_WT*(_num(df, "mgmt_track_record", INPUT_DEFAULTS["mgmt_track_record"]) - 0.5) +
+                QUAL_WT*(_num(df, "industry_survival_rate", INPUT_DEFAULTS["industry_survival_rate"]) - 0.5) -
+                QUAL_WT*_num(df, "geo_risk", INPUT_DEFAULTS["geo_risk"]))
+
+    # Penalties
+    scale_pen = np.where(rev < 5_000_000, float(ctx.SCALE_PEN), 0.0)
+    lev_pen = np.where(lev_ratio > 0.5, float(ctx.LOW_LEV_PEN), 0.0)
+
+    z_adj = z_raw + alt_adj + cf_adj + qual_adj + scale_pen + lev_pen
+
+    # Sector Z→PD
+    sectors = _text(df, sector_col, "Industrials")
+    slope = _per_unique(sectors, lambda s: ctx.curve_for(s)[0])
+    intercept = _per_unique(sectors, lambda s: ctx.curve_for(s)[1])
+
+    # Bayesian blend inputs
+    country = _text(df, "Country").astype(str).str.upper().str.strip()
+    prior_pd, prior_level = ctx.prior_table.resolve(country, sectors, return_levels=True)
+    alpha = _per_unique(country, ctx.alpha_for)
+
+    # Sovereign floor (empty/missing ratings leave PD untouched)
+    floor_pd = np.full(len(df), np.nan)
+    if ctx.CAP_COUNTRY_RATING:
+        primary = _text(df, "Country Rating")
+        ctry_rating = primary.where(primary.astype(bool), _text(df, "country_rating"))
+        if ctry_rating.astype(bool).any():
+            floor_pd = _per_unique(ctry_rating, lambda r: ctx.rating_scale.pd_for(r) if r else np.nan)
+
+    pd_model, pd_final = pd_from_z(ctx, z_adj, slope, intercept, prior_pd, alpha, floor_pd)
+
+    return {
+        "X1": X1, "X2": X2, "X3": X3, "X4": X4, "X5": X5,
+        "Z_raw": z_raw, "alt_adj": alt_adj, "cf_adj": cf_adj,
+        "qual_adj": qual_adj, "scale_pen": scale_pen, "lev_pen": lev_pen,
+        "Z_adj": z_adj, "PD_model": pd_model, "PD_final": pd_final,
+        "Rating": ctx.rating_scale.ratings(pd_final),
+        "alt_mean": alt_mean, "age_pen": age_pen, "mv_ratio": mv_ratio, "floor_pd": floor_pd,
+        "sector_slope": slope, "sector_int": intercept,
+        "prior_pd": prior_pd, "prior_level": prior_level, "bayes_alpha": alpha,
+    }
+
+
+def apply_output_schema(frame: pd.DataFrame,
+                        rating_scale: RatingScale,
+                        float_dtype: Optional[str] = None,
+                        categorical_rating: bool = False) -> pd.DataFrame:
+    """Cast the OUTPUT_COLUMNS of `frame`: numeric ones to float_dtype, Rating to the scale's categorical."""
+    cast = {}
+    if float_dtype is not None:
+        cast.update({c: float_dtype for c in OUTPUT_COLUMNS
+                     if c != "Rating" and c in frame.columns and frame[c].dtype != float_dtype})
+    if categorical_rating and "Rating" in frame.columns:
+        cast["Rating"] = rating_scale.rating_dtype()
+    return frame.astype(cast) if cast else frame
+
+
+def _copy_on_write() -> bool:
+    try:
+        return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+    except (ValueError, KeyError):  # pragma: no cover - option removed in some future pandas
+        return True
+
+
+def attach_outputs(df: pd.DataFrame, outputs, keep: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Input columns (all, or only those in `keep`) followed by `outputs`, on a
+    fresh RangeIndex. Under copy-on-write (pandas 3) the input columns are
+    shared lazily rather than copied, and a write to either frame copies the
+    touched column first; older pandas gets a real copy, so the result never
+    aliases the caller's frame. Read-only columns (an open_store memmap) are
+    copied so the result stays writable. An output named like an input
+    replaces it.
+    """
+    base = df if keep is None else df[[c for c in keep if c in df.columns]]
+    base = base.copy(deep=not _copy_on_write()).reset_index(drop=True)
+    # numpy-backed arrays and Categorical codes both sit in `_ndarray`
+    frozen = {c: base[c].copy() for c in base.columns.unique()
+              if isinstance(base[c], pd.Series)
+              and not getattr(base[c].array, "_ndarray", np.empty(0)).flags.writeable}
+    if frozen:
+        base = base.assign(**frozen)
+    values = {k: v.to_numpy() if isinstance(v, pd.Series) and not isinstance(v.dtype, pd.CategoricalDtype)
+              else v.array if isinstance(v, pd.Series) else v
+              for k, v in outputs.items()}
+    return base.assign(**values)
+
+
+def score_frame(df: pd.DataFrame,
+                sector_col: str,
+                cfg: Union[dict, ScoringContext],
+                sector_curves: Optional[dict] = None,
+                rating_bands: Union[List[dict], RatingScale, None] = None,
+                prior_lookup: Optional[dict] = None,
+                float_dtype: Optional[str] = None,
+                categorical_rating: bool = False,
+                explain: bool = False) -> pd.DataFrame:
+    """
+    Vectorized scoring; returns the OUTPUT_COLUMNS frame aligned to df.index.
+    float_dtype ("float32"/"float64") sets the numeric outputs' dtype;
+    categorical_rating stores Rating as RatingScale.rating_dtype() codes.
+    explain appends explain_helper.EXPLAIN_COLUMNS, built from the same pass.
+    """
+    ctx = as_context(cfg, sector_curves, rating_bands, prior_lookup)
+    comps = score_components(df, sector_col, ctx)
+    names = list(OUTPUT_COLUMNS)
+    if explain:
+        from .explain_helper import EXPLAIN_COLUMNS, attribution
+
+        comps.update(attribution(df, comps, ctx))
+        names += EXPLAIN_COLUMNS
+    cols = {k: comps[k] if float_dtype is None else comps[k].astype(float_dtype, copy=False)
+            for k in names if k != "Rating"}
+    cols["Rating"] = (ctx.rating_scale.categorical(comps["PD_final"]) if categorical_rating
+                      else comps["Rating"])
+    return pd.DataFrame({k: cols[k] for k in names}, index=df.index, copy=False)
@@ -4,7 +4,17 @@ import streamlit as st
 from pathlib import Path
 import subprocess, sys, time
 import pandas as pd
-import io, yaml
+import io, json, yaml
+
+from sme_credit.helpers.batch_helper import iter_frame_chunks, score_stream
+from sme_credit.helpers.cache_helper import fingerprint, load_context_cached, source_files
+from sme_credit.helpers.io_helper import make_output_path, write_table
+from sme_credit.helpers.portfolio_helper import PortfolioAccumulator
+from sme_credit.helpers.profile_helper import RunProfiler, format_report
+from sme_credit.helpers.results_helper import (
+    OUTPUT_GLOBS, ResultFilter, ResultIndex, count_rows, filter_frame, load_summary,
+    read_page, summary_path
+)
 
 # ---------- Paths ----------
 ROOT = Path(__file__).resolve().parent
@@ -32,6 +42,10 @@ st.sidebar.header("Run options")
 output_prefix = st.sidebar.text_input("Output prefix", "sme_scores")
 sheet_name    = st.sidebar.text_input("Excel sheet (optional)", "")
 use_utc       = st.sidebar.checkbox("Use UTC timestamp", True)
+use_subprocess = st.sidebar.checkbox(
+    "Run via run_scoring.py subprocess", False,
+    help="Fallback: run the CLI in a separate process and capture its stdout/stderr.",
+)
 
 # Show detected sector column in the sidebar if available
 if "sector_col" in st.session_state and st.session_state["sector_col"]:
@@ -46,21 +60,58 @@ def save_uploaded(uploader, dst: Path) -> Path:
         f.write(uploader.getbuffer())
     return dst
 
+@st.cache_resource
+def _output_index() -> ResultIndex:
+    # one listing per session; rescanned only when output_data/ itself changes
+    return ResultIndex(OUTPUT_DIR, OUTPUT_GLOBS)
+
 def latest_outputs(prefix: str | None = None) -> list[Path]:
-    files = sorted(OUTPUT_DIR.glob("*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return [f for f in files if (not prefix or f.name.startswith(prefix))]
+    return _output_index().files(prefix)
+
+@st.cache_data(show_spinner="Summarising output…", max_entries=32)
+def _summary(path: str, mtime_ns: int, sector_col: str) -> dict:
+    # the sidecar when present, else one streaming pass; keyed on mtime so a rewrite refreshes it
+    return load_summary(path, get_context().rating_scale, sector_col).to_dict()
+
+@st.cache_data(show_spinner="Counting matching rows…", max_entries=64)
+def _matching_rows(path: str, mtime_ns: int, flt: ResultFilter, sector_col: str) -> int:
+    return count_rows(path, flt, sector_col)
 
 def build_cmd(input_path: Path, sector_col: str) -> list[str]:
     cmd = [sys.executable, str(ROOT / "run_scoring.py"),
            "--input", str(input_path),
            "--sector-col", sector_col,
-           "--output-prefix", output_prefix]
+           "--output-prefix", output_prefix,
+           "--profile"]
     if use_utc:
         cmd.append("--use-utc")
     if sheet_name.strip():
         cmd += ["--sheet", sheet_name.strip()]
     return cmd
 
+@st.cache_resource(show_spinner="Loading configs and priors…")
+def _cached_context(key: str):
+    # key = fingerprint of the YAMLs + priors workbook, so uploads invalidate it
+    return load_context_cached(ROOT)
+
+def get_context():
+    return _cached_context(fingerprint(source_files(ROOT)))
+
+SCORE_CHUNK_ROWS = 20_000
+
+def score_in_process(df: pd.DataFrame, sector_col: str, on_progress) -> pd.DataFrame:
+    """Score an in-memory frame with the warm context, reporting progress per chunk."""
+    ctx = get_context()
+    total = max(len(df), 1)
+    parts = list(score_stream(iter_frame_chunks(df, SCORE_CHUNK_ROWS), sector_col, ctx,
+                              progress=lambda done: on_progress(done / total)))
+    return pd.concat(parts, ignore_index=True) if parts else df.iloc[0:0]
+
+def latest_report() -> Path | None:
+    """Newest run report (`<output>_report.json`) written by the CLI or the in-process path."""
+    reports = sorted(OUTPUT_DIR.glob("*_report.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return reports[0] if reports else None
+
 def read_uploaded_df(uploaded, sheet_name: str | None):
     """Read a small preview DataFrame from the uploaded file buffer (no saving)."""
     name = uploaded.name.lower()
@@ -167,11 +218,6 @@ with tab_run:
         elif not sector_col_selected:
             st.error("Please select the sector column.")
         else:
-            # Save to disk with timestamped name
-            ext = Path(input_file.name).suffix.lower() or ".xlsx"
-            input_path = INPUT_DIR / f"ui_input_{int(time.time())}{ext}"
-            save_uploaded(input_file, input_path)
-
             if priors_file:
                 save_uploaded(priors_file, INPUT_DIR / "bayes_3.xlsx")
             if model_cfg_up:  save_uploaded(model_cfg_up,  CONFIG_DIR / "model_config.yaml")
@@ -181,21 +227,60 @@ with tab_run:
             # Remember selection for later tabs + sidebar
             st.session_state["sector_col"] = sector_col_selected
 
-            # Run scorer
-            cmd = build_cmd(input_path, sector_col_selected)
-            status.info("Running scoring…")
-            proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
-
-            with open(UI_LOG, "w", encoding="utf-8", errors="ignore") as f:
-                f.write("COMMAND:\n" + " ".join(cmd) + "\n\n")
-                f.write("STDOUT:\n" + (proc.stdout or "") + "\n\n")
-                f.write("STDERR:\n" + (proc.stderr or "") + "\n")
-
-            if proc.returncode != 0:
-                status.error("Scoring failed. See Logs tab for details.")
+            if use_subprocess:
+                # Fallback: save the upload and run the CLI, scraping its output
+                ext = Path(input_file.name).suffix.lower() or ".xlsx"
+                input_path = INPUT_DIR / f"ui_input_{int(time.time())}{ext}"
+                save_uploaded(input_file, input_path)
+                cmd = build_cmd(input_path, sector_col_selected)
+                status.info("Running scoring…")
+                proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+
+                with open(UI_LOG, "w", encoding="utf-8", errors="ignore") as f:
+                    f.write("COMMAND:\n" + " ".join(cmd) + "\n\n")
+                    f.write("STDOUT:\n" + (proc.stdout or "") + "\n\n")
+                    f.write("STDERR:\n" + (proc.stderr or "") + "\n")
+
+                st.session_state.pop("last_result", None)
+                if proc.returncode != 0:
+                    status.error("Scoring failed. See Logs tab for details.")
+                else:
+                    status.success("Scoring complete. See the Results tab.")
+                    st.session_state["last_prefix"] = output_prefix
             else:
-                status.success("Scoring complete. See the Results tab.")
-                st.session_state["last_prefix"] = output_prefix
+                # In-process: score the uploaded frame in memory with the warm context
+                bar = st.progress(0.0, text="Scoring…")
+                started = time.perf_counter()
+                prof = RunProfiler()
+                try:
+                    with prof.stage("load") as rec:
+                        df_in = read_uploaded_df(input_file, sheet_name if sheet_name.strip() else None)
+                        rec["rows"] += len(df_in)
+                    with prof.stage("score", rows=len(df_in)):
+                        scored = score_in_process(df_in, sector_col_selected,
+                                                  lambda frac: bar.progress(min(frac, 1.0), text=f"Scoring… {frac:.0%}"))
+                    out_path = make_output_path(OUTPUT_DIR, output_prefix, ext=".csv", use_utc=use_utc)
+                    with prof.stage("write", rows=len(scored)):
+                        write_table(scored, out_path)
+                        PortfolioAccumulator(get_context().rating_scale, sector_col_selected) \
+                            .update(scored, scored["PD_final"]).write_json(summary_path(out_path))
+                    prof.meta.update({"input": input_file.name, "output": str(out_path), "rows_out": len(scored)})
+                    report = prof.write_report(out_path.with_name(f"{out_path.stem}_report.json"))
+                except Exception as e:
+                    with open(UI_LOG, "w", encoding="utf-8", errors="ignore") as f:
+                        f.write(f"IN-PROCESS RUN FAILED\ninput: {input_file.name}\nerror: {e!r}\n")
+                    bar.empty()
+                    status.error("Scoring failed. See Logs tab for details.")
+                else:
+                    elapsed = time.perf_counter() - started
+                    with open(UI_LOG, "w", encoding="utf-8", errors="ignore") as f:
+                        f.write(f"IN-PROCESS RUN\ninput: {input_file.name}\nsector column: {sector_col_selected}\n"
+                                f"rows: {len(scored)}\nseconds: {elapsed:.3f}\noutput: {out_path}\n\n"
+                                f"{format_report(report)}\n")
+                    bar.progress(1.0, text="Done")
+                    st.session_state["last_result"] = (out_path.name, scored)
+                    st.session_state["last_prefix"] = output_prefix
+                    status.success(f"Scoring complete ({len(scored)} rows in {elapsed:.2f}s). See the Results tab.")
 
 # ---------- RESULTS ----------
 with tab_results:
@@ -205,35 +290,102 @@ with tab_results:
     with cols[0]:
         prefix_filter = st.text_input("Filter by output prefix", default_prefix)
     with cols[1]:
-        max_rows = st.number_input("Rows to show", 10, 200000, 200, step=50)
+        page_size = st.selectbox("Rows per page", [50, 100, 200, 500, 1000], index=2)
     with cols[2]:
         show_index = st.checkbox("Show index", False)
 
     files = latest_outputs(prefix_filter.strip() or None)
     if not files:
-        st.info("No output CSVs found yet. Run a job in the Run Scoring tab.")
+        st.info("No output files found yet. Run a job in the Run Scoring tab.")
     else:
         names = [f.name for f in files]
         selected_name = st.selectbox("Choose an output file", names, index=0)
         selected = next(f for f in files if f.name == selected_name)
 
         try:
-            df = pd.read_csv(selected)
-            rows = min(len(df), int(max_rows))
-            view = df.head(rows)
+            mtime_ns = selected.stat().st_mtime_ns
+            sector_col = st.session_state.get("sector_col") or "sector"
+            summary = PortfolioAccumulator.from_dict(_summary(str(selected), mtime_ns, sector_col),
+                                                     get_context().rating_scale)
+
+            m = st.columns(3)
+            m[0].metric("Rows", f"{summary.rows:,}")
+            m[1].metric("Mean PD", f"{summary.mean_pd:.4%}" if summary.pd_count else "n/a")
+            m[2].metric("PD range", f"{summary.pd_min:.4f} – {summary.pd_max:.4f}" if summary.pd_count else "n/a")
+            ratings = summary.band_table()
+            with st.expander("Rating distribution and mean PD by sector / country"):
+                st.bar_chart(ratings.loc[ratings["rows"] > 0, ["Rating", "rows"]].set_index("Rating"))
+                c1, c2 = st.columns(2)
+                for c, name in ((c1, "sector"), (c2, "country")):
+                    table = summary.group_table(name)
+                    c.dataframe(table[[table.columns[0], "rows", "mean_pd"]], use_container_width=True,
+                                hide_index=True)
+
+            # filters are pushed down to the reader; only the requested page is materialised
+            f = st.columns([1, 1, 1, 1])
+            sel_ratings = f[0].multiselect("Rating", ratings.loc[ratings["rows"] > 0, "Rating"].tolist())
+            sel_sectors = f[1].multiselect("Sector", sorted(summary.groups["sector"]))
+            sel_countries = f[2].multiselect("Country", sorted(summary.groups["country"]))
+            pd_range = None
+            if summary.pd_count and summary.pd_max > summary.pd_min:
+                pd_range = f[3].slider("PD_final range", float(summary.pd_min), float(summary.pd_max),
+                                       (float(summary.pd_min), float(summary.pd_max)), format="%.4f")
+            at_bounds = pd_range is None or pd_range == (float(summary.pd_min), float(summary.pd_max))
+            flt = ResultFilter(tuple(sel_ratings), tuple(sel_sectors), tuple(sel_countries),
+                               None if at_bounds else pd_range[0], None if at_bounds else pd_range[1])
+
+            # the run just scored in-process is already in memory — no re-read
+            last = st.session_state.get("last_result")
+            if last and last[0] == selected.name:
+                matched = filter_frame(last[1], flt, sector_col)
+                total = len(matched)
+            else:
+                matched = None
+                total = summary.rows if flt.is_empty() else _matching_rows(str(selected), mtime_ns, flt, sector_col)
+
+            pages = max(1, -(-total // int(page_size)))
+            page = int(st.number_input(f"Page (of {pages:,})", 1, pages, 1, step=1)) - 1
+            if matched is not None:
+                view = matched.iloc[page * page_size:(page + 1) * page_size]
+            else:
+                view = read_page(selected, page, int(page_size), flt, sector_col)
             if not show_index:
                 view = view.reset_index(drop=True)
 
-            st.caption(f"Showing {rows} of {len(df)} rows · {df.shape[1]} columns · file: `{selected.name}`")
-            st.dataframe(view, use_container_width=True, height=min(900, 40 + 28 * min(rows, 25)))
+            first = page * page_size + 1 if len(view) else 0
+            st.caption(f"Rows {first:,}–{page * page_size + len(view):,} of {total:,} matching "
+                       f"({summary.rows:,} total) · {view.shape[1]} columns · file: `{selected.name}`")
+            st.dataframe(view, use_container_width=True, height=min(900, 40 + 28 * min(len(view), 25)))
         except Exception as e:
-            st.error(f"Could not load CSV: {e}")
+            st.error(f"Could not load output file: {e}")
 
 # ---------- LOGS ----------
 with tab_logs:
-    st.subheader("UI run log")
-    if UI_LOG.exists():
-        st.code(UI_LOG.read_text(encoding="utf-8", errors="ignore"), language="bash")
-        st.download_button("Download log", UI_LOG.read_bytes(), file_name="ui_run.log", mime="text/plain")
+    st.subheader("Run report")
+    report_path = latest_report()
+    if report_path:
+        try:
+            report = json.loads(report_path.read_text(encoding="utf-8"))
+        except ValueError as e:
+            st.error(f"Could not read run report: {e}")
+        else:
+            stages = pd.DataFrame(report.get("stages", []))
+            m = st.columns(3)
+            m[0].metric("Wall time (s)", f"{report.get('wall_seconds', 0.0):.2f}")
+            m[1].metric("Rows out", f"{report.get('rows_out', 0):,}")
+            peak = report.get("peak_rss_mb")
+            m[2].metric("Peak memory (MB)", f"{peak:.0f}" if peak is not None else "n/a")
+            st.caption(f"file: `{report_path.name}` · started {report.get('started_at', '')}")
+            if not stages.empty:
+                st.dataframe(stages, use_container_width=True, hide_index=True)
+            st.download_button("Download report", report_path.read_bytes(),
+                               file_name=report_path.name, mime="application/json")
     else:
-        st.caption("No UI log yet. Run a job in the Run Scoring tab.")
+        st.caption("No run report yet. Run a job in the Run Scoring tab.")
+
+    with st.expander("UI run log (raw output)", expanded=not report_path):
+        if UI_LOG.exists():
+            st.code(UI_LOG.read_text(encoding="utf-8", errors="ignore"), language="bash")
+            st.download_button("Download log", UI_LOG.read_bytes(), file_name="ui_run.log", mime="text/plain")
+        else:
+            st.caption("No UI log yet. Run a job in the Run Scoring tab.")
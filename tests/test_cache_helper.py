@@ -0,0 +1,50 @@
+# tests/test_cache_helper.py
+import shutil
+import time
+import pandas as pd
+from sme_credit.helpers.cache_helper import PRIORS_INDEX, load_context_cached
+
+def _project(tmp_path):
+    shutil.copytree("config", tmp_path / "config")
+    (tmp_path / "input_data").mkdir()
+    shutil.copy("input_data/bayes_3.xlsx", tmp_path / "input_data" / "bayes_3.xlsx")
+    return tmp_path
+
+def test_cache_hit_and_invalidation(tmp_path):
+    root = _project(tmp_path)
+    first = load_context_cached(root)
+    entries = list((root / ".cache").glob("context_*.pkl"))
+    assert len(entries) == 1
+    second = load_context_cached(root)
+    assert second.prior_lookup == first.prior_lookup
+    assert list((root / ".cache").glob("context_*.pkl")) == entries
+
+    # editing a YAML produces a new entry and drops the stale one
+    time.sleep(0.01)
+    sector_yaml = root / "config" / "sector_config.yaml"
+    sector_yaml.write_text(sector_yaml.read_text().replace("Banks:", "Banks2:"))
+    third = load_context_cached(root)
+    assert "Banks2" in third.curves and "Banks" not in third.curves
+    assert len(list((root / ".cache").glob("context_*.pkl"))) == 1
+
+    # replacing the priors workbook is picked up too
+    pd.DataFrame([{"Country": "*", "Sector": "*", "Prior_PD": 0.09}]).to_excel(
+        root / "input_data" / "bayes_3.xlsx", index=False, sheet_name="Priors")
+    assert load_context_cached(root).prior_lookup == {("*", "*"): 0.09}
+
+def test_corrupt_entry_is_rebuilt(tmp_path):
+    root = _project(tmp_path)
+    load_context_cached(root)
+    entry = next((root / ".cache").glob("context_*.pkl"))
+    entry.write_bytes(b"not a pickle")
+    assert load_context_cached(root).prior_lookup
+
+def test_remembered_priors_path_follows_model_config(tmp_path):
+    root = _project(tmp_path)
+    load_context_cached(root)
+    assert (root / ".cache" / PRIORS_INDEX).exists()
+    pd.DataFrame([{"Country": "*", "Sector": "*", "Prior_PD": 0.07}]).to_excel(
+        root / "input_data" / "bayes_alt.xlsx", index=False, sheet_name="Priors")
+    model_yaml = root / "config" / "model_config.yaml"
+    model_yaml.write_text(model_yaml.read_text().replace("bayes_3.xlsx", "bayes_alt.xlsx"))
+    assert load_context_cached(root).prior_lookup == {("*", "*"): 0.07}
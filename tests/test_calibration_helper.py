@@ -0,0 +1,102 @@
+# tests/test_calibration_helper.py
+import numpy as np
+import pytest
+from sme_credit.helpers import calibration_helper
+from sme_credit.helpers.batch_helper import iter_frame_chunks
+from sme_credit.helpers.calibration_helper import (
+    Panel, build_panel, calibrate, candidate_curves, candidate_model_config, write_sector_config
+)
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import ScoringContext, load_context
+from sme_credit.helpers.synth_helper import synthetic_portfolio
+from sme_credit.helpers.vector_helper import score_components
+
+SECTORS = ["Energy", "Banks", "Insurance"]
+COUNTRIES = ["INDIA", "UAE", "KENYA"]
+TRUE_ALPHA = np.array([0.3, 0.6, 0.1])
+
+@pytest.fixture(scope="module")
+def ctx():
+    return load_context(".")
+
+def _panel(n, pd_fn, seed=0):
+    rng = np.random.default_rng(seed)
+    z = rng.normal(2.0, 2.0, n)
+    sector = rng.integers(0, len(SECTORS), n).astype("int32")
+    country = rng.integers(0, len(COUNTRIES), n).astype("int32")
+    prior = rng.uniform(0.05, 0.5, n)
+    y = (rng.random(n) < pd_fn(z, sector, country, prior)).astype("int8")
+    return Panel(z, y, prior, sector, SECTORS, country, COUNTRIES, 0)
+
+def test_linear_fit_recovers_curves_and_alphas_jointly(ctx):
+    slopes, ints = np.array([-0.004, -0.005, -0.006]), np.array([0.035, 0.04, 0.05])
+    panel = _panel(900_000, lambda z, s, c, p: (1 - TRUE_ALPHA[c]) * np.clip(slopes[s]*z + ints[s], 0, None)
+                   + TRUE_ALPHA[c] * p)
+    curves, alphas = calibrate(panel, ctx)
+    curves = curves.set_index("sector").loc[SECTORS]
+    np.testing.assert_allclose(curves["slope"], slopes, atol=6e-4)
+    np.testing.assert_allclose(curves["int"], ints, atol=3e-3)
+    assert (curves["status"] == "fitted").all()
+
+    alphas = alphas.set_index("country")
+    assert alphas.loc["GCC", "n"] == (panel.country == 1).sum()  # UAE fits the shared GCC alpha
+    np.testing.assert_allclose(alphas.loc[["INDIA", "GCC", "KENYA"], "alpha"], TRUE_ALPHA, atol=0.02)
+    assert (alphas["rounds"] < calibration_helper.MAX_ROUNDS).all()
+
+def test_logistic_newton_recovers_coefficients(ctx, monkeypatch):
+    a, b = np.array([-3.0, -2.5, -3.5]), np.array([-0.4, -0.3, -0.5])
+    panel = _panel(600_000, lambda z, s, c, p: 1 / (1 + np.exp(-(a[s] + b[s]*z))))
+    curves, _ = calibrate(panel, ctx, form="logistic")
+    curves = curves.set_index("sector").loc[SECTORS]
+    assert curves["converged"].all()
+    np.testing.assert_allclose(curves["logit_a"], a, atol=0.05)
+    np.testing.assert_allclose(curves["logit_b"], b, atol=0.02)
+    assert (curves["slope"] < 0).all()
+    np.testing.assert_allclose(curves["mean_pd_new"], curves["default_rate"], atol=2e-3)
+
+    monkeypatch.setattr(calibration_helper, "BLOCK_ROWS", 70_001)
+    blocked, _ = calibrate(panel, ctx, form="logistic")
+    np.testing.assert_allclose(blocked.set_index("sector").loc[SECTORS, "logit_b"], curves["logit_b"], rtol=1e-9)
+
+def test_thin_sectors_and_countries_keep_current_values(ctx):
+    panel = _panel(20_000, lambda z, s, c, p: np.full(len(z), 0.03))
+    curves, alphas = calibrate(panel, ctx, min_obs=10_000)
+    assert (curves["status"] == "kept").all() and (alphas["status"] == "kept").all()
+    energy = curves.set_index("sector").loc["Energy"]
+    assert (energy["slope"], energy["int"]) == ctx.curve_for("Energy")
+    assert alphas.set_index("country").loc["KENYA", "alpha"] == ctx.default_alpha
+    with pytest.raises(ValueError):
+        calibrate(panel, ctx, form="probit")
+
+def test_build_panel_from_inputs_or_z_column(ctx):
+    df = synthetic_portfolio(5000, seed=4)
+    comps = score_components(df, "sector", ctx)
+    df["default_flag"] = (np.random.default_rng(1).random(len(df)) < 0.05).astype(float)
+    df.loc[:9, "default_flag"] = np.nan
+
+    from_inputs = build_panel(iter_frame_chunks(df, 1200), "sector", ctx)
+    from_z = build_panel([df.assign(Z_adj=comps["Z_adj"])], "sector", ctx)
+    assert from_inputs.dropped == from_z.dropped == 10 and len(from_inputs.z) == len(df) - 10
+    np.testing.assert_allclose(from_inputs.z, comps["Z_adj"][10:])
+    np.testing.assert_allclose(from_z.prior, comps["prior_pd"][10:])
+    assert [from_inputs.sectors[i] for i in from_inputs.sector] == df["sector"].iloc[10:].tolist()
+    assert [from_z.countries[i] for i in from_z.country] == df["Country"].str.upper().iloc[10:].tolist()
+    with pytest.raises(ValueError):
+        build_panel([df.drop(columns="default_flag")], "sector", ctx)
+
+def test_candidate_configs_load_as_a_context(tmp_path, ctx):
+    panel = _panel(200_000, lambda z, s, c, p: 0.7 * np.clip(0.04 - 0.005*z, 0, None) + 0.3 * p)
+    curves, alphas = calibrate(panel, ctx)
+    path = write_sector_config(candidate_curves(curves, ctx), tmp_path / "sector_config.yaml")
+    sectors = load_yaml(path)["sectors"]
+    assert list(sectors)[:len(ctx.sector_curves)] == list(ctx.sector_curves)
+    fitted = curves.set_index("sector").loc["Banks"]
+    assert sectors["Banks"] == pytest.approx({"slope": fitted["slope"], "int": fitted["int"]}, rel=1e-8)
+    assert sectors["Healthcare"] == ctx.sector_curves["Healthcare"]
+
+    cfg = candidate_model_config(alphas, ctx)
+    table = cfg["bayes"]["BAYES_ALPHA_BY_COUNTRY"]
+    assert table["UAE"] == table["SAUDI ARABIA"] == table["GCC"] != ctx.cfg["bayes"]["BAYES_ALPHA_BY_COUNTRY"]["GCC"]
+    new_ctx = ScoringContext(cfg, sectors, ctx.rating_scale, ctx.prior_lookup)
+    assert new_ctx.alpha_for("OMAN") == table["GCC"] and new_ctx.curve_for("Banks") == (sectors["Banks"]["slope"],
+                                                                                         sectors["Banks"]["int"])
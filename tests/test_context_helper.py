@@ -0,0 +1,43 @@
+# tests/test_context_helper.py
+import pickle
+import pytest
+from sme_credit.core import small_firm_score
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import ScoringContext, load_context
+from sme_credit.helpers.quant_helper import RatingScale, get_bayes_alpha
+
+def _ctx():
+    cfg = load_yaml("config/model_config.yaml")
+    sectors = load_yaml("config/sector_config.yaml")["sectors"]
+    bands = load_yaml("config/rating_scale.yaml")["ratings"]
+    return cfg, sectors, bands, ScoringContext(cfg, sectors, bands, {})
+
+def test_context_matches_raw_configs():
+    cfg, sectors, bands, ctx = _ctx()
+    data = dict(
+        revenue=3_000_000, total_assets=20_000_000, total_liabilities=12_000_000,
+        ebit=1_500_000, retained_earnings=2_000_000, working_capital=1_000_000,
+        market_value_equity=12_000_000, Country="Qatar", sector_prior_pd=0.02, country_rating="BB+"
+    )
+    for sector in ("Energy", "UnknownSector"):
+        assert small_firm_score(data, sector, ctx) == small_firm_score(data, sector, cfg, sectors, bands, {})
+
+def test_context_alpha_expands_gcc():
+    cfg, _, _, ctx = _ctx()
+    alphas = cfg["bayes"]["BAYES_ALPHA_BY_COUNTRY"]
+    default = cfg["bayes"]["DEFAULT_BAYES_ALPHA"]
+    for country in ("QATAR", "UAE", "INDIA", "FRANCE"):
+        assert ctx.alpha_for(country) == get_bayes_alpha(country, alphas, default)
+
+def test_context_is_read_only_and_picklable():
+    _, _, _, ctx = _ctx()
+    assert isinstance(ctx.rating_scale, RatingScale)
+    with pytest.raises(AttributeError):
+        ctx.MV_CAP = 1.0
+    clone = pickle.loads(pickle.dumps(ctx))
+    assert clone.curve_for("Energy") == ctx.curve_for("Energy")
+    assert clone.rating_scale.rating(0.01) == "BBB-"
+
+def test_load_context_reads_project_configs():
+    ctx = load_context(".")
+    assert ctx.prior_lookup and ctx.curve_for("Banks") != ctx.default_curve
@@ -0,0 +1,72 @@
+# tests/test_explain_helper.py
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.explain_helper import EXPLAIN_COLUMNS, OVERLAY_TERMS, explain_frame
+from sme_credit.helpers.incremental_helper import IncrementalScorer
+from sme_credit.helpers.synth_helper import synthetic_portfolio
+from sme_credit.helpers.vector_helper import OUTPUT_COLUMNS, pd_from_z, score_components, score_frame
+
+@pytest.fixture(scope="module")
+def ctx():
+    return load_context(".")
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_excel("input_data/sample_input.xlsx")
+
+def test_contributions_add_up_to_z_adj(ctx, df):
+    out = score_frame(df, "sector", ctx, explain=True)
+    assert list(out.columns) == OUTPUT_COLUMNS + EXPLAIN_COLUMNS
+    ratios = out[[f"contrib_X{i}" for i in range(1, 6)]].sum(axis=1, skipna=False)
+    overlay = out[[f"contrib_{k}" for k in OVERLAY_TERMS]].sum(axis=1, skipna=False)
+    np.testing.assert_allclose(ratios, out["Z_raw"], atol=1e-12)
+    np.testing.assert_allclose(overlay, out["alt_adj"] + out["cf_adj"] + out["qual_adj"], atol=1e-12)
+    pd.testing.assert_frame_equal(out[OUTPUT_COLUMNS], score_frame(df, "sector", ctx))
+
+def test_z_distances_land_on_the_band_edges(ctx):
+    df = synthetic_portfolio(20_000, seed=5)
+    comps = score_components(df, "sector", ctx)
+    out = explain_frame(df, "sector", ctx)
+    scale = ctx.rating_scale
+    base = scale.band_index(comps["PD_final"])
+    for col, worse in (("z_to_upgrade", False), ("z_to_downgrade", True)):
+        dz = out[col].to_numpy()
+        reach = np.isfinite(dz)
+        assert reach.sum() > 1000
+        for eps, moved in ((-1e-7, False), (1e-7, True)):
+            z = comps["Z_adj"] + dz + np.sign(dz) * eps
+            _, pd_final = pd_from_z(ctx, z, comps["sector_slope"], comps["sector_int"],
+                                    comps["prior_pd"], comps["bayes_alpha"], comps["floor_pd"])
+            band, start = scale.band_index(pd_final)[reach], base[reach]
+            assert (band == start).all() if not moved else ((band > start) if worse else (band < start)).all()
+    assert (out["pd_to_upgrade"].dropna() >= 0).all() and (out["pd_to_downgrade"].dropna() > 0).all()
+
+def test_explain_through_batch_and_incremental_paths(ctx, df):
+    expected = explain_frame(df, "sector", ctx).reset_index(drop=True)
+    rowwise = score_many(df, "sector", ctx, engine="rowwise", explain=True)
+    pd.testing.assert_frame_equal(rowwise[EXPLAIN_COLUMNS], expected)
+    df_keyed = df.assign(company=[f"c{i}" for i in range(len(df))])
+    first = IncrementalScorer(ctx, "company").score(df_keyed, "sector", explain=True, outputs_only=True)
+    again = IncrementalScorer(ctx, "company", first).score(df_keyed, "sector", explain=True)
+    pd.testing.assert_frame_equal(again[EXPLAIN_COLUMNS], expected)
+    assert "contrib_X1" not in score_many(df, "sector", ctx).columns
+
+def test_incremental_explain_only_explains_rescored_rows(ctx, df):
+    expected = explain_frame(df, "sector", ctx).reset_index(drop=True)
+    df_keyed = df.assign(company=[f"c{i}" for i in range(len(df))])
+    first = IncrementalScorer(ctx, "company").score(df_keyed, "sector", explain=True)
+    first["contrib_X1"] = -99.0  # marks attribution taken from the previous run
+    changed = df_keyed.copy()
+    changed.loc[3, "revenue"] *= 2
+    scorer = IncrementalScorer(ctx, "company", first)
+    again = scorer.score(changed, "sector", explain=True)
+    assert scorer.counts == {"reused": len(df) - 1, "rescored": 1, "new": 0}
+    assert (again["contrib_X1"].drop(index=3) == -99.0).all()
+    pd.testing.assert_series_equal(again.loc[[3], EXPLAIN_COLUMNS].iloc[0],
+                                   explain_frame(changed.iloc[[3]], "sector", ctx).iloc[0])
+
+    without = IncrementalScorer(ctx, "company", first.drop(columns=EXPLAIN_COLUMNS))
+    pd.testing.assert_frame_equal(without.score(df_keyed, "sector", explain=True)[EXPLAIN_COLUMNS], expected)
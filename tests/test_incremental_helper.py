@@ -0,0 +1,69 @@
+# tests/test_incremental_helper.py
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import ScoringContext, load_context
+from sme_credit.helpers.incremental_helper import (
+    FINGERPRINT_COL, IncrementalScorer, row_fingerprints, score_incremental
+)
+from sme_credit.helpers.vector_helper import OUTPUT_COLUMNS
+
+def _sample():
+    return pd.read_excel("input_data/sample_input.xlsx").head(30)
+
+def _with_curve(ctx, sector, slope):
+    curves = {**ctx.sector_curves, sector: {**ctx.sector_curves[sector], "slope": slope}}
+    return ScoringContext(ctx.cfg, curves, ctx.rating_scale, ctx.prior_lookup)
+
+def test_first_run_seeds_fingerprints_and_matches_score_many():
+    ctx = load_context(".")
+    df = _sample()
+    scorer = IncrementalScorer(ctx, "company")
+    out = scorer.score(df, "sector")
+    assert scorer.counts == {"reused": 0, "rescored": 0, "new": len(df)}
+    pd.testing.assert_frame_equal(out.drop(columns=FINGERPRINT_COL), score_many(df, "sector", ctx))
+    assert out[FINGERPRINT_COL].dtype == "int64"
+
+def test_only_changed_rows_are_rescored(tmp_path):
+    ctx = load_context(".")
+    df = _sample()
+    prev_path = tmp_path / "prev.csv"
+    score_incremental(df, "sector", ctx, "company").to_csv(prev_path, index=False)
+    previous = pd.read_csv(prev_path)
+
+    month = df.copy()
+    month.loc[3, "ebit"] = month.loc[3, "ebit"] * 2
+    month = pd.concat([month, _sample().iloc[[0]].assign(company="NEW CO")], ignore_index=True)
+    sector = month.loc[10, "sector"]
+    ctx2 = _with_curve(ctx, sector, ctx.sector_curves[sector]["slope"] * 1.5)
+
+    scorer = IncrementalScorer(ctx2, "company", previous)
+    out = scorer.score(month, "sector")
+    n_sector = int((df["sector"] == sector).sum())
+    touched = n_sector + (0 if df.loc[3, "sector"] == sector else 1)
+    assert scorer.counts == {"reused": len(df) - touched, "rescored": touched, "new": 1}
+
+    full = score_many(month, "sector", ctx2)
+    pd.testing.assert_frame_equal(out[OUTPUT_COLUMNS], full[OUTPUT_COLUMNS],
+                                  check_dtype=False, rtol=1e-12)
+
+def test_rating_bands_change_invalidates_every_row():
+    ctx = load_context(".")
+    df = _sample()
+    bands = load_yaml("config/rating_scale.yaml")["ratings"]
+    bands = [dict(b) for b in bands]
+    bands[0]["label"] = "AAA+"
+    ctx2 = ScoringContext(ctx.cfg, ctx.sector_curves, bands, ctx.prior_lookup)
+    assert (row_fingerprints(df, "sector", ctx) != row_fingerprints(df, "sector", ctx2)).all()
+
+def test_validate_and_missing_key():
+    ctx = load_context(".")
+    df = _sample()
+    df.loc[0, "total_assets"] = 0
+    scored, rejects = score_incremental(df, "sector", ctx, "company", validate=True)
+    ref_scored, ref_rejects = score_many(df, "sector", ctx, validate=True)
+    pd.testing.assert_frame_equal(scored.drop(columns=FINGERPRINT_COL), ref_scored)
+    pd.testing.assert_frame_equal(rejects, ref_rejects)
+    with pytest.raises(ValueError):
+        score_incremental(df, "sector", ctx, "firm_id")
@@ -0,0 +1,101 @@
+# tests/test_ingest_helper.py
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.ingest_helper import (
+    SOURCE_FILE_COL, SOURCE_SHEET_COL, Source, count_by_source, is_multi_input,
+    iter_source_chunks, read_sources, resolve_sources, source_report
+)
+from sme_credit.helpers.io_helper import ChunkWriter, read_table
+
+def _sample():
+    return pd.read_excel("input_data/sample_input.xlsx").head(30)
+
+def _batch(tmp_path):
+    df = _sample()
+    d = tmp_path / "batch"
+    d.mkdir()
+    df.iloc[:10].to_csv(d / "a.csv", index=False)
+    with pd.ExcelWriter(d / "b.xlsx") as xw:
+        df.iloc[10:22].to_excel(xw, sheet_name="North", index=False)
+        df.iloc[22:].to_excel(xw, sheet_name="South", index=False)
+    (d / "notes.md").write_text("ignored")
+    return df, d
+
+def test_directory_expands_to_every_sheet_in_order(tmp_path):
+    df, d = _batch(tmp_path)
+    assert is_multi_input(d) and not is_multi_input(d / "a.csv")
+    sources = resolve_sources(d)
+    assert sources == [Source(str(d / "a.csv")), Source(str(d / "b.xlsx"), "North"),
+                       Source(str(d / "b.xlsx"), "South")]
+    assert resolve_sources(d, sheets=["South"])[1:] == [Source(str(d / "b.xlsx"), "South")]
+
+@pytest.mark.parametrize("pool", ["thread", "process", "auto"])
+def test_read_sources_concatenates_and_tags(tmp_path, pool):
+    df, d = _batch(tmp_path)
+    out = read_sources(resolve_sources(d), workers=3, pool=pool)
+    pd.testing.assert_frame_equal(out.drop(columns=[SOURCE_FILE_COL, SOURCE_SHEET_COL]), df,
+                                  check_dtype=False)
+    assert out[SOURCE_FILE_COL].dtype == "category"
+    assert count_by_source(out) == {(str(d / "a.csv"), ""): 10, (str(d / "b.xlsx"), "North"): 12,
+                                    (str(d / "b.xlsx"), "South"): 8}
+
+def test_chunks_carry_the_same_tags(tmp_path):
+    _, d = _batch(tmp_path)
+    sources = resolve_sources(d)
+    whole = read_sources(sources, workers=1)
+    chunks = list(iter_source_chunks(sources, 7))
+    assert [len(c) for c in chunks] == [7, 3, 7, 5, 7, 1]
+    streamed = pd.concat(chunks, ignore_index=True)
+    assert streamed[SOURCE_FILE_COL].dtype == whole[SOURCE_FILE_COL].dtype
+    assert (streamed[SOURCE_SHEET_COL] == whole[SOURCE_SHEET_COL]).all()
+
+def test_glob_and_manifests(tmp_path):
+    _, d = _batch(tmp_path)
+    assert resolve_sources(d / "*.csv") == [Source(str(d / "a.csv"))]
+    (tmp_path / "m.lst").write_text("# monthly batch\nbatch/a.csv\nbatch/b.xlsx  # both sheets\n")
+    assert len(resolve_sources(tmp_path / "m.lst")) == 3
+    (tmp_path / "m.yaml").write_text(
+        "sources:\n  - batch/a.csv\n  - path: batch/b.xlsx\n    sheets: [South]\n")
+    assert resolve_sources(tmp_path / "m.yaml") == [Source(str(d / "a.csv")), Source(str(d / "b.xlsx"), "South")]
+    with pytest.raises(FileNotFoundError):
+        resolve_sources(d / "*.parquet")
+    with pytest.raises(ValueError):
+        read_sources(resolve_sources(d), pool="fibers")
+
+def test_source_report_counts_rejects(tmp_path):
+    ctx = load_context(".")
+    _, d = _batch(tmp_path)
+    sources = resolve_sources(d)
+    df = read_sources(sources, workers=1)
+    df.loc[[0, 15], "total_assets"] = -1.0
+    scored, rejects = score_many(df, "sector", ctx, validate=True)
+    report = source_report(sources, count_by_source(df), count_by_source(rejects))
+    assert report["rows"].tolist() == [10, 12, 8]
+    assert report["scored"].sum() == len(scored)
+    assert report["rejects"].sum() == len(rejects)
+    assert scored[SOURCE_FILE_COL].notna().all()
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet", ".feather"])
+def test_sources_with_different_layouts_stream_into_one_output(tmp_path, ext):
+    ctx = load_context(".")
+    df = _sample()
+    d = tmp_path / "batch"
+    d.mkdir()
+    df.iloc[:10].to_csv(d / "a.csv", index=False)
+    df.iloc[10:].drop(columns=["current_assets"]).iloc[:, ::-1].to_csv(d / "b.csv", index=False)
+    sources = resolve_sources(d)
+    expected = score_many(read_sources(sources, workers=1), "sector", ctx)
+
+    path = tmp_path / f"out{ext}"
+    with ChunkWriter(path) as writer:
+        for chunk in iter_source_chunks(sources, 7):
+            assert list(chunk.columns) == list(expected.columns[:chunk.shape[1]])
+            writer.write(score_many(chunk, "sector", ctx))
+    back = read_table(path)
+    assert list(back.columns) == list(expected.columns)
+    assert back["company"].tolist() == expected["company"].tolist()
+    assert back["current_assets"].iloc[10:].isna().all()
+    np.testing.assert_allclose(back["PD_final"], expected["PD_final"])
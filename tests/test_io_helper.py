@@ -0,0 +1,83 @@
+# tests/test_io_helper.py
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import scoring_input_columns, scoring_input_dtypes
+from sme_credit.helpers.io_helper import (
+    ChunkWriter, iter_input_chunks, make_output_path, read_table, timestamp_tag, write_table
+)
+
+pytest.importorskip("pyarrow")
+
+def _frame():
+    return pd.DataFrame({"firm": ["a", "b", "c"], "revenue": [1.0, 2.0, 3.0],
+                         "sector": ["Energy", "Banks", "Energy"], "PD_final": [0.01, 0.02, 0.03]})
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet", ".feather", ".xlsx"])
+def test_write_read_round_trip_with_projection(tmp_path, ext):
+    df = _frame()
+    path = tmp_path / f"t{ext}"
+    if ext == ".xlsx":
+        df.to_excel(path, index=False)
+    else:
+        write_table(df, path)
+    back = read_table(path, columns=["revenue", "sector", "not_there"])
+    assert list(back.columns) == ["revenue", "sector"]
+    assert back["revenue"].tolist() == [1.0, 2.0, 3.0]
+
+def test_write_table_float32(tmp_path):
+    path = write_table(_frame(), tmp_path / "t.parquet", float_dtype="float32", float_columns=["PD_final"])
+    back = read_table(path)
+    assert back["PD_final"].dtype == np.float32 and back["revenue"].dtype == np.float64
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet", ".feather"])
+def test_chunk_writer_appends(tmp_path, ext):
+    path = tmp_path / f"out{ext}"
+    with ChunkWriter(path) as writer:
+        writer.write(_frame())
+        writer.write(_frame())
+    assert writer.rows == 6
+    back = read_table(path)
+    assert len(back) == 6 and list(back.columns) == list(_frame().columns)
+    chunks = list(iter_input_chunks(path, 4, columns=["firm"]))
+    assert max(len(c) for c in chunks) <= 4 and sum(len(c) for c in chunks) == 6
+    assert list(chunks[0].columns) == ["firm"]
+
+@pytest.mark.parametrize("ext", [".parquet", ".feather"])
+def test_chunk_writer_casts_columns_that_change_type_between_chunks(tmp_path, ext):
+    first = pd.DataFrame({"Country Rating": [np.nan, np.nan], "market_value_equity": [np.nan, np.nan],
+                          "note": [None, None], "business_age_years": [4, 7]})
+    second = pd.DataFrame({"Country Rating": ["BBB", None], "market_value_equity": [2.5e6, np.nan],
+                           "note": ["late filer", None], "business_age_years": [np.nan, 3.0]})
+    path = tmp_path / f"out{ext}"
+    with ChunkWriter(path, blank_dtypes=scoring_input_dtypes("sector")) as writer:
+        writer.write(first)
+        writer.write(second)
+    back = read_table(path)
+    assert back["Country Rating"].tolist()[2] == "BBB" and back["note"].tolist()[2] == "late filer"
+    assert back["market_value_equity"].dtype == np.float64 and back["market_value_equity"][2] == 2.5e6
+    assert back["business_age_years"].tolist()[:2] == [4, 7] and back["business_age_years"][3] == 3
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet"])
+def test_chunk_writer_aligns_chunks_to_the_first_columns(tmp_path, ext):
+    path = tmp_path / f"out{ext}"
+    with ChunkWriter(path) as writer:
+        writer.write(_frame())
+        writer.write(_frame().iloc[:, ::-1].drop(columns=["firm"]))
+        with pytest.raises(ValueError, match="lacks"):
+            writer.write(_frame().assign(extra=1))
+    back = read_table(path)
+    assert list(back.columns) == list(_frame().columns)
+    assert back["firm"].isna().tolist() == [False] * 3 + [True] * 3
+    pd.testing.assert_frame_equal(back.iloc[3:].drop(columns=["firm"]).reset_index(drop=True),
+                                  _frame().drop(columns=["firm"]), check_dtype=False)
+
+def test_output_path_and_errors(tmp_path):
+    assert len(timestamp_tag(use_utc=True)) == 15
+    assert make_output_path(tmp_path / "out", "sme", ext=".parquet").suffix == ".parquet"
+    with pytest.raises(ValueError):
+        read_table(tmp_path / "t.json")
+    with pytest.raises(ValueError):
+        write_table(_frame(), tmp_path / "t.json")
+    cols = scoring_input_columns("sector", keep=["firm"])
+    assert cols[0] == "firm" and "sector" in cols and "geo_risk" in cols
@@ -0,0 +1,51 @@
+# tests/test_output_schema.py
+import numpy as np
+import pandas as pd
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.parallel_helper import score_parallel
+from sme_credit.helpers.store_helper import open_store, write_store
+from sme_credit.helpers.vector_helper import OUTPUT_COLUMNS
+
+def _sample():
+    return pd.read_excel("input_data/sample_input.xlsx").head(40)
+
+def test_typed_schema_matches_default_values():
+    ctx = load_context(".")
+    df = _sample()
+    plain = score_many(df, "sector", ctx)
+    typed = score_many(df, "sector", ctx, float_dtype="float32", categorical_rating=True)
+    numeric = [c for c in OUTPUT_COLUMNS if c != "Rating"]
+    assert (typed[numeric].dtypes == "float32").all()
+    assert list(typed["Rating"].cat.categories) == [*ctx.rating_scale.labels, "NR"]
+    assert typed["Rating"].cat.ordered
+    assert (typed["Rating"].astype(str) == plain["Rating"].astype(str)).all()
+    np.testing.assert_allclose(typed["PD_final"], plain["PD_final"], rtol=1e-6)
+
+def test_writes_do_not_leak_between_input_and_scored_frame(tmp_path):
+    ctx = load_context(".")
+    df = _sample().assign(company=lambda d: [f"c{i}" for i in range(len(d))])
+    scored = score_many(df, "sector", ctx)
+    assert list(scored.columns) == list(df.columns) + OUTPUT_COLUMNS
+    revenue, country = df.loc[1, "revenue"], df.loc[1, "Country"]
+    scored.loc[1, ["revenue", "Country"]] = [-1.0, "ZZ"]
+    assert df.loc[1, "revenue"] == revenue and df.loc[1, "Country"] == country
+    df.loc[2, "revenue"] = -2.0
+    assert scored.loc[2, "revenue"] != -2.0
+
+    write_store(df, str(tmp_path / "book.store"))
+    stored = score_many(open_store(str(tmp_path / "book.store")), "sector", ctx)
+    stored.loc[0, ["revenue", "sector"]] = [1.0, stored.loc[1, "sector"]]
+    assert stored.loc[0, "revenue"] == 1.0
+    assert open_store(str(tmp_path / "book.store")).loc[0, "revenue"] == df.loc[0, "revenue"]
+
+def test_outputs_only_with_key_across_engines():
+    ctx = load_context(".")
+    df = _sample()
+    vec = score_many(df, "sector", ctx, outputs_only=True, key_col="company", categorical_rating=True)
+    assert list(vec.columns) == ["company", *OUTPUT_COLUMNS]
+    row = score_many(df, "sector", ctx, engine="rowwise", outputs_only=True, key_col="company",
+                     categorical_rating=True)
+    pd.testing.assert_frame_equal(vec, row, check_dtype=False)
+    par = score_parallel(df, "sector", ctx, workers=2, outputs_only=True, categorical_rating=True)
+    assert list(par.columns) == OUTPUT_COLUMNS and isinstance(par["Rating"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,20 @@
+# tests/test_parallel_helper.py
+import pandas as pd
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.parallel_helper import score_parallel
+
+def test_parallel_matches_single_process_and_keeps_order():
+    ctx = load_context(".")
+    df = pd.read_excel("input_data/sample_input.xlsx").head(40)
+    df.loc[[3, 17], "total_assets"] = 0
+    scored, rejects = score_parallel(df, "sector", ctx, workers=2, validate=True)
+    ref_scored, ref_rejects = score_many(df, "sector", ctx, validate=True)
+    pd.testing.assert_frame_equal(scored, ref_scored)
+    pd.testing.assert_frame_equal(rejects, ref_rejects)
+    assert rejects["_error"].str.contains("total_assets==0").sum() == 2
+
+def test_single_worker_scores_in_process():
+    ctx = load_context(".")
+    df = pd.read_excel("input_data/sample_input.xlsx").head(5)
+    pd.testing.assert_frame_equal(score_parallel(df, "sector", ctx, workers=1), score_many(df, "sector", ctx))
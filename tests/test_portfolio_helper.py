@@ -0,0 +1,108 @@
+# tests/test_portfolio_helper.py
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import iter_frame_chunks, score_many, score_stream
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.parallel_helper import ParallelScorer
+from sme_credit.helpers.portfolio_helper import PortfolioAccumulator
+from sme_credit.helpers.validation_helper import validate_frame
+
+@pytest.fixture(scope="module")
+def ctx():
+    return load_context(".")
+
+@pytest.fixture(scope="module")
+def df():
+    df = pd.read_excel("input_data/sample_input.xlsx")
+    df.loc[[5, 77], "total_assets"] = 0  # rejected with validate=True
+    return df
+
+def _acc(ctx, **kw):
+    return PortfolioAccumulator(ctx.rating_scale, "sector", exposure_col="total_assets",
+                                key_col="company", top_n=7, **kw)
+
+def test_matches_aggregates_of_the_scored_frame(ctx, df):
+    acc = _acc(ctx)
+    scored, _ = score_many(df, "sector", ctx, validate=True, accumulator=acc)
+    info = acc.to_dict()
+    valid, rejects = validate_frame(df)
+    assert info["rows"] == len(scored) == valid.sum() and info["rows_read"] == len(df) and len(rejects) > 2
+
+    w, p = scored["total_assets"], scored["PD_final"]
+    assert info["exposure"] == pytest.approx(w.sum())
+    assert info["ew_pd"] == pytest.approx((w * p).sum() / w.sum())
+    counts = scored["Rating"].value_counts()
+    assert {r["Rating"]: r["rows"] for r in info["ratings"] if r["rows"]} == counts.to_dict()
+
+    by_sector = scored.groupby("sector")["total_assets"].sum()
+    assert {r["sector"]: r["exposure"] for r in info["sectors"]} == pytest.approx(by_sector.to_dict())
+    assert info["concentration"]["hhi_sector"] == pytest.approx(((by_sector / w.sum()) ** 2).sum())
+
+    top = scored.assign(row=np.flatnonzero(valid)) \
+        .sort_values(["PD_final", "row"], ascending=[False, True]).head(7)
+    assert [r["row"] for r in info["top_risk"]] == top["row"].tolist()
+    assert [r["key"] for r in info["top_risk"]] == top["company"].tolist()
+    largest = scored.nlargest(10, "total_assets")["total_assets"].sum()
+    assert [r["exposure"] for r in info["top_exposure"]] == scored["total_assets"].nlargest(7).tolist()
+    assert info["concentration"]["top10_exposure_share"] == pytest.approx(largest / w.sum())
+
+def test_chunks_and_workers_merge_to_the_single_pass(ctx, df):
+    whole = _acc(ctx)
+    score_many(df, "sector", ctx, validate=True, accumulator=whole)
+
+    streamed = _acc(ctx)
+    for _ in score_stream(iter_frame_chunks(df, 25), "sector", ctx, validate=True, accumulator=streamed):
+        pass
+
+    merged = _acc(ctx)
+    for lo in range(0, len(df), 40):
+        part = _acc(ctx, offset=lo)
+        score_many(df.iloc[lo:lo + 40], "sector", ctx, validate=True, accumulator=part)
+        merged.merge(part)
+
+    pooled = _acc(ctx)
+    with ParallelScorer(ctx, workers=2) as scorer:
+        for chunk in iter_frame_chunks(df, 60):
+            scorer.score(chunk, "sector", validate=True, accumulator=pooled)
+
+    expected = whole.to_dict()
+    for acc in (streamed, merged, pooled):
+        got = acc.to_dict()
+        assert got["top_risk"] == expected["top_risk"] and got["top_exposure"] == expected["top_exposure"]
+        assert got["ratings"] == expected["ratings"]
+        assert got["ew_pd"] == pytest.approx(expected["ew_pd"])
+        assert got["concentration"] == pytest.approx(expected["concentration"])
+
+def test_writes_json_and_parquet(tmp_path, ctx, df):
+    df = df.drop(index=[5, 77])
+    acc = PortfolioAccumulator(ctx.rating_scale, "sector")
+    score_many(df, "sector", ctx, outputs_only=True, accumulator=acc)
+    info = json.loads(acc.write_json(tmp_path / "p.json").read_text())
+    assert info["exposure"] == len(df) and "top_exposure" not in info
+    assert len(info["top_risk"]) == 20
+
+    table = pd.read_parquet(acc.write_parquet(tmp_path / "p.parquet"))
+    assert set(table["dimension"]) == {"rating", "sector", "country"}
+    for dim in ("rating", "sector", "country"):
+        assert table.loc[table["dimension"] == dim, "rows"].sum() == len(df)
+
+def test_written_summary_restores_a_mergeable_accumulator(tmp_path, ctx, df):
+    first, second = _acc(ctx), _acc(ctx, offset=60)
+    score_many(df.iloc[:60], "sector", ctx, validate=True, accumulator=first)
+    score_many(df.iloc[60:], "sector", ctx, validate=True, accumulator=second)
+    restored = PortfolioAccumulator.from_dict(json.loads(first.write_json(tmp_path / "p.json").read_text()),
+                                              ctx.rating_scale)
+    assert restored.to_dict() == first.to_dict()
+    whole = _acc(ctx)
+    score_many(df, "sector", ctx, validate=True, accumulator=whole)
+    merged = restored.merge(second).to_dict()
+    assert merged["top_exposure"] == whole.to_dict()["top_exposure"]
+    assert (merged["pd_min"], merged["pd_max"]) == (whole.pd_min, whole.pd_max)
+    assert merged["mean_pd"] == pytest.approx(whole.mean_pd)
+
+def test_missing_exposure_column_is_an_error(ctx, df):
+    acc = PortfolioAccumulator(ctx.rating_scale, "sector", exposure_col="loan_amount")
+    with pytest.raises(ValueError, match="loan_amount"):
+        score_many(df.drop(index=[5, 77]), "sector", ctx, accumulator=acc)
@@ -0,0 +1,35 @@
+# tests/test_prior_table.py
+import numpy as np
+from sme_credit.helpers.quant_helper import PriorTable, get_prior_pd
+
+LOOKUP = {
+    ("*", "*"): 0.05,
+    ("*", "Industrials"): 0.03,
+    ("UAE", "Banks"): 0.02,
+    ("INDIA", "Energy"): 0.04,
+}
+
+def test_table_matches_get_prior_pd():
+    table = PriorTable(LOOKUP)
+    countries = ["UAE", " uae ", "INDIA", "FRANCE", None, "INDIA", "*"]
+    sectors = ["Banks", "Banks ", "Industrials", "Tech", "Industrials", "Energy", "Banks"]
+    expected = [get_prior_pd(c, s, LOOKUP) for c, s in zip(countries, sectors)]
+    np.testing.assert_array_equal(table.resolve(countries, sectors), expected)
+    assert table.get("uae", "Banks") == 0.02
+
+def test_table_reports_fallback_levels():
+    table = PriorTable(LOOKUP)
+    cov = table.coverage(["UAE", "INDIA", "FRANCE", "FRANCE"], ["Banks", "Industrials", "Tech", "Energy"])
+    assert cov == {"exact": 1, "sector_wildcard": 1, "global_wildcard": 2, "default": 0}
+
+def test_table_default_without_wildcards():
+    table = PriorTable({("UAE", "Banks"): 0.02}, fallback=0.07)
+    prior, levels = table.resolve(["UAE", "OMAN"], ["Banks", "Banks"], return_levels=True)
+    assert prior.tolist() == [0.02, 0.07] and levels.tolist() == [0, 3]
+
+def test_scalar_get_matches_resolve():
+    table = PriorTable(LOOKUP)
+    countries = ["UAE", " uae ", "INDIA", "FRANCE", None, float("nan"), "*"]
+    sectors = ["Banks", "Banks ", "Energy", "Tech", "Industrials", "Industrials", None]
+    expected = table.resolve(countries, sectors).tolist()
+    assert [table.get(c, s) for c, s in zip(countries, sectors)] == expected
@@ -0,0 +1,36 @@
+# tests/test_profile_helper.py
+import json
+import time
+from sme_credit.helpers.profile_helper import RunProfiler, format_report
+
+def test_stages_accumulate_and_report_is_written(tmp_path):
+    prof = RunProfiler(trace_memory=True)
+    chunks = [[1] * 10, [2] * 10, [3] * 5]
+    for chunk in prof.iter("load", chunks):
+        with prof.stage("score", rows=len(chunk)):
+            time.sleep(0.001)
+    with prof.stage("write") as rec:
+        rec["rows"] += 25
+    prof.meta["rows_out"] = 25
+
+    report = prof.write_report(tmp_path / "run_report.json")
+    stages = {s["name"]: s for s in report["stages"]}
+    assert stages["load"]["calls"] == 3 and stages["load"]["rows"] == 25
+    assert stages["score"]["calls"] == 3 and stages["score"]["rows_per_s"] > 0
+    assert stages["write"]["rows"] == 25 and "peak_traced_mb" in stages["write"]
+    assert report["top_allocations"] and report["rows_out"] == 25
+    assert json.loads((tmp_path / "run_report.json").read_text()) == json.loads(json.dumps(report))
+    assert "score" in format_report(report)
+
+def test_cprofile_dump_and_disabled_profiler(tmp_path):
+    prof = RunProfiler(cprofile=True)
+    with prof.stage("score", rows=3):
+        sum(range(1000))
+    report = prof.write_report(tmp_path / "r.json")
+    assert (tmp_path / "r.prof").exists() and report["cprofile"].endswith("r.prof")
+
+    off = RunProfiler(enabled=False)
+    with off.stage("score", rows=3) as rec:
+        rec["rows"] += 1
+    assert list(off.iter("load", [[1], [2]])) == [[1], [2]]
+    assert off.stages == {}
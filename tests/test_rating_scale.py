@@ -0,0 +1,28 @@
+# tests/test_rating_scale.py
+import numpy as np
+import pytest
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.quant_helper import RatingScale, map_pd_to_rating, rating_to_pd
+
+def test_scale_matches_band_scan():
+    bands = load_yaml("config/rating_scale.yaml")["ratings"]
+    scale = RatingScale(bands)
+    pds = [-0.1, 0.0, 0.0005, 0.00049, 0.0123, 0.2499, 0.25, 0.99, 1.0, 5.0, float("nan")]
+    expected = [map_pd_to_rating(p, bands) for p in pds]
+    assert [scale.rating(p) for p in pds] == expected
+    assert list(scale.ratings(np.array(pds))) == expected
+    assert expected[0] == "NR" and expected[-1] == "NR"
+
+def test_scale_label_to_pd():
+    bands = load_yaml("config/rating_scale.yaml")["ratings"]
+    scale = RatingScale(bands)
+    for label in ["AAA", " bbb- ", "D", "unknown", None]:
+        assert rating_to_pd(label, scale) == rating_to_pd(label, bands)
+
+def test_scale_rejects_gaps_and_overlaps():
+    with pytest.raises(ValueError):
+        RatingScale([{"label": "A", "low": 0.0, "high": 0.1}, {"label": "B", "low": 0.2, "high": 1.0}])
+    with pytest.raises(ValueError):
+        RatingScale([{"label": "A", "low": 0.0, "high": 0.3}, {"label": "B", "low": 0.2, "high": 1.0}])
+    with pytest.raises(ValueError):
+        RatingScale([{"label": "A", "low": 0.0, "high": 0.1}, {"label": "a", "low": 0.1, "high": 1.0}])
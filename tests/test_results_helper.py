@@ -0,0 +1,102 @@
+# tests/test_results_helper.py
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import ChunkWriter, write_table
+from sme_credit.helpers.portfolio_helper import PortfolioAccumulator
+from sme_credit.helpers.results_helper import (
+    ResultFilter, ResultIndex, count_rows, filter_frame, load_summary, read_page, summarize_file, summary_path
+)
+
+FILTER = ResultFilter(ratings=("BB", "BB+"), countries=("UAE", "Saudi Arabia", "India"), pd_max=0.03)
+
+@pytest.fixture(scope="module")
+def scored():
+    df = pd.read_excel("input_data/sample_input.xlsx")
+    return score_many(df, "sector", load_context("."), categorical_rating=True)
+
+def _write(frame, path):
+    if path.suffix == ".csv":
+        write_table(frame, path)
+    else:  # several row groups / record batches
+        with ChunkWriter(path) as w:
+            for lo in range(0, len(frame), 25):
+                w.write(frame.iloc[lo:lo + 25])
+    return path
+
+@pytest.mark.parametrize("ext", [".csv", ".parquet", ".feather"])
+def test_pages_match_the_filtered_frame(tmp_path, scored, ext):
+    path = _write(scored, tmp_path / f"out{ext}")
+    expected = filter_frame(scored, FILTER)
+    assert 0 < len(expected) < len(scored)
+    assert count_rows(path) == len(scored)
+    assert count_rows(path, FILTER) == len(expected)
+
+    page = read_page(path, 2, 20)
+    np.testing.assert_allclose(page["PD_final"], scored["PD_final"].iloc[40:60])
+    for n in (0, 1, 2):
+        page = read_page(path, n, 15, FILTER, columns=["company", "PD_final"])
+        assert list(page.columns) == ["company", "PD_final"]
+        np.testing.assert_allclose(page["PD_final"], expected["PD_final"].iloc[n * 15:(n + 1) * 15])
+    assert len(read_page(path, 50, 20)) == 0 and len(read_page(path, 50, 20, FILTER)) == 0
+
+def test_summary_sidecar_matches_the_frame(tmp_path, scored):
+    scale = load_context(".").rating_scale
+    path = _write(scored, tmp_path / "out.parquet")
+    streamed = summarize_file(path, scale)
+    assert streamed.rows == streamed.pd_count == len(scored)
+    assert streamed.mean_pd == pytest.approx(scored["PD_final"].mean())
+    assert (streamed.pd_min, streamed.pd_max) == (scored["PD_final"].min(), scored["PD_final"].max())
+    ratings = streamed.band_table().set_index("Rating")["rows"]
+    assert ratings[ratings > 0].to_dict() == {k: v for k, v in scored["Rating"].value_counts().items() if v}
+    sectors = streamed.group_table("sector").set_index("sector")
+    by_sector = scored.groupby("sector")["PD_final"].mean()
+    np.testing.assert_allclose(sectors.loc[by_sector.index, "mean_pd"], by_sector)
+
+    written = PortfolioAccumulator(scale).update(scored, scored["PD_final"])
+    written.write_json(summary_path(path))
+    loaded = load_summary(path, scale)
+    assert loaded.to_dict() == written.to_dict()
+    assert loaded.to_dict()["ratings"] == streamed.to_dict()["ratings"]
+
+def test_stale_sidecar_is_rebuilt(tmp_path, scored):
+    scale = load_context(".").rating_scale
+    path = _write(scored, tmp_path / "out.csv")
+    PortfolioAccumulator(scale).update(scored.head(3), scored["PD_final"].head(3)).write_json(summary_path(path))
+    os.utime(summary_path(path), ns=(0, 0))
+    assert load_summary(path, scale).rows == len(scored)
+    assert load_summary(path, scale, write_sidecar=False).rows == len(scored)  # rewritten sidecar is fresh
+
+def test_index_rescans_only_when_the_directory_changes(tmp_path, scored):
+    scale = load_context(".").rating_scale
+    index = ResultIndex(tmp_path)
+    assert index.files() == []
+    _write(scored.head(5), tmp_path / "a_1.csv")
+    (tmp_path / "notes.txt").write_text("x")
+    assert index.refresh() and not index.refresh()
+    assert index.files() == []  # no sidecar yet: still being written, or not a scored output
+    load_summary(tmp_path / "a_1.csv", scale)
+    assert index.files() == [tmp_path / "a_1.csv"] and index.size(tmp_path / "a_1.csv") > 0
+    _write(scored.head(5), tmp_path / "b_2.parquet")
+    load_summary(tmp_path / "b_2.parquet", scale)
+    os.utime(tmp_path / "a_1.csv", ns=(0, 0))
+    assert index.files() == [tmp_path / "b_2.parquet", tmp_path / "a_1.csv"]
+    assert index.files("a_") == [tmp_path / "a_1.csv"]
+    assert ResultIndex(tmp_path / "missing").files() == []
+
+def test_only_scored_outputs_are_listed_or_summarised(tmp_path, scored):
+    scale = load_context(".").rating_scale
+    _write(scored, tmp_path / "x.csv")
+    PortfolioAccumulator(scale).update(scored, scored["PD_final"]).write_json(summary_path(tmp_path / "x.csv"))
+    PortfolioAccumulator(scale).update(scored, scored["PD_final"]).write_parquet(tmp_path / "x_portfolio.parquet")
+    pd.DataFrame({"sector": ["Retail"], "Country": ["UAE"], "_error": ["bad"]}).to_csv(
+        tmp_path / "x_rejects.csv", index=False)
+    pd.DataFrame({"PD_point": [0.01]}).to_csv(tmp_path / "uncertainty_1.csv", index=False)
+    assert ResultIndex(tmp_path).files() == [tmp_path / "x.csv"]
+    for name in ("x_rejects.csv", "uncertainty_1.csv", "x_portfolio.parquet"):
+        with pytest.raises(ValueError, match="not a scored output"):
+            load_summary(tmp_path / name, scale)
+        assert not summary_path(tmp_path / name).exists()
@@ -0,0 +1,76 @@
+# tests/test_scenario_helper.py
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.context_helper import ScoringContext, load_context
+from sme_credit.helpers.scenario_helper import (
+    ScenarioEngine, migrations_long, scenario_grid, scenario_summary, split_overrides
+)
+from sme_credit.helpers.vector_helper import score_components
+
+_SECTION = {"W_X1": "weights", "W_X3": "weights", "ALT_WT": "overlays", "QUAL_WT": "overlays",
+            "MV_CAP": "limits"}
+
+def _rescored(ctx, df, overrides):
+    """Reference: rebuild the context with the overrides and score from scratch."""
+    cfg = copy.deepcopy(ctx.cfg)
+    curves = copy.deepcopy(ctx.sector_curves)
+    for key, value in overrides.items():
+        if key in _SECTION:
+            cfg[_SECTION[key]][key] = value
+        else:
+            sector, field = key.rsplit(".", 1)
+            curves[sector][field] = value
+    return score_components(df, "sector", ScoringContext(cfg, curves, ctx.rating_scale, ctx.prior_lookup))
+
+def _ctx_without_floor():
+    ctx = load_context(".")
+    cfg = copy.deepcopy(ctx.cfg)
+    cfg["toggles"]["CAP_COUNTRY_RATING"] = False
+    return ScoringContext(cfg, ctx.sector_curves, ctx.rating_scale, ctx.prior_lookup)
+
+def test_no_overrides_reproduces_base():
+    ctx = load_context(".")
+    df = pd.read_excel("input_data/sample_input.xlsx")
+    engine = ScenarioEngine(df, "sector", ctx)
+    out = engine.evaluate({})
+    np.testing.assert_array_equal(out["PD_final"], engine.base["PD_final"])
+    res = engine.run([{}])["base"]
+    assert res["upgrades"] == res["downgrades"] == 0
+    assert np.trace(res["migration"].to_numpy()) == len(df)
+
+@pytest.mark.parametrize("overrides", [
+    {"W_X3": 4.5, "W_X1": 0.2},
+    {"MV_CAP": 2.0},
+    {"ALT_WT": 0.5, "QUAL_WT": 2.0},
+    {"Banks.slope": -0.002, "Real Estate.int": 0.05},
+])
+def test_scenario_matches_full_rescore(overrides):
+    ctx = _ctx_without_floor()
+    df = pd.read_excel("input_data/sample_input.xlsx")
+    engine = ScenarioEngine(df, "sector", ctx)
+    out = engine.evaluate(overrides)
+    ref = _rescored(ctx, df, overrides)
+    np.testing.assert_allclose(out["PD_final"], ref["PD_final"], rtol=1e-12)
+
+    res = engine.run({"s": overrides})["s"]
+    expected = pd.crosstab(pd.Series(engine.base["Rating"], name="from"),
+                           pd.Series(ref["Rating"], name="to"))
+    got = res["migration"].loc[expected.index, expected.columns]
+    np.testing.assert_array_equal(got.to_numpy(), expected.to_numpy())
+    assert res["migration"].to_numpy().sum() == len(df)
+
+def test_grid_summary_and_bad_keys():
+    ctx = _ctx_without_floor()
+    df = pd.read_excel("input_data/sample_input.xlsx")
+    grid = scenario_grid({"W_X3": [3.0, 4.0], "ALT_WT": [1.0, 2.0, 3.0]})
+    assert len(grid) == 6 and grid["W_X3=3.0, ALT_WT=1.0"] == {"W_X3": 3.0, "ALT_WT": 1.0}
+    results = ScenarioEngine(df, "sector", ctx).run(grid)
+    summary = scenario_summary(results)
+    assert list(summary["scenario"]) == list(grid)
+    assert (summary[["upgrades", "downgrades", "unchanged"]].sum(axis=1) == len(df)).all()
+    long = migrations_long(results)
+    assert long.groupby("scenario")["firms"].sum().eq(len(df)).all()
+    with pytest.raises(ValueError):
+        split_overrides({"CF_FCF": 1.0})
@@ -0,0 +1,80 @@
+# tests/test_service_helper.py
+import asyncio
+import json
+import pandas as pd
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.service_helper import LatencyHistogram, LocalClient, ScoringService
+
+def _records(n):
+    df = pd.read_excel("input_data/sample_input.xlsx").dropna(subset=["market_value_equity"]).head(n)
+    records = [{k: v for k, v in r.items() if pd.notna(v)} for r in df.to_dict("records")]
+    return df, records
+
+def test_single_and_coalesced_requests_match_batch_scoring():
+    ctx = load_context(".")
+    df, records = _records(60)
+    expected = score_many(df, "sector", ctx)
+
+    async def go():
+        async with ScoringService(ctx, max_wait_ms=5, vector_min=8) as service:
+            client = LocalClient(service)
+            one = await client.score(records[0])
+            many = await asyncio.gather(*(client.score(r) for r in records))
+            batch = await client.score_batch(records[:3])
+            return one, many, batch, await client.stats()
+
+    one, many, batch, stats = asyncio.run(go())
+    assert one["Rating"] == expected["Rating"].iloc[0]
+    assert abs(one["PD_final"] - expected["PD_final"].iloc[0]) < 1e-15
+    assert [r["Rating"] for r in many] == expected["Rating"].tolist()
+    assert [r["PD_final"] for r in batch] == [r["PD_final"] for r in many[:3]]
+    assert max(int(k) for k in stats["batch_sizes"]) > 1  # concurrent requests were coalesced
+    assert stats["request_latency"]["count"] == 1 + 60 + 3
+
+def test_invalid_and_malformed_requests():
+    ctx = load_context(".")
+    _, records = _records(1)
+    service = ScoringService(ctx)
+
+    async def go():
+        async with service:
+            bad = await service.score(records[0] | {"total_liabilities": 0})
+            garbage = json.loads(await service.handle_line("not json"))
+            unknown = await service.handle_message({"id": 7})
+            return bad, garbage, unknown
+
+    bad, garbage, unknown = asyncio.run(go())
+    assert bad["reason_codes"] == ["ZERO_TOTAL_LIABILITIES"]
+    assert "bad request" in garbage["error"]
+    assert unknown["id"] == 7 and "error" in unknown
+
+def test_bad_record_does_not_fail_the_rest_of_its_batch():
+    ctx = load_context(".")
+    df, records = _records(2)
+    expected = score_many(df, "sector", ctx)
+    as_strings = records[1] | {"revenue": str(records[1]["revenue"]), "cf_int_cov": "2.5"}
+    expected_strings = score_many(df.iloc[[1]].assign(cf_int_cov=2.5), "sector", ctx)
+    broken = records[0] | {"geo_risk": "high"}
+    for vector_min in (32, 2):  # scalar and vectorized batch paths
+        service = ScoringService(ctx, max_wait_ms=20, vector_min=vector_min)
+
+        async def go():
+            async with service:
+                return await service.score_batch([records[0], as_strings, broken, "not a record"])
+
+        good, numeric_strings, bad, garbage = asyncio.run(go())
+        assert list(service.batch_sizes) == [4]
+        assert good["Rating"] == expected["Rating"].iloc[0]
+        assert abs(numeric_strings["PD_final"] - expected_strings["PD_final"].iloc[0]) < 1e-15
+        assert "error" in garbage
+        # the scalar path rejects the non-numeric overlay; the frame path coerces it to NaN like score_many
+        assert "error" in bad if vector_min > 4 else bad["Z_adj"] is None
+
+def test_latency_histogram_quantiles():
+    h = LatencyHistogram()
+    for us in [10] * 90 + [1000] * 10:
+        h.record(us / 1e6)
+    snap = h.snapshot()
+    assert snap["count"] == 100
+    assert 10 <= snap["p50_us"] < 13 and 1000 <= snap["p99_us"] < 1300
@@ -0,0 +1,49 @@
+# tests/test_startup.py
+import subprocess
+import sys
+
+HEAVY = ("pandas", "yaml", "openpyxl")
+
+def _loaded(code: str) -> list:
+    probe = code + f"\nimport sys\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=".")
+    return [m for m in out.stdout.strip().split(",") if m]
+
+def test_scalar_core_imports_without_pandas():
+    code = """
+import sme_credit.helpers
+import sme_credit.helpers.service_helper
+from sme_credit.core import small_firm_score
+from sme_credit.helpers.context_helper import ScoringContext
+from sme_credit.helpers.quant_helper import PriorTable, RatingScale
+bands = [{"label": "A", "low": 0.0, "high": 0.02}, {"label": "B", "low": 0.02, "high": None}]
+table = PriorTable({("UAE", "Banks"): 0.02})
+assert table.get(" uae", "Banks") == 0.02 and RatingScale(bands).rating(0.01) == "A"
+"""
+    assert _loaded(code) == []
+
+def test_cached_context_scores_without_pandas(tmp_path):
+    from sme_credit.helpers.cache_helper import load_context_cached
+    load_context_cached(".", cache_dir=tmp_path)  # a cold load may import anything
+    code = f"""
+from sme_credit.core import small_firm_score
+from sme_credit.helpers.cache_helper import load_context_cached
+ctx = load_context_cached(".", cache_dir={str(tmp_path)!r})
+data = dict(revenue=8e6, total_assets=5e6, total_liabilities=3e6, ebit=6e5, retained_earnings=1e6,
+            working_capital=8e5, market_value_equity=2e6, Country="UAE",
+            sector_prior_pd=ctx.prior_table.get("UAE", "Retail"))
+assert 0 < small_firm_score(data, "Retail", ctx)["PD_final"] < 1
+"""
+    assert _loaded(code) == []
+
+def test_package_exports_resolve_lazily():
+    import sme_credit.helpers as helpers
+    from sme_credit.helpers.quant_helper import RatingScale
+    assert helpers.RatingScale is RatingScale
+    assert "load_context_cached" in dir(helpers)
+    try:
+        helpers.no_such_helper
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("unknown helper resolved")
@@ -0,0 +1,89 @@
+# tests/test_store_helper.py
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.parallel_helper import ParallelScorer
+from sme_credit.helpers.store_helper import (
+    STORE_MANIFEST, is_store, iter_store_chunks, open_store, read_input, store_manifest, write_store
+)
+
+def _sample():
+    return pd.read_excel("input_data/sample_input.xlsx")
+
+def _mapped(array) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+def test_round_trip_keeps_values_and_dictionary_encodes_text(tmp_path):
+    df = pd.DataFrame({
+        "sector": ["Retail", None, "Energy", "Retail"],
+        "n": [1, 2, 3, 4],
+        "x": [0.5, np.nan, 1.5, 2.5],
+        "flag": [True, False, True, True],
+        "nullable": pd.array([1, None, 3, 4], dtype="Int64"),
+        "when": pd.to_datetime(["2024-01-31", "2024-02-29", None, "2024-03-31"]),
+        "utc": pd.to_datetime(["2024-01-31"] * 4).tz_localize("Asia/Dubai"),
+    })
+    path = write_store(df, tmp_path / "book.store")
+    assert is_store(path) and not is_store(tmp_path)
+    kinds = {c["name"]: c["kind"] for c in store_manifest(path)["columns"]}
+    assert kinds["sector"] == "dict" and kinds["x"] == "numeric"
+
+    out = open_store(path)
+    assert out["sector"].dtype == "category" and out["sector"].isna().tolist() == [False, True, False, False]
+    assert out["sector"].astype(object).where(out["sector"].notna()).tolist()[::2] == ["Retail", "Energy"]
+    np.testing.assert_array_equal(out["n"], df["n"])
+    np.testing.assert_array_equal(out["x"], df["x"])
+    assert out["nullable"].isna().tolist() == [False, True, False, False]
+    pd.testing.assert_series_equal(out["when"], df["when"])
+    pd.testing.assert_series_equal(out["utc"], df["utc"])
+    assert list(open_store(path, ["x", "missing", "n"]).columns) == ["n", "x"]
+
+def test_columns_are_read_only_views_of_the_mapped_files(tmp_path):
+    path = write_store(_sample(), tmp_path / "s")
+    out = open_store(path, start=10, stop=20)
+    assert len(out) == 10 and out.index[0] == 0
+    revenue = out["revenue"].to_numpy()
+    assert not revenue.flags.writeable and _mapped(revenue)
+    assert _mapped(out["sector"].array.codes)
+
+def test_scoring_a_store_matches_the_source_frame(tmp_path):
+    ctx = load_context(".")
+    df = _sample()
+    path = write_store(df, tmp_path / "s")
+    expected, expected_rejects = score_many(df, "sector", ctx, validate=True)
+    scored, rejects = score_many(open_store(path), "sector", ctx, validate=True)
+    pd.testing.assert_frame_equal(scored, expected, check_dtype=False, check_categorical=False)
+    assert len(rejects) == len(expected_rejects)
+
+    streamed = pd.concat([score_many(c, "sector", ctx) for c in iter_store_chunks(path, 50)],
+                         ignore_index=True)
+    assert [len(c) for c in iter_store_chunks(path, 50)] == [50, 50, len(df) - 100]
+    np.testing.assert_array_equal(streamed["PD_final"], score_many(df, "sector", ctx)["PD_final"])
+
+def test_workers_map_store_partitions(tmp_path):
+    ctx = load_context(".")
+    df = _sample()
+    path = write_store(df, tmp_path / "s")
+    expected, expected_rejects = score_many(df, "sector", ctx, validate=True, outputs_only=True)
+    with ParallelScorer(ctx, workers=2) as scorer:
+        scored, rejects = scorer.score_store(path, "sector", validate=True, outputs_only=True)
+    pd.testing.assert_frame_equal(scored, expected)
+    assert len(rejects) == len(expected_rejects)
+
+def test_read_input_and_version_check(tmp_path):
+    path = write_store(_sample().head(5), tmp_path / "s")
+    assert len(read_input(path)) == 5
+    assert len(read_input("input_data/sample_input.xlsx", columns=["revenue"]).columns) == 1
+    manifest = json.loads((path / STORE_MANIFEST).read_text())
+    (path / STORE_MANIFEST).write_text(json.dumps({**manifest, "version": 0}))
+    with pytest.raises(ValueError):
+        open_store(path)
+    with pytest.raises(ValueError):
+        write_store(pd.DataFrame([[1, 2]], columns=["a", "a"]), tmp_path / "dup")
@@ -0,0 +1,53 @@
+# tests/test_stream_scoring.py
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many, score_stream
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.io_helper import iter_input_chunks, append_csv
+
+def _sample():
+    return pd.read_excel("input_data/sample_input.xlsx").head(25)
+
+@pytest.mark.parametrize("ext", [".csv", ".xlsx", ".parquet"])
+def test_chunked_reader_round_trips(tmp_path, ext):
+    df = _sample()
+    src = tmp_path / f"in{ext}"
+    if ext == ".csv":
+        df.to_csv(src, index=False)
+    elif ext == ".xlsx":
+        df.to_excel(src, index=False)
+    else:
+        pytest.importorskip("pyarrow")
+        df.to_parquet(src, index=False)
+    chunks = list(iter_input_chunks(src, chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert list(pd.concat(chunks).columns) == list(df.columns)
+
+def test_score_stream_matches_whole_batch(tmp_path):
+    ctx = load_context(".")
+    df = _sample()
+    src = tmp_path / "in.csv"
+    df.to_csv(src, index=False)
+    out = tmp_path / "out.csv"
+    for i, scored in enumerate(score_stream(iter_input_chunks(src, 7), "sector", ctx)):
+        append_csv(scored, out, header=(i == 0))
+    streamed = pd.read_csv(out)
+    whole = score_many(pd.read_csv(src), "sector", ctx)
+    pd.testing.assert_frame_equal(streamed, whole, check_dtype=False)
+
+def test_chunked_reader_rejects_bad_input(tmp_path):
+    with pytest.raises(ValueError):
+        next(iter_input_chunks(tmp_path / "in.json", 10))
+    with pytest.raises(ValueError):
+        next(iter_input_chunks(tmp_path / "in.csv", 0))
+
+def test_score_stream_reports_progress_over_frame_chunks():
+    from sme_credit.helpers.batch_helper import iter_frame_chunks
+    ctx = load_context(".")
+    df = _sample()
+    seen = []
+    parts = list(score_stream(iter_frame_chunks(df, 10), "sector", ctx, progress=seen.append))
+    assert seen == [10, 20, 25]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), score_many(df, "sector", ctx))
+    with pytest.raises(ValueError):
+        next(iter_frame_chunks(df, 0))
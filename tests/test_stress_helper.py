@@ -0,0 +1,65 @@
+# tests/test_stress_helper.py
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.stress_helper import StressEngine, load_stress_spec, rating_distribution, stress_summary
+from sme_credit.helpers.vector_helper import score_components
+
+def _sample():
+    return pd.read_excel("input_data/sample_input.xlsx")
+
+def test_financial_haircuts_match_rescoring_shocked_inputs():
+    ctx = load_context(".")
+    df = _sample()
+    shocks = [{"type": "revenue_haircut", "pct": 0.4},
+              {"type": "ebit_haircut", "pct": 0.5, "sectors": ["Industrials"]},
+              {"type": "liabilities_uplift", "pct": 0.3, "countries": ["GCC"]}]
+    out = StressEngine(df, "sector", ctx).evaluate(shocks)
+
+    shocked = df.astype({"revenue": float, "ebit": float, "total_liabilities": float})
+    shocked["revenue"] = shocked["revenue"] * 0.6
+    ind = shocked["sector"] == "Industrials"
+    shocked.loc[ind, "ebit"] = shocked.loc[ind, "ebit"] * 0.5
+    gcc = shocked["Country"].str.upper().isin(["UAE", "SAUDI ARABIA", "OMAN", "QATAR", "KUWAIT", "BAHRAIN"])
+    shocked.loc[gcc, "total_liabilities"] = shocked.loc[gcc, "total_liabilities"] * 1.3
+    ref = score_components(shocked, "sector", ctx)
+    np.testing.assert_allclose(out["PD_final"], ref["PD_final"], rtol=1e-12)
+
+def test_sovereign_downgrade_matches_lower_country_rating():
+    ctx = load_context(".")
+    df = _sample()
+    labels = list(ctx.rating_scale.labels)
+    out = StressEngine(df, "sector", ctx).evaluate([{"type": "sovereign_downgrade", "notches": 2}])
+
+    shocked = df.copy()
+    shocked["Country Rating"] = [labels[min(labels.index(r) + 2, len(labels) - 1)] if r in labels else r
+                                 for r in shocked["Country Rating"]]
+    ref = score_components(shocked, "sector", ctx)
+    np.testing.assert_allclose(out["PD_final"], ref["PD_final"], rtol=1e-12)
+
+def test_run_reports_distribution_and_el_delta():
+    ctx = load_context(".")
+    df = _sample()
+    scenarios, lgd = load_stress_spec({"lgd": 0.4, "scenarios": {
+        "prior_up": [{"type": "prior_shock", "multiplier": 2.0}],
+        "noop": [],
+    }})
+    engine = StressEngine(df, "sector", ctx, exposure=np.full(len(df), 1000.0), lgd=lgd)
+    results = engine.run(scenarios)
+    base = results["base"]
+    assert base["el"] == pytest.approx(np.nansum(1000.0 * 0.4 * engine.base["PD_final"]))
+    assert results["noop"]["el_delta"] == 0.0
+    assert results["prior_up"]["el_delta"] > 0 and results["prior_up"]["mean_pd"] > base["mean_pd"]
+    summary = stress_summary(results)
+    assert list(summary["scenario"]) == ["base", "prior_up", "noop"]
+    assert {"p50_pd", "p90_pd", "p99_pd", "el_delta_pct"} <= set(summary.columns)
+    assert (rating_distribution(results).sum() == len(df)).all()
+
+def test_bad_spec_is_rejected():
+    with pytest.raises(ValueError):
+        load_stress_spec({"scenarios": {"x": [{"type": "fx_shock"}]}})
+    with pytest.raises(ValueError):
+        load_stress_spec({"scenarios": {"x": [{"type": "revenue_haircut"}]}})
+    with pytest.raises(ValueError):
+        load_stress_spec({})
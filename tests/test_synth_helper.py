@@ -0,0 +1,22 @@
+# tests/test_synth_helper.py
+import numpy as np
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.synth_helper import iter_synthetic_chunks, synthetic_portfolio
+
+def test_synthetic_portfolio_matches_config_and_scores():
+    sectors = list(load_yaml("config/sector_config.yaml")["sectors"])
+    df = synthetic_portfolio(2000, seed=1, sectors=sectors)
+    assert len(df) == 2000 and df["firm_id"].is_unique
+    assert set(df["sector"]) <= set(sectors) | {"Unclassified"}
+    scored = score_many(df, "sector", load_context("."))
+    assert np.isfinite(scored["PD_final"]).all()
+    assert (scored["scale_pen"] != 0).any() and (scored["lev_pen"] != 0).any()
+
+def test_synthetic_chunks_are_deterministic():
+    a = list(iter_synthetic_chunks(25, 10, seed=3))
+    b = list(iter_synthetic_chunks(25, 10, seed=3))
+    assert [len(c) for c in a] == [10, 10, 5]
+    assert a[2]["firm_id"].tolist() == list(range(20, 25))
+    assert all(x.equals(y) for x, y in zip(a, b))
@@ -0,0 +1,64 @@
+# tests/test_uncertainty_helper.py
+import numpy as np
+import pandas as pd
+import pytest
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.context_helper import load_context
+from sme_credit.helpers.uncertainty_helper import UncertaintyEngine, load_uncertainty_spec, uncertainty_summary
+from sme_credit.helpers.vector_helper import score_components
+
+@pytest.fixture(scope="module")
+def ctx():
+    return load_context(".")
+
+@pytest.fixture(scope="module")
+def df():
+    df = pd.read_excel("input_data/sample_input.xlsx")
+    df.loc[:19, ["trade_credit", "cf_int_cov", "business_age_years"]] = np.nan
+    return df
+
+def test_point_matches_score_many_and_intervals_are_ordered(ctx, df):
+    spec = load_yaml("config/uncertainty.yaml")
+    result = UncertaintyEngine(df, "sector", ctx, spec).run(draws=400)
+    scored = score_many(df, "sector", ctx)
+    np.testing.assert_allclose(result["PD_point"], scored["PD_final"])
+    assert list(result["Rating_point"]) == list(scored["Rating"])
+    assert (result["PD_p5"] <= result["PD_p50"]).all() and (result["PD_p50"] <= result["PD_p95"]).all()
+    assert result[["flip_prob", "downgrade_prob", "upgrade_prob"]].apply(lambda s: s.between(0, 1).all()).all()
+    np.testing.assert_allclose(result["flip_prob"], result["downgrade_prob"] + result["upgrade_prob"])
+    assert list(result["Rating_p50"][:3]) == list(ctx.rating_scale.ratings(result["PD_p50"][:3]))
+    assert uncertainty_summary(result)["firms"] == len(df)
+
+def test_only_missing_inputs_move_without_prior_or_observed_sd(ctx, df):
+    spec = {"draws": 200, "seed": 3, "inputs": {"trade_credit": {"dist": "beta", "sd": 0.3},
+                                                 "business_age_years": {"dist": "uniform", "low": 0, "high": 10}}}
+    result = UncertaintyEngine(df, "sector", ctx, spec).run()
+    assert (result["PD_sd"][20:] < 1e-12).all() and (result["flip_prob"][20:] == 0).all()
+    assert (result["PD_sd"][:20] > 0).all()
+
+    spec["inputs"]["trade_credit"]["observed_sd"] = 0.1
+    observed = UncertaintyEngine(df, "sector", ctx, spec).run()["PD_sd"][20:]
+    comps = score_components(df.iloc[20:], "sector", ctx)
+    off_floor = (comps["PD_model"] > 0) & (comps["PD_final"] > 1.01 * np.nan_to_num(comps["floor_pd"]))
+    assert off_floor.sum() > 50 and (observed[off_floor] > 1e-12).all()
+
+def test_results_depend_on_seed_not_workers(ctx, df):
+    engine = UncertaintyEngine(df, "sector", ctx, load_yaml("config/uncertainty.yaml"))
+    one = engine.run(draws=100, memory_mb=0.2)
+    assert engine.block_rows(100, 0.2) < len(df)
+    pd.testing.assert_frame_equal(one, engine.run(draws=100, memory_mb=0.2, workers=2))
+    assert not one["PD_mean"].equals(engine.run(draws=100, memory_mb=0.2, seed=7)["PD_mean"])
+
+@pytest.mark.parametrize("spec", [
+    {"inputs": {"revenue": {"dist": "beta", "sd": 0.1}}},
+    {"inputs": {"geo_risk": {"dist": "gamma", "sd": 0.1}}},
+    {"inputs": {"geo_risk": {"dist": "beta"}}},
+    {"inputs": {"business_age_years": {"dist": "uniform", "low": 5, "high": 1}}},
+    {"prior": {"dist": "beta", "rel_sd": -0.1}},
+    {"quantiles": [0.5, 1.0]},
+    {"draws": 0},
+])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        load_uncertainty_spec(spec)
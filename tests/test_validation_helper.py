@@ -0,0 +1,43 @@
+# tests/test_validation_helper.py
+import numpy as np
+import pandas as pd
+from sme_credit.helpers.validation_helper import REASON_CODES, validate_frame
+
+def _good():
+    return dict(revenue=10_000_000, total_assets=20_000_000, total_liabilities=8_000_000,
+                ebit=1_500_000, retained_earnings=2_000_000, working_capital=1_000_000,
+                market_value_equity=12_000_000, geo_risk=0.4)
+
+def test_each_rule_gets_its_reason_code():
+    df = pd.DataFrame([
+        _good(),
+        _good() | {"revenue": "n/a"},
+        _good() | {"total_assets": 0},
+        _good() | {"total_liabilities": 0},
+        _good() | {"geo_risk": 1.5},
+        _good() | {"ebit": None, "total_liabilities": 0, "geo_risk": -0.1},
+    ])
+    valid, rejects = validate_frame(df)
+    assert valid.tolist() == [True, False, False, False, False, False]
+    assert rejects["_reason_codes"].tolist() == [
+        "NON_NUMERIC",
+        "ZERO_TOTAL_ASSETS",
+        "ZERO_TOTAL_LIABILITIES",
+        "OVERLAY_OUT_OF_RANGE",
+        "NON_NUMERIC;ZERO_TOTAL_LIABILITIES;OVERLAY_OUT_OF_RANGE",
+    ]
+    assert rejects["_error"].iloc[0] == "non-numeric/NaN: ['revenue']"
+    assert rejects["_error"].iloc[4] == ("non-numeric/NaN: ['ebit']; total_liabilities==0; "
+                                         "out-of-range [0,1]: ['geo_risk']")
+    assert set(rejects["_reason_codes"].str.split(";").explode()) <= set(REASON_CODES)
+
+def test_clean_frame_has_empty_rejects():
+    valid, rejects = validate_frame(pd.DataFrame([_good(), _good()]))
+    assert np.all(valid)
+    assert rejects.empty and {"_error", "_reason_codes"} <= set(rejects.columns)
+
+def test_missing_total_assets_column_rejects_every_row():
+    row = _good(); row.pop("total_assets")
+    valid, rejects = validate_frame(pd.DataFrame([row]))
+    assert not valid.any()
+    assert rejects["_reason_codes"].iloc[0] == "NON_NUMERIC;ZERO_TOTAL_ASSETS"
@@ -0,0 +1,56 @@
+# tests/test_vector_helper.py
+import numpy as np
+import pandas as pd
+from sme_credit.helpers.config_helper import load_yaml
+from sme_credit.helpers.batch_helper import score_many
+from sme_credit.helpers.vector_helper import OUTPUT_COLUMNS, score_frame
+
+LOOKUP = {("*", "*"): 0.05, ("*", "Industrials"): 0.03, ("INDIA", "Energy"): 0.04}
+
+def _configs():
+    cfg = load_yaml("config/model_config.yaml")
+    sectors = load_yaml("config/sector_config.yaml")["sectors"]
+    bands = load_yaml("config/rating_scale.yaml")["ratings"]
+    return cfg, sectors, bands
+
+def _frame():
+    base = dict(revenue=10_000_000, total_assets=20_000_000, total_liabilities=8_000_000,
+                ebit=1_500_000, retained_earnings=2_000_000, working_capital=1_000_000,
+                market_value_equity=12_000_000, country_rating="")
+    return pd.DataFrame([
+        base | {"Country": "UAE", "sector": "Industrials", "Country Rating": ""},
+        base | {"Country": " india ", "sector": "Energy", "trade_credit": 0.9, "business_age_years": 2,
+                "Country Rating": ""},
+        base | {"Country": "France", "sector": "UnknownSector", "revenue": 1_000_000,
+                "total_liabilities": 15_000_000, "Country Rating": "BB"},
+        base | {"Country": "Oman", "sector": "Banks", "Country Rating": "", "country_rating": "BBB", "business_age_years": 4,
+                "market_value_equity": 900_000_000},
+    ])
+
+def _assert_same(a, b):
+    assert list(a.columns) == list(b.columns)
+    assert (a["Rating"] == b["Rating"]).all()
+    num = [c for c in OUTPUT_COLUMNS if c != "Rating"]
+    np.testing.assert_allclose(a[num].astype(float), b[num].astype(float), rtol=1e-12, atol=0)
+
+def test_vectorized_matches_rowwise():
+    cfg, sectors, bands = _configs()
+    df = _frame()
+    ref = score_many(df, "sector", cfg, sectors, bands, LOOKUP, engine="rowwise")
+    vec = score_many(df, "sector", cfg, sectors, bands, LOOKUP)
+    _assert_same(ref, vec)
+
+def test_vectorized_matches_rowwise_with_toggles_off():
+    cfg, sectors, bands = _configs()
+    cfg["toggles"]["USE_BAYES_PRIOR"] = False
+    cfg["toggles"]["CAP_COUNTRY_RATING"] = False
+    df = _frame()
+    _assert_same(score_many(df, "sector", cfg, sectors, bands, LOOKUP, engine="rowwise"),
+                 score_many(df, "sector", cfg, sectors, bands, LOOKUP))
+
+def test_score_frame_keeps_index_and_outputs_only():
+    cfg, sectors, bands = _configs()
+    df = _frame().set_index(pd.Index([10, 11, 12, 13]))
+    out = score_frame(df, "sector", cfg, sectors, bands, LOOKUP)
+    assert list(out.columns) == OUTPUT_COLUMNS
+    assert list(out.index) == [10, 11, 12, 13]